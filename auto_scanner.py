@@ -1,74 +1,46 @@
 """
 auto_scanner.py — логіка авто-сканування монет за фандинг-ставкою.
 """
-from datetime import datetime, timezone
-import requests
+import time
 
-
-def fetch_bybit_tickers(timeout: int = 8) -> list[dict] | None:
-    """Отримує список тикерів лінійних контрактів з Bybit API."""
-    try:
-        resp = requests.get(
-            "https://api.bybit.com/v5/market/tickers",
-            params={"category": "linear"},
-            timeout=timeout,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        if data.get("retCode") != 0:
-            return None
-        return data["result"]["list"]
-    except Exception as e:
-        print(f"fetch_bybit_tickers error: {e}")
-        return None
+from funding_scanner import CROSS_EXCHANGE_WEIGHTS, SCORE_WEIGHTS, scan_tickers
+from rate_limiter import analytics_priority
+from server_clock import exchange_now
+from ticker_cache import SCAN_EXCHANGES, get_exchange_tickers
 
 
+@analytics_priority
 def scan_funding_opportunities(
     threshold_pct: float,
     near_window_secs: float = 60.0,
+    exchanges: tuple[str, ...] = SCAN_EXCHANGES,
+    weights: dict | None = None,
 ) -> tuple[list[dict], list[dict]]:
     """
-    Сканує USDT-перп монети.
+    Сканує USDT-перп монети на біржах exchanges (знімки качаються паралельно).
 
     Повертає:
-        all_above  — всі монети де |rate| >= threshold_pct, відсортовані за |rate| DESC
+        all_above  — всі монети де rate <= -threshold_pct, відсортовані за балом DESC
+                     (за замовчуванням |rate| з поправкою на оборот, відкритий інтерес і спред)
         near_now   — з all_above тільки ті де до фандингу <= near_window_secs сек
+    Кожен запис містить "exchange", "interval" (год) і "price" — див. scan_tickers.
+    weights=RATE_ONLY дає той самий порядок, що й FundingLeaderboard.ranking (|rate| DESC) —
+    так глобальний авто-режим ранжує однаково з рейтингом і без нього.
     """
-    tickers = fetch_bybit_tickers()
+    started = time.perf_counter()
+    tickers, timings = get_exchange_tickers(tuple(exchanges))
+    if len(exchanges) > 1:
+        print("[SCAN] " + ", ".join(f"{ex} {ms:.0f} ms" for ex, ms in timings.items())
+              + f" | wall {(time.perf_counter() - started) * 1000:.0f} ms")
     if tickers is None:
         return [], []
 
-    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
-    all_above: list[dict] = []
-    near_now: list[dict] = []
-
-    for item in tickers:
-        symbol = item.get("symbol", "")
-        if not symbol.endswith("USDT"):
-            continue
-        try:
-            rate = float(item.get("fundingRate") or 0)
-            next_ft_ms = int(item.get("nextFundingTime") or 0)
-        except (ValueError, TypeError):
-            continue
-
-        if next_ft_ms == 0:
-            continue
-
-        rate_pct = rate * 100
-        # Фільтруємо: тільки негативні значення та вище порогу
-        if rate_pct >= 0 or abs(rate_pct) < threshold_pct:
-            continue
-
-        secs_to_funding = (next_ft_ms - now_ms) / 1000.0
-        entry = {"symbol": symbol, "rate": rate_pct, "secs": secs_to_funding}
-        all_above.append(entry)
-
-        if 0 <= secs_to_funding <= near_window_secs:
-            near_now.append(entry)
-
-    all_above.sort(key=lambda x: abs(x["rate"]), reverse=True)
-    near_now.sort(key=lambda x: abs(x["rate"]), reverse=True)
+    now_ms = int(exchange_now() * 1000)
+    if weights is None:
+        weights = CROSS_EXCHANGE_WEIGHTS if len(exchanges) > 1 else SCORE_WEIGHTS
+    # Фільтруємо: тільки негативні значення та вище порогу
+    all_above = scan_tickers(tickers, now_ms, min_abs_rate_pct=threshold_pct, sign=-1, weights=weights)
+    near_now = [e for e in all_above if 0 <= e["secs"] <= near_window_secs]
     return all_above, near_now
 
 
@@ -0,0 +1,92 @@
+"""
+boot_profiler.py — заміри старту застосунку: імпорти, побудова вікна, перший кадр.
+
+Модуль імпортується першим у main.py, тож відлік іде майже від старту
+інтерпретатора. mark() ставить позначку від старту, timed() міряє тривалість
+окремого кроку (наприклад, відкладеного імпорту SDK). report() друкує
+зведення і дописує заміри в BOOT_FILE, щоб регресії старту було видно в історії.
+"""
+import csv
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+BOOT_FILE = "boot_profile.csv"
+
+_started = time.perf_counter()
+_marks: list[tuple[str, float]] = []   # (позначка, мс від старту)
+_spans: list[tuple[str, float]] = []   # (крок, тривалість мс)
+_reported = False
+
+
+def elapsed_ms() -> float:
+    return (time.perf_counter() - _started) * 1000
+
+
+def mark(label: str) -> float:
+    ms = elapsed_ms()
+    _marks.append((label, ms))
+    return ms
+
+
+@contextmanager
+def timed(label: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _spans.append((label, (time.perf_counter() - started) * 1000))
+
+
+def report(path: str = BOOT_FILE):
+    """Друкує позначки й кроки та дописує їх у CSV (started_at, label, ms). Лише раз за запуск."""
+    global _reported
+    if _reported:
+        return
+    _reported = True
+
+    print("[BOOT] " + " | ".join(f"{label} {ms:.0f} ms" for label, ms in _marks))
+    for label, ms in _spans:
+        print(f"[BOOT]   {label}: {ms:.1f} ms")
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    try:
+        exists = os.path.exists(path)
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if not exists:
+                writer.writerow(["started_at", "label", "ms"])
+            for label, ms in _marks:
+                writer.writerow([started_at, label, f"{ms:.1f}"])
+            for label, ms in _spans:
+                writer.writerow([started_at, f"span:{label}", f"{ms:.1f}"])
+    except Exception as e:
+        print(f"Error writing boot profile: {e}")
+
+
+def watch_first_paint(callback=None):
+    """Після першого Paint будь-якого віджета: позначка first_paint, звіт і callback()."""
+    from PyQt6.QtCore import QEvent, QObject, QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication.instance()
+
+    class _FirstPaintFilter(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint:
+                app.removeEventFilter(self)
+                mark("first_paint")
+                # Звіт і callback — після того, як поточний кадр домалюється
+                QTimer.singleShot(0, _finish)
+            return False
+
+    def _finish():
+        report()
+        if callback:
+            callback()
+
+    paint_filter = _FirstPaintFilter(app)
+    app.installEventFilter(paint_filter)
+    return paint_filter
@@ -0,0 +1,122 @@
+"""
+candidate_prefetch.py — спекулятивний прогрів даних топ-кандидатів перед рішенням авто-режиму.
+
+Вибір символу за хвилину до фандингу тягне послідовний ланцюжок запитів:
+плече, баланс, ціна, крок qty, а потім ще оновлення даних вкладки. За
+PREFETCH_LEAD_SECS до фандингу воркер заздалегідь робить незмінну частину для
+PREFETCH_TOP_N кандидатів рейтингу: гріє метадані інструмента (крок qty),
+виставляє плече та підписує тікери на потік. Баланс і ціна змінюються, тож
+не кешуються тут: lookup() бере їх у момент рішення через кешований баланс
+і потокову ціну.
+"""
+import threading
+import time
+
+from logic import get_account_balance, get_current_price, get_qty_step, set_leverage
+from market_stream import get_market_hub
+
+
+PREFETCH_LEAD_SECS = 180.0   # сек до фандингу
+PREFETCH_TOP_N = 5           # кандидатів на вкладку
+PREFETCH_TTL = 150.0         # сек — прогрів на T-180, рішення на T-60, плюс запас
+
+
+class CandidatePrefetcher:
+    def __init__(self, ttl: float = PREFETCH_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # (id(session), біржа, symbol) -> (час, плече або None, (qty_step, leverage_ok))
+        self._entries: dict[tuple, tuple[float, float | None, tuple]] = {}
+        self._leverage: dict[tuple, float] = {}    # (id(session), symbol) -> плече, вже виставлене на біржі
+        self._owned: dict[bool, set[str]] = {}     # testnet -> символи, підписані саме прогрівом
+        self.warmed = 0
+        self.hits = 0
+        self.misses = 0
+
+    def warm(self, session, exchange: str, symbols: list[str], leverage: float | None = None) -> int:
+        """Воркер: крок qty і плече для кожного символу; повертає кількість прогрітих."""
+        if not symbols:
+            return 0
+        started = time.perf_counter()
+        testnet = getattr(session, "testnet", False)
+        if exchange == "Bybit":
+            # Тікери з потоку — тоді оновлення вкладки після вибору не йде в REST
+            try:
+                added = get_market_hub(testnet).subscribe(symbols)
+                with self._lock:
+                    self._owned.setdefault(testnet, set()).update(added)
+            except Exception as e:
+                print(f"Market stream unavailable: {e}")
+
+        done = 0
+        for symbol in symbols:
+            qty_step = get_qty_step(session, symbol, exchange)   # заодно гріє кеш інструментів
+            leverage_ok = None
+            if leverage is not None:
+                lev_key = (id(session), symbol)
+                with self._lock:
+                    already = self._leverage.get(lev_key) == leverage
+                leverage_ok = True if already else set_leverage(session, symbol, leverage, exchange)
+                if leverage_ok:
+                    with self._lock:
+                        self._leverage[lev_key] = leverage
+            with self._lock:
+                self._entries[(id(session), exchange, symbol)] = (
+                    time.time(), leverage, (qty_step, leverage_ok)
+                )
+            done += 1
+        self.warmed += done
+        print(f"[PREFETCH] {exchange}: {done} candidates in {(time.perf_counter() - started) * 1000:.0f} ms "
+              f"({', '.join(symbols)})")
+        return done
+
+    def lookup(self, session, exchange: str, symbol: str, leverage: float | None = None) -> tuple | None:
+        """
+        Воркер: (balance, price, qty_step, leverage_ok) або None, якщо символ не прогрівався,
+        прогрів застарів чи виставляв інше плече. З прогріву — лише крок qty і плече;
+        баланс (кеш BALANCE_CACHE_TTL) і ціна (з потоку на Bybit) читаються зараз.
+        """
+        with self._lock:
+            entry = self._entries.get((id(session), exchange, symbol))
+        if entry is None or time.time() - entry[0] > self.ttl or (leverage is not None and entry[1] != leverage):
+            self.misses += 1
+            return None
+        qty_step, leverage_ok = entry[2]
+        balance = get_account_balance(session, exchange)
+        price = get_current_price(session, symbol, exchange)
+        if balance is None or price is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return balance, price, qty_step, leverage_ok if leverage is not None else None
+
+    def release(self, keep=()):
+        """Після вікна фандингу: знімає власні потокові підписки (крім keep — символів вкладок) і дані."""
+        keep = {s.upper() for s in keep}
+        with self._lock:
+            owned, self._owned = self._owned, {}
+            self._entries.clear()
+        for testnet, symbols in owned.items():
+            symbols = [s for s in symbols if s not in keep]
+            if symbols:
+                try:
+                    get_market_hub(testnet).unsubscribe(symbols)
+                except Exception as e:
+                    print(f"Market stream unavailable: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "warmed": self.warmed, "hits": self.hits,
+                    "misses": self.misses, "watched": sum(len(s) for s in self._owned.values())}
+
+
+_prefetcher: CandidatePrefetcher | None = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_candidate_prefetcher() -> CandidatePrefetcher:
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = CandidatePrefetcher()
+        return _prefetcher
@@ -0,0 +1,99 @@
+"""
+client_registry.py — один клієнт біржі на (exchange, testnet, account) і спільний HTTP-пул.
+
+Вкладки, авто-сканер та імпорт отримують той самий екземпляр клієнта, тож
+.env читається один раз, а TLS-з'єднання з біржею перевикористовуються
+(keep-alive). Сирі REST-запити (тікери, інструменти) ідуть через спільну
+requests.Session з тим самим пулом.
+"""
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+POOL_CONNECTIONS = 4        # хостів у пулі
+POOL_MAXSIZE = 16           # з'єднань на хост — не менше за кількість воркерів
+
+_http_session = None
+_http_lock = threading.Lock()
+
+
+def tune_session(session: requests.Session) -> requests.Session:
+    """Пул з keep-alive, достатній для паралельних воркерів без відкидання з'єднань."""
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def shared_http_session() -> requests.Session:
+    global _http_session
+    with _http_lock:
+        if _http_session is None:
+            _http_session = tune_session(requests.Session())
+        return _http_session
+
+
+def _inner_http_session(client):
+    """requests.Session всередині клієнта pybit (client) або python-binance (session)."""
+    for name in ("client", "session"):
+        candidate = getattr(client, name, None)
+        if isinstance(candidate, requests.Session):
+            return candidate
+    return None
+
+
+class ClientRegistry:
+    def __init__(self, factory):
+        self._factory = factory            # (exchange, testnet, account) -> клієнт
+        self._lock = threading.Lock()
+        self._clients: dict[tuple, object] = {}
+        self._key_locks: dict[tuple, threading.Lock] = {}
+        self.hits = 0
+        self.builds = 0
+        self.build_ms: dict[tuple, float] = {}
+
+    def get(self, exchange: str, testnet: bool = False, account: str = "default"):
+        key = (exchange, bool(testnet), account)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.hits += 1
+                return client
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Одночасні запити того самого ключа чекають на одну побудову
+        with key_lock:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is not None:
+                    self.hits += 1
+                    return client
+            started = time.time()
+            client = self._factory(exchange, testnet, account)
+            inner = _inner_http_session(client)
+            if inner is not None:
+                tune_session(inner)
+            with self._lock:
+                self._clients[key] = client
+                self.builds += 1
+                self.build_ms[key] = (time.time() - started) * 1000
+            print(f"Client for {exchange}{' testnet' if testnet else ''} ({account}) "
+                  f"created in {self.build_ms[key]:.1f} ms")
+            return client
+
+    def peek(self, exchange: str, testnet: bool = False, account: str = "default"):
+        """Вже створений клієнт або None — без побудови (для потоку, якому не можна блокуватись)."""
+        with self._lock:
+            return self._clients.get((exchange, bool(testnet), account))
+
+    def clients(self) -> list:
+        with self._lock:
+            return list(self._clients.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"clients": len(self._clients), "hits": self.hits, "builds": self.builds,
+                    "build_ms": dict(self.build_ms)}
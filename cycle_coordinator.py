@@ -0,0 +1,148 @@
+"""
+cycle_coordinator.py — одночасний вхід усіх вкладок з однаковим дедлайном.
+
+Більшість USDT-перпів мають спільний момент фандингу, тож вкладки з однаковим
+entry_time_seconds отримують той самий дедлайн. Координатор групує їх в одну
+задачу планувальника, а в дедлайн роздає входи в обмежений пул потоків —
+останній символ більше не чекає, поки пройдуть ордери попередніх. Для кожного
+символу фіксується skew: на скільки мс пізніше за спрацювання він стартував.
+
+Дедлайни приходять у часі біржі (funding_ts − entry_time_seconds): він не
+залежить від замірів зсуву годинника, тож групування стабільне. У локальний
+час група переводиться один раз — коли ставиться в планувальник.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from funding_scheduler import get_scheduler
+from server_clock import to_local_time
+
+
+MAX_WORKERS = 8
+HISTORY_SIZE = 200
+
+
+def _group_key(deadline: float) -> float:
+    # Однаковий дедлайн біржі з точністю до мс — одна група
+    return round(deadline, 3)
+
+
+class CycleCoordinator:
+    def __init__(self, scheduler=None, max_workers: int = MAX_WORKERS):
+        self._scheduler = scheduler or get_scheduler()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="entry-fanout")
+        self._lock = threading.Lock()
+        self._groups: dict[float, dict] = {}       # дедлайн біржі -> {member: (label, callback)}
+        self._member_group: dict = {}              # member -> group_key
+        self.history = deque(maxlen=HISTORY_SIZE)  # {deadline, skew_ms: {label: ms}}
+        self._prewarm(max_workers)
+
+    def _prewarm(self, n: int):
+        """Створює всі потоки пулу заздалегідь — інакше перший вхід платить за старт потоку."""
+        barrier = threading.Barrier(n)
+        for _ in range(n):
+            self._pool.submit(barrier.wait, 1.0)
+
+    def arm(self, member, deadline: float, callback, label: str = ""):
+        """
+        Додає callback(info) учасника до групи дедлайну (час біржі); повторний arm
+        переносить його. info["deadline"] — локальний час, на який спрацювала група.
+        """
+        gkey = _group_key(deadline)
+        with self._lock:
+            self._detach_locked(member)
+            group = self._groups.setdefault(gkey, {})
+            group[member] = (label or str(member), callback)
+            self._member_group[member] = gkey
+            first = len(group) == 1
+        if first:
+            self._scheduler.schedule(("cycle", gkey), to_local_time(gkey), lambda info: self._fire_group(gkey, info))
+
+    def disarm(self, member):
+        with self._lock:
+            gkey = self._detach_locked(member)
+            empty = gkey is not None and gkey not in self._groups
+        if empty:
+            self._scheduler.cancel(("cycle", gkey))
+
+    def armed_deadline(self, member) -> float | None:
+        """Дедлайн групи учасника в часі біржі."""
+        with self._lock:
+            return self._member_group.get(member)
+
+    def _detach_locked(self, member):
+        gkey = self._member_group.pop(member, None)
+        if gkey is None:
+            return None
+        group = self._groups.get(gkey, {})
+        group.pop(member, None)
+        if not group:
+            self._groups.pop(gkey, None)
+        return gkey
+
+    def _fire_group(self, gkey, info):
+        with self._lock:
+            group = self._groups.pop(gkey, {})
+            for member in group:
+                self._member_group.pop(member, None)
+        if not group:
+            return
+
+        skews: dict[str, float] = {}
+        pending = [len(group)]
+        pending_lock = threading.Lock()
+
+        def _member_done(_future):
+            # Потік планувальника не чекає на ордери — звіт пише останній завершений вхід
+            with pending_lock:
+                pending[0] -= 1
+                if pending[0]:
+                    return
+            self._report(info, skews)
+
+        for label, callback in group.values():
+            future = self._pool.submit(self._run_member, label, callback, info, skews)
+            future.add_done_callback(_member_done)
+
+    def _report(self, info, skews):
+        self.history.append({"deadline": info["deadline"], "skew_ms": skews})
+        if len(skews) > 1:
+            parts = " ".join(f"{label}={ms:+.1f}ms" for label, ms in sorted(skews.items(), key=lambda kv: kv[1]))
+            print(f"[CYCLE FANOUT] {len(skews)} entries, max skew {max(skews.values()):.1f}ms: {parts}")
+
+    @staticmethod
+    def _run_member(label, callback, info, skews):
+        started = time.time()
+        skews[label] = (started - info["fired_at"]) * 1000
+        try:
+            callback({**info, "dispatched_at": started})
+        except Exception as e:
+            print(f"Entry for {label} failed: {e}")
+
+    def stats(self) -> dict:
+        """Середній та максимальний skew між спрацюванням групи і стартом входу символу."""
+        values = [ms for rec in list(self.history) for ms in rec["skew_ms"].values()]
+        if not values:
+            return {"cycles": 0, "mean_skew_ms": 0.0, "max_skew_ms": 0.0}
+        return {
+            "cycles": len(self.history),
+            "mean_skew_ms": sum(values) / len(values),
+            "max_skew_ms": max(values),
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+
+def get_cycle_coordinator() -> CycleCoordinator:
+    global _coordinator
+    with _coordinator_lock:
+        if _coordinator is None:
+            _coordinator = CycleCoordinator()
+        return _coordinator
@@ -0,0 +1,64 @@
+"""
+execution_engine.py — пул потоків, який виконує всі блокуючі виклики до бірж.
+
+GUI ніколи не чекає на мережу: робота йде у воркерах, а результат
+повертається через dispatcher. У GUI dispatcher — це UiBridge.post (сигнал Qt
+у головний потік), у безголовому режимі — звичайний виклик.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+MAX_WORKERS = 8
+
+
+class ExecutionEngine:
+    def __init__(self, max_workers: int = MAX_WORKERS, dispatcher=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="exchange-io")
+        self._dispatch = dispatcher or (lambda fn: fn())
+        self._lock = threading.Lock()
+        self._busy_keys: set = set()
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None, **kwargs):
+        """
+        Виконує fn(*args, **kwargs) у воркері.
+        on_done(result) / on_error(exc) викликаються через dispatcher.
+        key — якщо задача з таким ключем ще виконується, нова не ставиться (повертає None).
+        """
+        if key is not None:
+            with self._lock:
+                if key in self._busy_keys:
+                    return None
+                self._busy_keys.add(key)
+
+        def _task():
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if key is not None:
+                    with self._lock:
+                        self._busy_keys.discard(key)
+
+        future = self._pool.submit(_task)
+        future.add_done_callback(lambda f: self._deliver(f, on_done, on_error))
+        return future
+
+    def is_busy(self, key) -> bool:
+        with self._lock:
+            return key in self._busy_keys
+
+    def _deliver(self, future, on_done, on_error):
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc is not None:
+            print(f"Exchange task failed: {exc}")
+            if on_error:
+                self._dispatch(lambda: on_error(exc))
+            return
+        if on_done:
+            result = future.result()
+            self._dispatch(lambda: on_done(result))
+
+    def shutdown(self, wait: bool = False):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,213 @@
+"""
+funding_leaderboard.py — живий рейтинг монет з від'ємним фандингом для авто-режиму.
+
+Фоновий потік раз на REFRESH_SECS бере повний знімок тікерів усіх бірж сканера
+(REST, паралельно, через спільні кеші) і векторно знаходить пари (біржа, символ),
+у яких змінилась ставка або час фандингу; лише вони переставляються у
+відсортованому індексі (bisect). Верхні WATCH_TOP кандидатів Bybit додатково
+слухаються з WebSocket-хаба, тож їхні зміни потрапляють у рейтинг одразу. У момент рішення авто-режим лише читає готовий
+префікс індексу — без мережі та сортування.
+"""
+import bisect
+import threading
+import time
+
+import numpy as np
+
+from funding_scanner import columns_for
+from market_stream import get_market_hub
+from server_clock import exchange_now
+from ticker_cache import SCAN_EXCHANGES, get_exchange_tickers
+
+
+REFRESH_SECS = 10.0         # період повного знімка всіх тікерів
+WATCH_TOP = 30              # кандидатів, яких додатково слухаємо потоком
+STALE_SECS = 3 * REFRESH_SECS
+
+
+class FundingLeaderboard:
+    def __init__(self, exchanges: tuple[str, ...] = SCAN_EXCHANGES, testnet: bool = False, hub=None,
+                 refresh: float = REFRESH_SECS, watch_top: int = WATCH_TOP):
+        self.exchanges = tuple(exchanges)
+        self.testnet = testnet
+        self._hub = hub
+        self.refresh = refresh
+        self.watch_top = watch_top
+        self._lock = threading.Lock()
+        self._order: list[tuple[float, str, str]] = []    # (rate %, біржа, symbol) за зростанням: найвід'ємніша перша
+        self._entries: dict[tuple[str, str], tuple[float, int]] = {}  # (біржа, symbol) -> (rate %, nextFundingTime мс)
+        self._rows: dict[tuple[str, str], int] = {}       # (біржа, symbol) -> рядок останнього знімка (інтервал, ціна)
+        self._prev_cols = None
+        self._owned: set[str] = set()                     # символи, які підписав саме рейтинг
+        self._stop = threading.Event()
+        self._thread = None
+        self.updated_at = 0.0
+        self.snapshots = 0
+        self.updates = 0
+
+    # ---- Життєвий цикл ------------------------------------------------- #
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop = threading.Event()   # свій на кожен запуск — попередній потік доспить і вийде
+        if self._hub is not None:
+            self._hub.add_ticker_listener(self._on_stream_ticker)
+        self._thread = threading.Thread(target=self._loop, args=(self._stop,), name="FundingLeaderboard", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Пауза: знімки не качаються, потокові підписки рейтингу знімаються."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread = None
+        if self._hub is not None:
+            self._hub.remove_ticker_listener(self._on_stream_ticker)
+            self._hub.unsubscribe(list(self._owned))
+        self._owned.clear()
+
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def _loop(self, stop: threading.Event):
+        while not stop.is_set():
+            tickers, _ = get_exchange_tickers(self.exchanges, self.testnet, max_age=self.refresh / 2)
+            if tickers is not None and not stop.is_set():
+                self.apply_snapshot(tickers)
+            stop.wait(self.refresh)
+
+    # ---- Оновлення ----------------------------------------------------- #
+
+    def _update_locked(self, key: tuple[str, str], rate_pct: float, next_ft_ms: int) -> bool:
+        old = self._entries.get(key)
+        if old == (rate_pct, next_ft_ms):
+            return False
+        if old is not None and old[0] < 0 and old[1]:
+            i = bisect.bisect_left(self._order, (old[0], *key))
+            if i < len(self._order) and self._order[i] == (old[0], *key):
+                self._order.pop(i)
+        self._entries[key] = (rate_pct, next_ft_ms)
+        if rate_pct < 0 and next_ft_ms:
+            bisect.insort(self._order, (rate_pct, *key))
+        self.updates += 1
+        return True
+
+    def update(self, exchange: str, symbol: str, rate_pct: float, next_ft_ms: int) -> bool:
+        with self._lock:
+            return self._update_locked((exchange, symbol), rate_pct, next_ft_ms)
+
+    def apply_snapshot(self, tickers: list[dict]):
+        """Переставляє лише пари (біржа, символ), що змінились з попереднього знімка."""
+        cols = columns_for(tickers)
+        prev = self._prev_cols
+        if prev is cols:
+            return
+        keys = list(zip(cols.exchanges, cols.symbols))
+        same_rows = prev is not None and prev.symbols == cols.symbols and prev.exchanges == cols.exchanges
+        if same_rows:
+            changed = np.flatnonzero((cols.rate_pct != prev.rate_pct) | (cols.next_ft_ms != prev.next_ft_ms))
+            gone = ()
+        else:
+            changed = range(len(cols))
+            with self._lock:
+                gone = set(self._entries) - set(keys)
+
+        with self._lock:
+            for key in gone:
+                self._update_locked(key, 0.0, 0)
+                del self._entries[key]
+            for i in changed:
+                self._update_locked(keys[i], float(cols.rate_pct[i]), int(cols.next_ft_ms[i]))
+            if not same_rows:
+                self._rows = {key: i for i, key in enumerate(keys)}
+            self._prev_cols = cols
+            self.updated_at = time.time()
+            self.snapshots += 1
+        self._rewatch()
+
+    def _on_stream_ticker(self, symbol: str, ticker: dict):
+        key = ("Bybit", symbol)
+        if key not in self._entries:
+            return
+        try:
+            rate_pct = float(ticker.get("fundingRate") or 0) * 100
+            next_ft_ms = int(ticker.get("nextFundingTime") or 0)
+        except (ValueError, TypeError):
+            return
+        self.update("Bybit", symbol, rate_pct, next_ft_ms)
+
+    def _rewatch(self):
+        """Потоком слухаємо поточний топ; власні підписки, що випали з топу, знімаємо."""
+        if self._hub is None:
+            return
+        with self._lock:
+            top = {symbol for _, exchange, symbol in self._order[:self.watch_top] if exchange == "Bybit"}
+        added = self._hub.subscribe(top - self._owned)
+        dropped = [s for s in self._owned if s not in top]
+        if dropped:
+            self._hub.unsubscribe(dropped)
+        self._owned = (self._owned - set(dropped)) | set(added)
+
+    # ---- Читання ------------------------------------------------------- #
+
+    def age(self) -> float:
+        return time.time() - self.updated_at if self.updated_at else float("inf")
+
+    def is_fresh(self) -> bool:
+        return self.age() <= STALE_SECS
+
+    def ranking(self, threshold_pct: float, near_window_secs: float = 60.0,
+                now_ms: int | None = None) -> tuple[list[dict], list[dict]]:
+        """
+        Той самий формат, що й scan_funding_opportunities:
+        all_above — rate <= -threshold_pct за |rate| DESC, near_now — з них ті, де до фандингу <= near_window_secs.
+        Порядок збігається зі scan_funding_opportunities(..., weights=RATE_ONLY) — запасним
+        шляхом авто-режиму, коли рейтинг ще не зібраний або застарів.
+        """
+        now_ms = int(exchange_now() * 1000) if now_ms is None else now_ms
+        with self._lock:
+            end = bisect.bisect_right(self._order, -threshold_pct, key=lambda e: e[0])
+            cols = self._prev_cols
+            top = [(exchange, symbol, rate, self._entries[(exchange, symbol)][1], self._rows.get((exchange, symbol)))
+                   for rate, exchange, symbol in self._order[:end]]
+        all_above = [
+            {
+                "symbol": symbol,
+                "exchange": exchange,
+                "rate": rate,
+                "secs": (ft - now_ms) / 1000.0,
+                "interval": (float(cols.interval_h[row]) or None) if row is not None else None,
+                "price": float(cols.price[row]) if row is not None else 0.0,
+            }
+            for exchange, symbol, rate, ft, row in top
+        ]
+        near_now = [e for e in all_above if 0 <= e["secs"] <= near_window_secs]
+        return all_above, near_now
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"symbols": len(self._entries), "negative": len(self._order), "snapshots": self.snapshots,
+                    "updates": self.updates, "watched": len(self._owned), "age_s": self.age()}
+
+
+_boards: dict[bool, FundingLeaderboard] = {}
+_boards_lock = threading.Lock()
+
+
+def get_funding_leaderboard(testnet: bool = False) -> FundingLeaderboard:
+    """Спільний рейтинг для mainnet або testnet (не запускається сам — див. start())."""
+    with _boards_lock:
+        board = _boards.get(testnet)
+        if board is None:
+            board = FundingLeaderboard(SCAN_EXCHANGES, testnet, get_market_hub(testnet))
+            _boards[testnet] = board
+        return board
+
+
+def stop_funding_leaderboards():
+    """Пауза всіх уже створених рейтингів (нові не створюються)."""
+    with _boards_lock:
+        boards = list(_boards.values())
+    for board in boards:
+        board.stop()
@@ -0,0 +1,162 @@
+"""
+funding_scanner.py — векторизований сканер фандингу по знімку тікерів.
+
+Payload тікерів розбирається один раз у колонки NumPy (ставка, час фандингу,
+оборот, спред bid/ask, відкритий інтерес); повторні скани того самого знімка
+беруть готові колонки. Фільтр — булеві маски, ранжування — зважений бал, top-K —
+argpartition без повного сортування. Спільний для авто-сканера GUI та
+рекордера статистики. Знімок може містити рядки кількох бірж (поле "exchange",
+див. ticker_cache.get_exchange_tickers) — вони ранжуються разом.
+"""
+import threading
+
+import numpy as np
+
+
+# Ваги складових балу; кожна складова нормована до [0, 1] серед кандидатів
+SCORE_WEIGHTS = {"rate": 1.0, "turnover": 0.25, "open_interest": 0.1, "spread": -0.2}
+RATE_ONLY = {"rate": 1.0}   # ранжування лише за |ставкою|
+# Між біржами: відкритий інтерес Binance одним запитом недоступний, тож його не зважуємо
+CROSS_EXCHANGE_WEIGHTS = {"rate": 1.0, "turnover": 0.25, "spread": -0.2}
+
+
+def _column(items, key, dtype=np.float64):
+    """Колонка з рядкових полів; порожні та биті значення → 0."""
+    raw = [it.get(key) or 0 for it in items]
+    try:
+        return np.array(raw, dtype=dtype)
+    except (ValueError, TypeError):
+        out = np.zeros(len(raw), dtype=dtype)
+        for i, v in enumerate(raw):
+            try:
+                out[i] = dtype(float(v))
+            except (ValueError, TypeError):
+                pass
+        return out
+
+
+class TickerColumns:
+    """Колонкове представлення знімка тікерів (лише символи з потрібною котирувальною валютою)."""
+
+    def __init__(self, tickers: list[dict], quote: str = "USDT"):
+        items = [t for t in tickers if t.get("symbol", "").endswith(quote)]
+        self.items = items
+        self.symbols = [t["symbol"] for t in items]
+        self.exchanges = [t.get("exchange", "Bybit") for t in items]
+        self.rate_pct = _column(items, "fundingRate") * 100
+        self.next_ft_ms = _column(items, "nextFundingTime", np.int64)
+        self.interval_h = _column(items, "fundingIntervalHour")   # 0 — невідомо
+        self.price = _column(items, "lastPrice")
+        self.turnover = _column(items, "turnover24h")
+        self.open_interest = _column(items, "openInterestValue")
+        bid = _column(items, "bid1Price")
+        ask = _column(items, "ask1Price")
+        mid = (bid + ask) / 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spread = np.where((bid > 0) & (ask > 0), (ask - bid) / mid * 100, np.inf)
+        self.spread_pct = spread
+
+    def __len__(self):
+        return len(self.items)
+
+
+_columns_lock = threading.Lock()
+_columns_cache: list[tuple] = []   # [(список тікерів, quote, TickerColumns)], останній — найсвіжіший
+COLUMNS_CACHE_SIZE = 4             # Bybit-знімок рекордера, зведений крос-біржовий тощо
+
+
+def columns_for(tickers: list[dict], quote: str = "USDT") -> TickerColumns:
+    """Колонки для знімка; той самий список (кеш тікерів віддає його до оновлення) не розбирається вдруге."""
+    with _columns_lock:
+        for cached in _columns_cache:
+            if cached[0] is tickers and cached[1] == quote:
+                return cached[2]
+    cols = TickerColumns(tickers, quote)
+    with _columns_lock:
+        _columns_cache.append((tickers, quote, cols))
+        del _columns_cache[:-COLUMNS_CACHE_SIZE]
+    return cols
+
+
+def _normalized(values: np.ndarray) -> np.ndarray:
+    finite = np.isfinite(values)
+    if not finite.any():
+        return np.ones_like(values)
+    peak = values[finite].max()
+    if peak <= 0:
+        return np.where(finite, 0.0, 1.0)
+    return np.where(finite, values / peak, 1.0)
+
+
+def score(cols: TickerColumns, idx: np.ndarray, weights: dict = SCORE_WEIGHTS) -> np.ndarray:
+    """Зважений бал для рядків idx."""
+    parts = {
+        "rate": lambda: _normalized(np.abs(cols.rate_pct[idx])),
+        "turnover": lambda: _normalized(np.log10(1 + cols.turnover[idx])),
+        "open_interest": lambda: _normalized(np.log10(1 + cols.open_interest[idx])),
+        "spread": lambda: _normalized(cols.spread_pct[idx]),
+    }
+    total = np.zeros(len(idx))
+    for name, weight in weights.items():
+        if weight:
+            total += weight * parts[name]()
+    return total
+
+
+def scan_tickers(
+    tickers: list[dict],
+    now_ms: int,
+    min_abs_rate_pct: float = 0.0,
+    sign: int = 0,
+    min_secs: float | None = None,
+    max_secs: float | None = None,
+    top_k: int | None = None,
+    weights: dict = SCORE_WEIGHTS,
+    quote: str = "USDT",
+) -> list[dict]:
+    """
+    Кандидати, відсортовані за балом DESC.
+
+    sign: -1 — лише від'ємні ставки, 1 — лише додатні, 0 — обидві.
+    min_secs / max_secs — межі (включно) часу до фандингу в секундах.
+    Кожен результат: {"symbol", "exchange", "rate" (%), "secs", "interval" (год або None),
+    "price", "score", "item" (вихідний тікер)}.
+    """
+    cols = columns_for(tickers, quote)
+    if not len(cols):
+        return []
+
+    secs = (cols.next_ft_ms - now_ms) / 1000.0
+    mask = (cols.next_ft_ms != 0) & (np.abs(cols.rate_pct) >= min_abs_rate_pct)
+    if sign < 0:
+        mask &= cols.rate_pct < 0
+    elif sign > 0:
+        mask &= cols.rate_pct > 0
+    if min_secs is not None:
+        mask &= secs >= min_secs
+    if max_secs is not None:
+        mask &= secs <= max_secs
+
+    idx = np.flatnonzero(mask)
+    if not len(idx):
+        return []
+    scores = score(cols, idx, weights)
+
+    if top_k is not None and top_k < len(idx):
+        keep = np.argpartition(-scores, top_k - 1)[:top_k]
+        idx, scores = idx[keep], scores[keep]
+    order = np.argsort(-scores, kind="stable")
+
+    return [
+        {
+            "symbol": cols.symbols[i],
+            "exchange": cols.exchanges[i],
+            "rate": float(cols.rate_pct[i]),
+            "secs": float(secs[i]),
+            "interval": float(cols.interval_h[i]) or None,
+            "price": float(cols.price[i]),
+            "score": float(scores[j]),
+            "item": cols.items[i],
+        }
+        for j, i in ((j, idx[j]) for j in order)
+    ]
@@ -0,0 +1,127 @@
+"""
+funding_scheduler.py — планувальник точних дедлайнів для входу перед фандингом.
+
+Окремий потік чекає на найближчий дедлайн через Condition.wait(), а останні
+мілісекунди доспінює активним очікуванням, тож callback стартує з точністю
+до ~1 мс незалежно від 1 Гц таймерів та затримок GUI. Для кожного спрацювання
+записується похибка (фактичний момент − дедлайн).
+"""
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+
+SPIN_WINDOW = 0.003  # сек — останній відрізок перед дедлайном чекаємо активно
+HISTORY_SIZE = 500
+
+
+class _Job:
+    __slots__ = ("key", "deadline", "callback", "cancelled")
+
+    def __init__(self, key, deadline, callback):
+        self.key = key
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+
+class DeadlineScheduler:
+    def __init__(self, clock=time.time, spin_window: float = SPIN_WINDOW):
+        self._clock = clock
+        self.spin_window = spin_window
+        self._cond = threading.Condition()
+        self._heap: list = []
+        self._jobs: dict = {}
+        self._seq = itertools.count()
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="DeadlineScheduler", daemon=True)
+        self._thread.start()
+
+    def schedule(self, key, deadline: float, callback):
+        """Планує callback(job_info) на абсолютний час deadline; замінює попередню задачу з тим самим key."""
+        with self._cond:
+            old = self._jobs.get(key)
+            if old:
+                old.cancelled = True
+            job = _Job(key, deadline, callback)
+            self._jobs[key] = job
+            heapq.heappush(self._heap, (deadline, next(self._seq), job))
+            self._cond.notify()
+        return job
+
+    def cancel(self, key):
+        with self._cond:
+            job = self._jobs.pop(key, None)
+            if job:
+                job.cancelled = True
+                self._cond.notify()
+
+    def scheduled_deadline(self, key) -> float | None:
+        with self._cond:
+            job = self._jobs.get(key)
+            return job.deadline if job else None
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        errors = [abs(h["error_ms"]) for h in list(self.history)]
+        if not errors:
+            return {"count": 0, "mean_abs_ms": 0.0, "max_abs_ms": 0.0}
+        return {
+            "count": len(errors),
+            "mean_abs_ms": sum(errors) / len(errors),
+            "max_abs_ms": max(errors),
+        }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and (not self._heap or self._heap[0][2].cancelled):
+                    if self._heap:
+                        heapq.heappop(self._heap)
+                        continue
+                    self._cond.wait()
+                if not self._running:
+                    return
+                deadline, _, job = self._heap[0]
+                remaining = deadline - self._clock()
+                if remaining > self.spin_window:
+                    # Прокидаємось трохи раніше; новий ближчий дедлайн розбудить через notify()
+                    self._cond.wait(remaining - self.spin_window)
+                    continue
+                heapq.heappop(self._heap)
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+
+            while self._clock() < deadline:
+                pass
+            fired_at = self._clock()
+            info = {
+                "key": job.key,
+                "deadline": deadline,
+                "fired_at": fired_at,
+                "error_ms": (fired_at - deadline) * 1000,
+            }
+            self.history.append(info)
+            try:
+                job.callback(info)
+            except Exception as e:
+                print(f"Scheduled job {job.key} failed: {e}")
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> DeadlineScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = DeadlineScheduler()
+        return _scheduler
@@ -12,7 +12,6 @@ gui.py — головне вікно застосунку FundingTrader.
 
 import os
 import math
-import time
 import csv
 import subprocess
 import sys
@@ -26,39 +25,66 @@ from PyQt6.QtWidgets import (
     QDialog, QDialogButtonBox, QTextEdit, QAbstractItemView,
     QScrollBar,
 )
-from PyQt6.QtCore import QTimer, Qt, QUrl
+from PyQt6.QtCore import QTimer, Qt, QUrl, QObject, pyqtSignal, pyqtSlot
 from PyQt6.QtGui import QIcon
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
 from PyQt6.QtGui import QColor
 
 from logic import (
-    get_account_balance, get_funding_data, get_current_price,
-    get_next_funding_time, place_market_order, get_symbol_info,
-    place_limit_close_order, update_ping, initialize_client,
-    close_all_positions, get_optimal_limit_price, get_candle_open_price,
-    place_stop_loss_order, get_order_execution_price,
+    get_account_balance, get_current_price,
+    get_next_funding_time,
+    measure_ping, show_ping, initialize_client, existing_client,
+    close_all_positions, get_candle_open_price,
+    place_stop_loss_order,
     set_leverage,
     get_qty_step,
     get_closed_trades,
 )
+from private_stream import stop_private_streams
 from translations import translations
 import settings_manager as sm
 import stats_manager as stats
 from auto_scanner import scan_funding_opportunities, format_funding_time
+from funding_leaderboard import get_funding_leaderboard, stop_funding_leaderboards
+from funding_scanner import RATE_ONLY
+from candidate_prefetch import PREFETCH_LEAD_SECS, PREFETCH_TOP_N, get_candidate_prefetcher
 from tab_data import build_tab_data
-import stats_funding
 from funding_analysis import FundingAnalysisDialog
+from latency_dialog import LatencyDialog
+from latency_tracker import tracker as latency_tracker
+from market_stream import stop_market_hubs
+from instrument_cache import get_instrument_cache
+from cycle_coordinator import get_cycle_coordinator
+from server_clock import exchange_now
+from ticker_cache import SCAN_EXCHANGES
+from execution_engine import ExecutionEngine
+import boot_profiler
+from strategy import EntryCycle, fetch_tab_snapshot
+
+MAX_AUTO_TABS = 5              # вкладок, які авто-скан створює за один раз
+TAB_SHELL_POOL_SIZE = MAX_AUTO_TABS   # готових порожніх вкладок про запас
 
 # ---------------------------------------------------------------------------
 # Допоміжні класи
 # ---------------------------------------------------------------------------
 
-class SilentWebEnginePage(QWebEnginePage):
-    """Сторінка WebView, яка ігнорує (не виводить у консоль) JS-повідомлення."""
-    def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
-        # Порожній метод для придушення виводу в термінал
-        pass
+class UiBridge(QObject):
+    """Передає виклики з фонових потоків у GUI-потік через сигнал Qt (queued connection)."""
+    _invoke = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        self._invoke.connect(self._run)
+
+    def post(self, fn):
+        self._invoke.emit(fn)
+
+    @pyqtSlot(object)
+    def _run(self, fn):
+        try:
+            fn()
+        except Exception as e:
+            print(f"UI callback error: {e}")
+
 
 # ---------------------------------------------------------------------------
 # Головне вікно
@@ -72,7 +98,21 @@ class FundingTraderApp(QMainWindow):
         self.trans = translations[self.language]
         self.disable_funding_trades = sm.load_disable_trades(self.settings_path)
         self.collect_funding_stats = sm.load_collect_funding_stats(self.settings_path)
-        self._funding_stats_process = None
+        self.prewarm_lead = sm.load_prewarm_lead(self.settings_path)
+        self._funding_stats_process = None
+        self._ui = UiBridge()
+        # Усі мережеві виклики — у воркерах; результати повертаються сигналом у GUI-потік
+        self._engine = ExecutionEngine(dispatcher=self._ui.post)
+        self._cycle = EntryCycle(
+            self._engine, self._ui.post,
+            lambda delay, fn: QTimer.singleShot(int(delay * 1000), fn),
+            prewarm_lead=self.prewarm_lead,
+            is_active=lambda td: td in self.tab_data_list,
+            trading_blocked=lambda: self.disable_funding_trades,
+            on_limit_mismatch=self._show_limit_mismatch,
+            on_trade_imported=self._update_stats_table,
+            on_position_closed=lambda td: self._update_stats_table(),
+        )
 
         self.setWindowTitle(self.trans["window_title"].format(exchange))
         self.setGeometry(100, 100, 1800, 1000)
@@ -93,20 +133,33 @@ class FundingTraderApp(QMainWindow):
 
         self.tab_data_list: list[dict] = []
         self.tab_count = 0
+        # WebView створюються лише для видимої вкладки і перевикористовуються;
+        # сам пул (і імпорт QtWebEngine) — у _warm_up після першого кадру
+        self._web_pool = None
+        self._warmed_up = False
+        self.tab_widget.currentChanged.connect(self._on_current_tab_changed)
 
         # Додати поля для глобального авто-сканера
         self._auto_scan_results: list = []
         self._auto_scan_near_now: list = []
         self._auto_scan_done_this_minute: bool = False
+        self._prefetch_done_this_hour: bool = False
+        self._client_errors: set = set()   # (біржа, testnet), для яких клієнт не створився (немає ключів)
+        self._tab_shells: list = []   # [(QWidget, tab_data)] — заготовки вкладок поза tab_widget
 
         # Один глобальний таймер сканування
         self._global_scan_timer = QTimer()
         self._global_scan_timer.timeout.connect(self._global_auto_scan_tick)
         self._global_scan_timer.start(1000)
 
+        # Метадані інструментів: файл читається одразу, оновлення — у фоні
+        get_instrument_cache(exchange, testnet, session)
+
         loaded = sm.load_settings(self.settings_path)
         initial = loaded[0] if loaded else {}
-        self.add_new_tab(session=session, testnet=testnet, exchange=exchange, settings=initial)
+        # session=None — перша вкладка підключається у _warm_up, вже після показу вікна
+        self.add_new_tab(session=session, testnet=testnet, exchange=exchange, settings=initial,
+                         connect=session is not None)
 
         self._init_stats_tab()
         stats.initialize_stats_csv()
@@ -133,12 +186,61 @@ class FundingTraderApp(QMainWindow):
         
         self._init_disable_trades_ui()
         top_bar.addWidget(self.disable_trades_checkbox)
+
+        top_bar.addSpacing(30)
+
+        self.latency_btn = QPushButton(self.trans["latency_button"])
+        self.latency_btn.clicked.connect(self._open_latency_dialog)
+        top_bar.addWidget(self.latency_btn)
         
         top_bar.addStretch()
 
         self.main_layout.addLayout(top_bar)
         self.main_layout.addWidget(self.tab_widget)
         self._save()
+        boot_profiler.watch_first_paint(self._warm_up)
+
+    def _warm_up(self):
+        """Після першого кадру: QtWebEngine, сесії, вид поточної вкладки та перші дані всіх вкладок."""
+        with boot_profiler.timed("import QtWebEngine"):
+            from web_view_pool import WebViewPool
+        self._web_pool = WebViewPool(self)
+        self._warmed_up = True
+        self._on_current_tab_changed(self.tab_widget.currentIndex())
+        for td in self.tab_data_list:
+            if td["session"] is None:
+                self._connect_tab(td)
+            else:
+                self._update_tab_funding_data(td, refresh_web=False)
+
+    def _connect_tab(self, tab_data, refresh_web=False):
+        """Сесія вкладки у воркері: перший клієнт тягне імпорт SDK біржі й dotenv."""
+        exchange, testnet = tab_data["exchange"], tab_data["testnet"]
+        self._engine.submit(
+            initialize_client, exchange, testnet,
+            on_done=lambda session: self._on_tab_connected(tab_data, session, exchange, testnet, refresh_web),
+            on_error=lambda e: self._set_tab_labels_error(tab_data) if tab_data in self.tab_data_list else None,
+            key=("connect", id(tab_data)),
+        )
+
+    def _on_tab_connected(self, tab_data, session, exchange, testnet, refresh_web=False):
+        if tab_data not in self.tab_data_list or tab_data["session"] is not None:
+            return
+        if (tab_data["exchange"], tab_data["testnet"]) != (exchange, testnet):
+            # Біржу / testnet змінили, поки будувався клієнт — потрібен інший
+            self._connect_tab(tab_data, refresh_web)
+            return
+        tab_data["session"] = session
+        get_instrument_cache(exchange, testnet, session)
+        self._update_tab_funding_data(tab_data, refresh_web=refresh_web)
+
+    def _reconnect_tab(self, tab_data):
+        """Біржа чи testnet вкладки змінились: озброєний вхід знімається, нова сесія — у воркері."""
+        get_cycle_coordinator().disarm(id(tab_data))
+        tab_data["entry_deadline"] = None
+        tab_data["funding_data"] = None
+        tab_data["session"] = None
+        self._connect_tab(tab_data, refresh_web=True)
 
     # ------------------------------------------------------------------ #
     #  Ініціалізація вікна                                                #
@@ -447,15 +549,19 @@ class FundingTraderApp(QMainWindow):
 
     def _open_funding_analysis(self):
         dialog = FundingAnalysisDialog(
-            stats_funding.STATS_FILE,
+            stats.FUNDING_STATS_FILE,
             title=self.trans["observation_analysis_title"],
             parent=self,
         )
         dialog.exec()
 
+    def _open_latency_dialog(self):
+        dialog = LatencyDialog(latency_tracker, title=self.trans["latency_title"], parent=self)
+        dialog.exec()
+
     def _update_observation_table(self):
         self.observation_table.blockSignals(True)
-        stats_file = stats_funding.STATS_FILE
+        stats_file = stats.FUNDING_STATS_FILE
         if not os.path.exists(stats_file):
             self.observation_table.setRowCount(0)
             self.observation_table.blockSignals(False)
@@ -596,7 +702,12 @@ class FundingTraderApp(QMainWindow):
         tab_idx = combo.currentIndex()
         td      = self.tab_data_list[tab_idx]
 
-        trades = get_closed_trades(td["session"], td["exchange"], limit=limit)
+        self._engine.submit(
+            get_closed_trades, td["session"], td["exchange"], limit=limit,
+            on_done=self._on_trades_imported,
+        )
+
+    def _on_trades_imported(self, trades):
         if not trades:
             QMessageBox.warning(self, "Імпорт", "Не знайдено угод або помилка отримання даних.")
             return
@@ -620,12 +731,23 @@ class FundingTraderApp(QMainWindow):
         return list_idx + 1
 
 
-    def add_new_tab(self, session=None, testnet=None, exchange=None, settings=None):
-        self.tab_count += 1
+    def add_new_tab(self, session=None, testnet=None, exchange=None, settings=None, connect=True):
+        tab, tab_data = self._build_tab_shell(settings, session, testnet, exchange, connect)
+        self._show_tab(tab, tab_data)
+        return tab_data
+
+    def _build_tab_shell(self, settings=None, session=None, testnet=None, exchange=None, connect=True):
+        """Повністю побудована вкладка поза tab_widget: UI і таймери є, таймери не запущені."""
         tab = QWidget()
         tab_layout = QVBoxLayout(tab)
-        tab_data = build_tab_data(settings or {}, session, testnet, exchange)
+        tab_data = build_tab_data(settings or {}, session, testnet, exchange, connect)
+        tab_data["tab_page"] = tab
         self._create_tab_ui(tab_layout, tab_data)
+        self._init_tab_timers(tab_data)
+        return tab, tab_data
+
+    def _show_tab(self, tab, tab_data):
+        self.tab_count += 1
         self.tab_data_list.append(tab_data)
 
         # Вставляємо ПЕРЕД + вкладкою і ПЕРЕД Statistics
@@ -638,9 +760,85 @@ class FundingTraderApp(QMainWindow):
         self.tab_widget.insertTab(stats_idx, tab, self.trans["tab_title"].format(self.tab_count))
         self.tab_widget.setCurrentWidget(tab)
         tab_data["tab_index"] = self.tab_count
-        self._init_tab_timers(tab_data)
-        self._update_tab_funding_data(tab_data)
-        return tab_data
+        self._start_tab_timers(tab_data)
+        if self._warmed_up:
+            self._update_tab_funding_data(tab_data)
+
+    # ---- Пул готових вкладок для авто-спавну -------------------------- #
+
+    def _spawn_sessions(self):
+        """Біржа -> сесія, з якою авто-скан відкриє вкладку: шаблонна або вже створений клієнт."""
+        template = self.tab_data_list[0] if self.tab_data_list else None
+        if template is None or template.get("session") is None:
+            return {}
+        sessions = {template["exchange"]: template["session"]}
+        for exchange in SCAN_EXCHANGES:
+            if exchange not in sessions:
+                session = existing_client(exchange, template["testnet"])
+                if session is not None:
+                    sessions[exchange] = session
+        return sessions
+
+    def _fill_tab_shell_pool(self):
+        """Тиха пора: добудовує одну вкладку-заготовку на виклик під кожну біржу, що має клієнт."""
+        if not self._warmed_up:
+            return
+        sessions = self._spawn_sessions()
+        if not sessions:
+            return   # шаблонна вкладка ще підключається
+        # Заготовки під стару сесію (у шаблоні змінили біржу / testnet) вже не знадобляться
+        live = {id(s) for s in sessions.values()}
+        stale = [shell for shell in self._tab_shells if id(shell[1]["session"]) not in live]
+        for tab, _ in stale:
+            tab.deleteLater()
+        self._tab_shells = [shell for shell in self._tab_shells if id(shell[1]["session"]) in live]
+        for exchange, session in sessions.items():
+            pooled = sum(1 for _, td in self._tab_shells if td["session"] is session)
+            if pooled < TAB_SHELL_POOL_SIZE:
+                settings = {"exchange": exchange, "testnet": self.tab_data_list[0]["testnet"], "auto_mode": False}
+                self._tab_shells.append(self._build_tab_shell(settings, session))
+                return
+
+    def _take_tab_shell(self, settings, session):
+        """Заготовка з пулу, перев'язана на settings; None — під цю сесію заготовок немає."""
+        for i, (tab, tab_data) in enumerate(self._tab_shells):
+            if tab_data["session"] is session:
+                self._tab_shells.pop(i)
+                break
+        else:
+            return None
+        tab_data.update(build_tab_data(settings, session))
+        self._sync_tab_widgets(tab_data)
+        return tab, tab_data
+
+    def _sync_tab_widgets(self, tab_data):
+        """Виставляє віджети за станом вкладки без сигналів — жодних _save() і запитів."""
+        values = (
+            ("exchange_combobox",            "setCurrentText",  tab_data["exchange"]),
+            ("testnet_checkbox",             "setChecked",      tab_data["testnet"]),
+            ("coin_input",                   "setText",         tab_data["selected_symbol"]),
+            ("entry_time_spinbox",           "setValue",        tab_data["entry_time_seconds"]),
+            ("qty_spinbox",                  "setValue",        tab_data["qty"]),
+            ("profit_percentage_spinbox",    "setValue",        tab_data["profit_percentage"]),
+            ("profit_percentage_slider",     "setValue",        int(tab_data["profit_percentage"] * 100)),
+            ("auto_limit_checkbox",          "setChecked",      tab_data["auto_limit"]),
+            ("attach_tp_checkbox",           "setChecked",      tab_data["attach_take_profit"]),
+            ("leverage_spinbox",             "setValue",        tab_data["leverage"]),
+            ("stop_loss_enabled_checkbox",   "setChecked",      tab_data["stop_loss_enabled"]),
+            ("stop_loss_percentage_spinbox", "setValue",        tab_data["stop_loss_percentage"]),
+            ("stop_addon_pct_spin",          "setValue",        tab_data.get("stop_addon_pct", 0.5)),
+            ("reverse_side_checkbox",        "setChecked",      tab_data["reverse_side"]),
+            ("auto_mode_combo",              "setCurrentIndex", 1 if tab_data.get("auto_mode") else 0),
+            ("auto_threshold_spin",          "setValue",        tab_data.get("auto_min_funding", 0.05)),
+            ("auto_profit_addon_spin",       "setValue",        tab_data.get("auto_profit_addon", 0.3)),
+            ("auto_balance_pct_spin",        "setValue",        tab_data.get("auto_balance_pct", 30.0)),
+            ("auto_eco_mode_checkbox",       "setChecked",      tab_data.get("auto_eco_mode", False)),
+        )
+        for key, setter, value in values:
+            widget = tab_data[key]
+            widget.blockSignals(True)
+            getattr(widget, setter)(value)
+            widget.blockSignals(False)
 
     # ---- Компоновка UI вкладки ---------------------------------------- #
 
@@ -657,6 +855,7 @@ class FundingTraderApp(QMainWindow):
         self._add_qty_ui(left_l, tab_data)
         self._add_profit_percentage_ui(left_l, tab_data)
         self._add_auto_limit_ui(left_l, tab_data)
+        self._add_attach_tp_ui(left_l, tab_data)
         self._add_leverage_ui(left_l, tab_data)
         self._add_stop_loss_ui(left_l, tab_data)
         self._add_stop_addon_ui(left_l, tab_data)
@@ -774,6 +973,13 @@ class FundingTraderApp(QMainWindow):
         tab_data["auto_limit_label"] = label
         tab_data["auto_limit_checkbox"] = cb
 
+    def _add_attach_tp_ui(self, layout, tab_data):
+        cb = QCheckBox(self.trans["attach_tp_checkbox"])
+        cb.setChecked(tab_data["attach_take_profit"])
+        cb.stateChanged.connect(lambda s: self._on_attach_tp_changed(tab_data, s))
+        layout.addWidget(cb)
+        tab_data["attach_tp_checkbox"] = cb
+
     def _add_leverage_ui(self, layout, tab_data):
         label = QLabel(self.trans["leverage_label"])
         spin = QDoubleSpinBox()
@@ -862,31 +1068,41 @@ class FundingTraderApp(QMainWindow):
     # ---- WebView ------------------------------------------------------- #
 
     def _add_funding_web_view(self, layout, tab_data):
-        profile = QWebEngineProfile(f"BybitProfile_{self.tab_count}", self)
-        cache_path = os.path.join(os.getcwd(), "webcache", f"tab_{self.tab_count}")
-        os.makedirs(cache_path, exist_ok=True)
-        profile.setCachePath(cache_path)
-        profile.setPersistentStoragePath(cache_path)
-        profile.setPersistentCookiesPolicy(
-            QWebEngineProfile.PersistentCookiesPolicy.AllowPersistentCookies
-        )
-        view = QWebEngineView()
-        view.setPage(SilentWebEnginePage(profile, view))
-        view.setMinimumHeight(150)
-        tab_data["funding_web_view"] = view
-        tab_data["web_profile"] = profile
-        layout.addWidget(view)
-        self._refresh_web_view(tab_data)
+        # Сам вид береться з пулу, коли вкладка стає видимою
+        tab_data["web_layout"] = layout
+        tab_data["web_url"] = None
 
     def _refresh_web_view(self, tab_data):
-        if tab_data not in self.tab_data_list:
+        if tab_data not in self.tab_data_list or self._web_pool is None:
             return
-        symbol = tab_data["selected_symbol"]
-        if tab_data["exchange"] == "Bybit":
-            tab_data["funding_web_view"].setUrl(QUrl(f"https://www.bybit.com/trade/usdt/{symbol}"))
-            tab_data["funding_web_view"].setVisible(True)
-        else:
-            tab_data["funding_web_view"].setVisible(False)
+        if tab_data["exchange"] != "Bybit":
+            self._web_pool.release(id(tab_data))
+            return
+        if self.tab_widget.currentWidget() is not tab_data["tab_page"]:
+            tab_data["web_url"] = None   # завантажимо при показі
+            return
+        view = self._web_pool.acquire(id(tab_data), tab_data["web_layout"])
+        url = f"https://www.bybit.com/trade/usdt/{tab_data['selected_symbol']}"
+        view.setUrl(QUrl(url))
+        tab_data["web_url"] = url
+        view.setVisible(True)
+
+    def _on_current_tab_changed(self, index):
+        page = self.tab_widget.widget(index)
+        tab_data = next((td for td in self.tab_data_list if td.get("tab_page") is page), None)
+        if tab_data is None or tab_data["exchange"] != "Bybit" or self._web_pool is None:
+            return
+        url = f"https://www.bybit.com/trade/usdt/{tab_data['selected_symbol']}"
+        view = self._web_pool.view_for(id(tab_data))
+        if view is not None and tab_data["web_url"] == url:
+            self._web_pool.acquire(id(tab_data), tab_data["web_layout"])   # лише оновлюємо LRU
+            return
+        self._refresh_web_view(tab_data)
+
+    def _set_web_visible(self, tab_data, visible):
+        view = self._web_pool.view_for(id(tab_data)) if self._web_pool else None
+        if view is not None:
+            view.setVisible(visible and tab_data["exchange"] == "Bybit")
 
     # ---- Авто-сканування UI ------------------------------------------- #
 
@@ -902,37 +1118,71 @@ class FundingTraderApp(QMainWindow):
         tab_data["profit_percentage_spinbox"].setValue(calculated_profit)
         tab_data["profit_percentage_slider"].setValue(int(calculated_profit * 100))
 
-        # ── Leverage на біржі ─────────────────────────────────────────
+        # ── Leverage на біржі + Qty (з прогріву або у воркері) ────────
         leverage = tab_data.get("leverage", 10.0)
-        if tab_data.get("session"):
-            set_leverage(tab_data["session"], symbol, leverage, tab_data["exchange"])
+        self._request_auto_qty(tab_data, symbol, leverage, set_exchange_leverage=bool(tab_data.get("session")))
+
+        self._save()
 
-        # ── Qty ───────────────────────────────────────────────────────
+    def _request_auto_qty(self, tab_data, symbol, leverage, set_exchange_leverage=False):
+        """Qty для обраного символу у воркері: з прогрітих кандидатів, інакше — повний ланцюжок запитів."""
+        exchange_leverage = leverage if set_exchange_leverage else None
+        self._engine.submit(
+            self._fetch_qty_inputs, tab_data["session"], symbol, tab_data["exchange"], exchange_leverage,
+            on_done=lambda res: self._apply_auto_qty(tab_data, symbol, leverage, res),
+        )
+
+    @staticmethod
+    def _fetch_qty_inputs(session, symbol, exchange, leverage=None):
+        """Воркер: за потреби ставить плече на біржі; повертає (balance, price, qty_step, leverage_ok)."""
+        prefetched = get_candidate_prefetcher().lookup(session, exchange, symbol, leverage)
+        if prefetched is not None:
+            return prefetched
+        leverage_ok = set_leverage(session, symbol, leverage, exchange) if leverage is not None else None
+        balance  = get_account_balance(session, exchange)
+        price    = get_current_price(session, symbol, exchange)
+        qty_step = get_qty_step(session, symbol, exchange)
+        return balance, price, qty_step, leverage_ok
+
+    def _apply_auto_qty(self, tab_data, symbol, leverage, results):
+        """GUI-потік: qty = баланс × auto_balance_pct × плече / ціна, округлене до qty_step."""
+        if tab_data not in self.tab_data_list or tab_data["selected_symbol"] != symbol:
+            return
+        balance, price, qty_step, leverage_ok = results
+        if leverage_ok is False and "ping_label" in tab_data:
+            tab_data["ping_label"].setText("Leverage: Error")
+            tab_data["ping_label"].setStyleSheet("color: red;")
         try:
-            balance = get_account_balance(tab_data["session"], tab_data["exchange"])
-            price   = get_current_price(tab_data["session"], symbol, tab_data["exchange"])
             if balance and price and price > 0:
                 balance_pct = tab_data.get("auto_balance_pct", 30.0) / 100
                 raw_qty     = (balance * balance_pct * leverage) / price
-                qty_step    = get_qty_step(tab_data["session"], symbol, tab_data["exchange"])
                 qty         = self._round_qty(raw_qty, qty_step)
                 tab_data["qty"] = qty
                 tab_data["qty_spinbox"].setValue(qty)
+                self._save()
         except Exception as e:
-            print(f"Qty calc error on select: {e}")
-
-        self._save()
+            print(f"Qty calc error: {e}")
+        self._update_volume_label(tab_data)
+        self._update_predicted_profit(tab_data)
 
     def _global_auto_scan_tick(self):
         """Один глобальний тік — замість N тіків по вкладках."""
-        now = datetime.now(timezone.utc)
+        now = datetime.fromtimestamp(exchange_now(), timezone.utc)
         secs_into_hour = now.minute * 60 + now.second
         secs_left = 3600 - secs_into_hour
 
-        # Перевіряємо, чи є хоча б одна вкладка з auto_mode=True
-        auto_tabs = [td for td in self.tab_data_list if td.get("auto_mode")]
+        # Перевіряємо, чи є хоча б одна вкладка з auto_mode=True (і вже з сесією)
+        auto_tabs = [td for td in self.tab_data_list if td.get("auto_mode") and td["session"] is not None]
         if not auto_tabs:
+            stop_funding_leaderboards()
             return
+        leaderboard = get_funding_leaderboard()
+        # Клієнти бірж сканера — у воркері заздалегідь; спавн вкладок бере лише готові
+        self._prepare_scan_clients(self.tab_data_list[0]["testnet"])
+
+        # Заготовки вкладок будуємо заздалегідь, поки до фандингу далеко
+        if secs_left > PREFETCH_LEAD_SECS:
+            self._fill_tab_shell_pool()
 
         # Перевіряємо Eco-режим. Якщо увімкнено хоча б в одного — застосовуємо логіку "сну"
         is_eco = any(td.get("auto_eco_mode") for td in auto_tabs)
@@ -945,18 +1195,29 @@ class FundingTraderApp(QMainWindow):
                     secs = (secs_left - 300) % 60
                     td["auto_status_label"].setText(f"🌙 ECO-SLEEP (wake in {mins:02d}:{secs:02d})")
                     td["auto_status_label"].setStyleSheet("color: #ffffff; background-color: #2c3e50; padding: 5px; border-radius: 4px; font-weight: bold; font-size: 12pt;")
-                    if td.get("funding_web_view"):
-                        td["funding_web_view"].setVisible(False)
+                    self._set_web_visible(td, False)
             self._auto_scan_done_this_minute = False
+            leaderboard.stop()
             return
 
+        # Рейтинг ведеться безперервно; у момент рішення його лише читаємо
+        leaderboard.start()
+
+        # За кілька хвилин до фандингу гріємо дані топ-кандидатів, щоб вибір на T-60 був без мережі
+        if secs_left > PREFETCH_LEAD_SECS:
+            if self._prefetch_done_this_hour:
+                self._prefetch_done_this_hour = False
+                get_candidate_prefetcher().release(keep={td.get("selected_symbol", "") for td in self.tab_data_list})
+        elif secs_left > 60 and not self._prefetch_done_this_hour and leaderboard.is_fresh():
+            self._prefetch_done_this_hour = True
+            self._prefetch_candidates(auto_tabs, leaderboard, secs_left)
+
         # Звичайна логіка сканування за 60 секунд до фандингу
         if secs_left > 60:
             self._auto_scan_done_this_minute = False
             # Відображаємо зворотній відлік
             for td in auto_tabs:
-                if td.get("funding_web_view") and td["exchange"] == "Bybit":
-                    td["funding_web_view"].setVisible(True)
+                self._set_web_visible(td, True)
                 
                 mins = (secs_left - 60) // 60
                 secs = (secs_left - 60) % 60
@@ -969,27 +1230,67 @@ class FundingTraderApp(QMainWindow):
 
         self._auto_scan_done_this_minute = True
 
-        # Один спільний скан для всіх
         threshold = min(td.get("auto_min_funding", 0.05) for td in auto_tabs)
-        try:
-            all_above, near_now = scan_funding_opportunities(threshold)
-            self._auto_scan_results = all_above
-            self._auto_scan_near_now = near_now
-        except Exception as e:
-            print(f"Global auto scan error: {e}")
+        if leaderboard.is_fresh():
+            self._on_global_scan_done(leaderboard.ranking(threshold))
             return
 
+        # Рейтинг ще не зібраний або застарів — один спільний скан у воркері, з тим самим
+        # ранжуванням за |rate|, що й у рейтингу
+        self._engine.submit(
+            scan_funding_opportunities, threshold, weights=RATE_ONLY,
+            on_done=self._on_global_scan_done,
+            on_error=lambda e: print(f"Global auto scan error: {e}"),
+            key="global_scan",
+        )
+
+    def _prepare_scan_clients(self, testnet):
+        """Воркер будує клієнт кожної біржі сканера, якого ще немає; невдалі не повторюються."""
+        for exchange in SCAN_EXCHANGES:
+            if (exchange, testnet) in self._client_errors or existing_client(exchange, testnet) is not None:
+                continue
+            self._engine.submit(
+                initialize_client, exchange, testnet,
+                on_error=lambda e, k=(exchange, testnet): self._client_errors.add(k),
+                key=("client", exchange, testnet),
+            )
+
+    def _prefetch_candidates(self, auto_tabs, leaderboard, secs_left):
+        """Воркер на кожну пару (сесія, плече): метадані, плече, баланс і ціна для PREFETCH_TOP_N кандидатів."""
+        prefetcher = get_candidate_prefetcher()
+        jobs = {}
+        for td in auto_tabs:
+            if not td.get("session"):
+                continue
+            all_above, _ = leaderboard.ranking(td.get("auto_min_funding", 0.05))
+            symbols = [e["symbol"] for e in all_above
+                       if e["exchange"] == td["exchange"] and 0 <= e["secs"] <= secs_left + 5][:PREFETCH_TOP_N]
+            leverage = td.get("leverage", 10.0)
+            job = jobs.setdefault((id(td["session"]), leverage), (td["session"], td["exchange"], leverage, []))
+            job[3].extend(s for s in symbols if s not in job[3])
+        for (session_id, leverage), (session, exchange, _, symbols) in jobs.items():
+            self._engine.submit(
+                prefetcher.warm, session, exchange, symbols, leverage,
+                on_error=lambda e: print(f"Candidate prefetch error: {e}"),
+                key=("prefetch", session_id, leverage),
+            )
+
+    def _on_global_scan_done(self, results):
+        all_above, near_now = results
+        self._auto_scan_results = all_above
+        self._auto_scan_near_now = near_now
+
         # Роздаємо результати
         self._spawn_tabs_from_scan(near_now)
 
         # Оновити статус у всіх авто-вкладках
+        auto_tabs = [td for td in self.tab_data_list if td.get("auto_mode")]
         for td in auto_tabs:
             td["auto_scan_results"] = all_above
             self._update_auto_scan_table(td)
             
             # Повертаємо видимість WebView при активації
-            if td.get("funding_web_view") and td["exchange"] == "Bybit":
-                td["funding_web_view"].setVisible(True)
+            self._set_web_visible(td, True)
 
             if near_now:
                 td["auto_status_label"].setText(
@@ -1014,7 +1315,7 @@ class FundingTraderApp(QMainWindow):
             existing_symbols.add(td.get("coin_input", QLineEdit()).text().strip().upper())
 
         created = 0
-        MAX_AUTO_TABS = 5
+        sessions = self._spawn_sessions()
 
         for coin in near_now:
             if created >= MAX_AUTO_TABS:
@@ -1024,17 +1325,18 @@ class FundingTraderApp(QMainWindow):
                 print(f"Tab for {symbol} already exists — skipping")
                 continue
 
-            # Беремо налаштування з першої вкладки як шаблон
+            # Беремо налаштування з першої вкладки як шаблон; біржа та інтервал — зі скану
             template = self.tab_data_list[0] if self.tab_data_list else {}
             new_settings = {
-                "exchange":               template.get("exchange", "Bybit"),
+                "exchange":               coin.get("exchange") or template.get("exchange", "Bybit"),
                 "testnet":                template.get("testnet", False),
                 "selected_symbol":        symbol,
-                "funding_interval_hours": template.get("funding_interval_hours", 8),
+                "funding_interval_hours": coin.get("interval") or template.get("funding_interval_hours", 8),
                 "entry_time_seconds":     template.get("entry_time_seconds", 5),
                 "qty":                    template.get("qty", 1.0),
                 "profit_percentage":      template.get("profit_percentage", 1.0),
                 "auto_limit":             template.get("auto_limit", False),
+                "attach_take_profit":     template.get("attach_take_profit", False),
                 "leverage":               template.get("leverage", 1.0),
                 "stop_loss_percentage":   template.get("stop_loss_percentage", 1.0),
                 "stop_loss_enabled":      template.get("stop_loss_enabled", False),
@@ -1043,16 +1345,26 @@ class FundingTraderApp(QMainWindow):
                 "auto_min_funding":       template.get("auto_min_funding", 0.05),
             }
 
-            session = template.get("session") if template else None
             testnet = new_settings["testnet"]
             exchange = new_settings["exchange"]
+            # Монета з іншої біржі — лише клієнт, створений заздалегідь (_prepare_scan_clients)
+            session = sessions.get(exchange)
+            if session is None:
+                print(f"No {exchange} client ready for {symbol} — skipping")
+                continue
 
-            new_td = self.add_new_tab(
-                session=session,
-                testnet=testnet,
-                exchange=exchange,
-                settings=new_settings,
-            )
+            # Готова заготовка лише перев'язується; інакше вкладка будується з нуля
+            shell = self._take_tab_shell(new_settings, session)
+            if shell is not None:
+                self._show_tab(*shell)
+                new_td = shell[1]
+            else:
+                new_td = self.add_new_tab(
+                    session=session,
+                    testnet=testnet,
+                    exchange=exchange,
+                    settings=new_settings,
+                )
             # Явно виставляємо символ після створення вкладки
             new_td["selected_symbol"] = symbol
             new_td["coin_input"].setText(symbol)
@@ -1208,9 +1520,25 @@ class FundingTraderApp(QMainWindow):
 
 
     def _run_auto_scan(self, tab_data):
+        threshold = tab_data.get("auto_min_funding", 0.05)
+        # Вкладка обирає монету для себе — лише з її біржі
+        self._engine.submit(
+            scan_funding_opportunities, threshold, exchanges=(tab_data["exchange"],),
+            on_done=lambda res: self._on_auto_scan_done(tab_data, res),
+            on_error=lambda e: self._on_auto_scan_error(tab_data, e),
+            key=("auto_scan", id(tab_data)),
+        )
+
+    def _on_auto_scan_error(self, tab_data, e):
+        print(f"Auto scan error: {e}")
+        tab_data["auto_status_label"].setText(self.trans["auto_error"].format(e=e))
+        tab_data["auto_status_label"].setStyleSheet("color: red;")
+
+    def _on_auto_scan_done(self, tab_data, results):
+        if tab_data not in self.tab_data_list:
+            return
         try:
-            threshold = tab_data.get("auto_min_funding", 0.05)
-            all_above, near_now = scan_funding_opportunities(threshold)
+            all_above, near_now = results
 
             def sort_key(item):
                 secs = item.get("secs", 9999)
@@ -1238,43 +1566,9 @@ class FundingTraderApp(QMainWindow):
                 tab_data["profit_percentage_spinbox"].setValue(calculated_profit)
                 tab_data["profit_percentage_slider"].setValue(int(calculated_profit * 100))
 
-                # ── Qty + funding data в окремому потоці ──────────────────
-                def _background_calc():
-                    try:
-                        balance  = get_account_balance(tab_data["session"], tab_data["exchange"])
-                        price    = get_current_price(tab_data["session"], symbol, tab_data["exchange"])
-                        qty_step = get_qty_step(tab_data["session"], symbol, tab_data["exchange"])
-                        return balance, price, qty_step
-                    except Exception as e:
-                        print(f"Background calc error: {e}")
-                        return None, None, None
-
-                def _apply_results(results):
-                    balance, price, qty_step = results
-                    if balance and price and price > 0:
-                        balance_pct   = tab_data.get("auto_balance_pct", 30.0) / 100
-                        leverage_calc = tab_data.get("leverage", 10.0)
-                        qty = self._round_qty((balance * balance_pct * leverage_calc) / price, qty_step)
-                        tab_data["qty"] = qty
-                        tab_data["qty_spinbox"].setValue(qty)
-                    # _save вже був викликаний в _on_symbol_changed, тут можна не дублювати
-                    # Оновлюємо лейбли обсягу та профіту
-                    self._update_volume_label(tab_data)
-                    self._update_predicted_profit(tab_data)
-
-                from PyQt6.QtCore import QThreadPool, QRunnable
-                class Worker(QRunnable):
-                    def __init__(self, fn, callback):
-                        super().__init__()
-                        self._fn = fn
-                        self._cb = callback
-                    def run(self):
-                        result = self._fn()
-                        # Повертаємось в головний потік через QTimer
-                        QTimer.singleShot(0, lambda: self._cb(result))
-
-                worker = Worker(_background_calc, _apply_results)
-                QThreadPool.globalInstance().start(worker)
+                # ── Qty з прогріву або в окремому потоці ──────────────────
+                leverage = tab_data.get("leverage", 10.0)
+                self._request_auto_qty(tab_data, symbol, leverage)
 
                 tab_data["auto_chosen_label"].setText(
                     t["auto_chosen_selected"].format(symbol=symbol, rate=best["rate"])
@@ -1291,9 +1585,7 @@ class FundingTraderApp(QMainWindow):
                 tab_data["auto_status_label"].setStyleSheet("color: #b00; font-style: italic;")
 
         except Exception as e:
-            print(f"Auto scan error: {e}")
-            tab_data["auto_status_label"].setText(self.trans["auto_error"].format(e=e))
-            tab_data["auto_status_label"].setStyleSheet("color: red;")
+            self._on_auto_scan_error(tab_data, e)
 
 
 
@@ -1305,7 +1597,9 @@ class FundingTraderApp(QMainWindow):
         is_manual = not tab_data.get("auto_mode", False)
         table.setRowCount(len(results))
         for row, item in enumerate(results):
-            sym_item = QTableWidgetItem(item["symbol"])
+            exchange = item.get("exchange", tab_data.get("exchange"))
+            sym_text = item["symbol"] if exchange == tab_data.get("exchange") else f"{item['symbol']} · {exchange}"
+            sym_item = QTableWidgetItem(sym_text)
             rate_item = QTableWidgetItem(f"{item['rate']:+.4f}%")
             time_item = QTableWidgetItem(format_funding_time(item["secs"], self.language))
 
@@ -1335,7 +1629,7 @@ class FundingTraderApp(QMainWindow):
     def _check_auto_scan_trigger(self, tab_data):
         if not tab_data.get("auto_mode"):
             return
-        now = datetime.now(timezone.utc)
+        now = datetime.fromtimestamp(exchange_now(), timezone.utc)
         secs_into_hour = now.minute * 60 + now.second
         secs_left = 3600 - secs_into_hour
         t = self.trans
@@ -1356,22 +1650,27 @@ class FundingTraderApp(QMainWindow):
     # ------------------------------------------------------------------ #
 
     def _init_tab_timers(self, tab_data):
+        """Створює таймери вкладки; запускає їх _start_tab_timers(), коли вкладку показано."""
         timer = QTimer()
+        timer.setInterval(1000)
         timer.timeout.connect(lambda: self._check_funding_time(tab_data))
-        timer.start(1000)
 
         refresh_timer = QTimer()
+        refresh_timer.setInterval(5 * 60 * 1000)
         refresh_timer.timeout.connect(lambda: self._update_tab_funding_data(tab_data))
-        refresh_timer.start(5 * 60 * 1000)
 
         ping_timer = QTimer()
+        ping_timer.setInterval(30_000)
         ping_timer.timeout.connect(lambda: self._update_ping(tab_data))
-        ping_timer.start(30_000)
 
         tab_data["timer"] = timer
         tab_data["funding_refresh_timer"] = refresh_timer
         tab_data["ping_timer"] = ping_timer
 
+    def _start_tab_timers(self, tab_data):
+        for timer_key in ("timer", "funding_refresh_timer", "ping_timer"):
+            tab_data[timer_key].start()
+
     # ------------------------------------------------------------------ #
     #  Торгова логіка                                                     #
     # ------------------------------------------------------------------ #
@@ -1379,232 +1678,35 @@ class FundingTraderApp(QMainWindow):
         if tab_data not in self.tab_data_list or not tab_data["funding_data"]:
             self._reset_tab_labels(tab_data)
             return
-
-        # ── Захист від подвійного ордеру ─────────────────────────────
-        if tab_data.get("order_placed_this_cycle"):
-            return
         # self._check_auto_scan_trigger(tab_data)
 
+        # Прогрів, озброєння входу і перевірка позиції — спільний з headless цикл
+        timing = self._cycle.tick(tab_data)
+        if timing is None:
+            return
+        time_to_funding, time_str = timing
         symbol = tab_data["funding_data"]["symbol"]
         rate   = tab_data["funding_data"]["funding_rate"]
-        time_val = tab_data["funding_data"]["funding_time"]
-
-        try:
-            time_to_funding, time_str = get_next_funding_time(
-                time_val, tab_data["funding_interval_hours"],
-                is_testnet=tab_data.get("testnet", False)
-            )
-        except Exception as e:
-            print(f"Error calculating funding time: {e}")
-            return
 
         tab_data["funding_info_label"].setText(
             f"{self.trans['funding_info_label'].split(':')[0]}: {rate:.4f}% | "
             f"{self.trans['funding_info_label'].split('|')[1].strip()}: {time_str}"
         )
 
-        if 0.5 <= time_to_funding <= 1.5 and tab_data["pre_funding_price"] is None:
-            tab_data["pre_funding_price"] = get_current_price(
-                tab_data["session"], symbol, tab_data["exchange"]
-            )
-
-        entry_window = tab_data["entry_time_seconds"]
-
-        if time_to_funding <= entry_window and time_to_funding > 0 and not tab_data["open_order_id"]:
-            if self.disable_trades_checkbox.isChecked():
-                print(f"[TRADING BLOCKED] Funding trade for {symbol} bypassed because Global Block is active.")
-            else:
-                print(f"[ORDER TRIGGER] {symbol} time_to_funding={time_to_funding:.3f} entry_window={entry_window}")
-                side = (
-                    ("Sell" if rate > 0 else "Buy") if tab_data["reverse_side"]
-                    else ("Buy" if rate > 0 else "Sell")
-                )
-                tab_data["open_order_id"] = place_market_order(
-                    tab_data["session"], symbol, side, tab_data["qty"], tab_data["exchange"]
-                )
-                if tab_data["open_order_id"]:
-                    tab_data["order_qty"] = tab_data["qty"]  # ← фіксуємо qty угоди
-                    tab_data["order_placed_this_cycle"] = True
-                    delay_ms = int((time_to_funding - 0.5) * 1000)
-                    delay_ms = max(0, delay_ms)  # не може бути від'ємним
-                    QTimer.singleShot(delay_ms, lambda: self._capture_funding_price(tab_data, symbol, side))
-                tab_data["pre_funding_price"] = None
-
         if time_to_funding <= 10:
             print(f"[COUNTDOWN] {symbol} time_to_funding={time_to_funding:.3f}s entry_window={tab_data['entry_time_seconds']}s order_id={tab_data['open_order_id']}")
-            
-        tab_data["update_count"] += 1
-        if tab_data.get("position_open") and tab_data["update_count"] % 10 == 0:
-            self._check_position_status(tab_data)
 
-    def _check_position_status(self, tab_data):
-        try:
-            symbol = tab_data["selected_symbol"]
-            if tab_data["exchange"] == "Bybit":
-                pos = tab_data["session"].get_positions(category="linear", symbol=symbol)
-                if pos["retCode"] == 0:
-                    position = next(
-                        (p for p in pos["result"]["list"]
-                         if p["symbol"] == symbol and float(p["size"]) > 0),
-                        None,
-                    )
-            else:
-                pos = tab_data["session"].get_position_information(symbol=symbol)
-                position = next(
-                    (p for p in pos if p["symbol"] == symbol and abs(float(p["positionAmt"])) > 0),
-                    None,
-                )
-            if not position:
-                tab_data["position_open"] = False
-                self._update_stats_table()
-        except Exception as e:
-            print(f"Error checking position: {e}")
-
-    def _capture_funding_price(self, tab_data, symbol, side):
-        if tab_data not in self.tab_data_list:
-            return
-
-        entry_price, trade_open_time = get_order_execution_price(
-            tab_data["session"], symbol, tab_data["open_order_id"], tab_data["exchange"]
+    def _show_limit_mismatch(self, tab_data, symbol, profit):
+        QMessageBox.warning(
+            self,
+            self.trans["price_mismatch_warning_title"],
+            self.trans["price_mismatch_warning_text"].format(
+                symbol=symbol,
+                actual_profit=profit,
+                expected_profit=tab_data["profit_percentage"],
+            ),
         )
 
-        if not entry_price:
-            print(f"Could not get entry price for {symbol}, order id: {tab_data['open_order_id']}")
-            tab_data["open_order_id"] = None
-            return
-
-        tab_data["position_open"] = True
-        tab_data["funding_time_price"] = entry_price
-        print(f"Entry price for {symbol}: {entry_price} at {trade_open_time}")
-
-        tick_size = get_symbol_info(tab_data["session"], symbol, tab_data["exchange"])
-        decimal_places = abs(int(math.log10(tick_size))) if tick_size else 4
-
-        # ── Stop ордер вище входу ─────────────────────────────────────
-        # stop_addon_pct = tab_data.get("stop_addon_pct", 0.5)  # % вище входу
-        # stop_price = entry_price * (
-        #     1 + stop_addon_pct / 100 if side == "Sell"  # шорт — стоп вище
-        #     else 1 - stop_addon_pct / 100               # лонг — стоп нижче
-        # )
-        # stop_price = round(stop_price, decimal_places)
-
-        # QTimer.singleShot(
-        #     2000,
-        #     lambda sp=stop_price: place_limit_close_order(
-        #         tab_data["session"], symbol, side,
-        #         tab_data.get("order_qty", tab_data["qty"]), sp, tick_size,
-        #         tab_data["exchange"]
-        #     )
-        # )
-        # print(f"Stop limit order at {stop_price} (+{stop_addon_pct}% from entry)")
-#
-        # ── Profit ліміт-ордер ────────────────────────────────────────
-        is_inverted = tab_data.get("reverse_side", False)
-        direction = 1 if is_inverted else -1
-        target = entry_price * (1 + (direction * tab_data["profit_percentage"]) / 100)
-
-        # Вибір ціни залежно від режиму
-        if tab_data.get("auto_limit", False):
-            optimal = get_optimal_limit_price(
-                tab_data["session"], symbol, side, entry_price,
-                tab_data["exchange"], tab_data["profit_percentage"], tick_size,
-                is_inverted=is_inverted
-            )
-            if optimal:
-                actual_profit = abs((optimal - entry_price) / entry_price * 100)
-                # Якщо оптимальна ціна дає прийнятне відхилення — використовуємо її
-                if abs(actual_profit - tab_data["profit_percentage"]) <= 0.20:
-                    limit_price = optimal
-                else:
-                    limit_price = target
-            else:
-                limit_price = target
-        else:
-            limit_price = target   # <-- Якщо авто-ліміт вимкнено — завжди точний target
-
-        # === КРИТИЧНЕ ВИПРАВЛЕННЯ: Округлення в бік прибутку ===
-        if tick_size:
-            decimal_places = abs(int(math.log10(tick_size)))
-            
-            if side == "Buy":      # Sell limit (лонг) → хочемо вищу ціну → округлюємо вниз
-                limit_price = math.floor(limit_price / tick_size) * tick_size
-            else:                  # Buy limit (шорт) → хочемо нижчу ціну → округлюємо вгору
-                limit_price = math.ceil(limit_price / tick_size) * tick_size
-
-        # Фінальне округлення
-        limit_price = round(limit_price, decimal_places if tick_size else 4)
-        
-        tab_data["limit_price"] = limit_price
-
-        print(f"Placing profit limit {side} close order at {limit_price} "
-              f"(desired {tab_data['profit_percentage']}%, entry {entry_price})")
-
-        place_limit_close_order(
-            tab_data["session"], symbol, side,
-            tab_data.get("order_qty", tab_data["qty"]), limit_price, tick_size,
-            tab_data["exchange"]
-        )
-        print(f"Profit limit order placed at {limit_price} "
-              f"({((limit_price - entry_price)/entry_price*100 if side=='Sell' else (limit_price - entry_price)/entry_price*100):+.2f}%)")
-        
-        # === NEW: Запускаємо таймер на 5 хвилин для Change%_after5m ===
-        # Використовуємо точний час з біржі ( trade_open_time ), отриманий на початку методу
-        QTimer.singleShot(5 * 60 * 1000, lambda: self._auto_import_and_update_after_5m(tab_data, symbol, entry_price, trade_open_time))
-        
-        tab_data["open_order_id"] = None
-
-        QTimer.singleShot(1000, lambda: self._log_limit_price_diff(tab_data, symbol))
-
-    def _auto_import_and_update_after_5m(self, tab_data, symbol, entry_price, trade_open_time):
-        """Автоматично імпортує угоду через 5хв та додає Change%_after5m."""
-        if tab_data not in self.tab_data_list:
-            return
-            
-        print(f"Executing 5-minute auto-update for {symbol}...")
-        
-        # 1. Отримуємо ціну через 5хв
-        current_price = get_current_price(tab_data["session"], symbol, tab_data["exchange"])
-        if not current_price or not entry_price:
-            print(f"Could not calculate 5m change for {symbol}: price is missing.")
-            return
-            
-        change_pct = ((current_price - entry_price) / entry_price) * 100
-        print(f"Price change for {symbol} after 5m: {change_pct:+.2f}%")
-        
-        # 2. Імпортуємо останні угоди (щоб наша угода точно була в CSV)
-        trades = get_closed_trades(tab_data["session"], tab_data["exchange"], limit=5)
-        if trades:
-            written = stats.write_imported_trades(trades)
-            print(f"Auto-import: written {written} trades.")
-            
-        # 3. Оновлюємо конкретний рядок у CSV
-        updated = stats.update_trade_after_5m(symbol, trade_open_time, change_pct)
-        if updated:
-            print(f"Successfully updated Change%_after5m for {symbol} at {trade_open_time}")
-            self._update_stats_table()
-        else:
-            # Спробуємо також пошукати за поточним часом (якщо datetime.now() в write_stats_row був іншим)
-            print(f"Could not find trade for {symbol} at {trade_open_time} in CSV to update.")
-
-    def _log_limit_price_diff(self, tab_data, symbol):
-        if tab_data not in self.tab_data_list:
-            return
-        open_price = tab_data["funding_time_price"]
-        limit = tab_data.get("limit_price")
-        if open_price is None or limit is None:
-            return
-        profit = abs((limit - open_price) / open_price * 100)
-        if abs(profit - tab_data["profit_percentage"]) > 0.5:
-            QMessageBox.warning(
-                self,
-                self.trans["price_mismatch_warning_title"],
-                self.trans["price_mismatch_warning_text"].format(
-                    symbol=symbol,
-                    actual_profit=profit,
-                    expected_profit=tab_data["profit_percentage"],
-                ),
-            )
-
     def _handle_close_all_trades(self, tab_data):
         if tab_data not in self.tab_data_list:
             return
@@ -1619,7 +1721,18 @@ class FundingTraderApp(QMainWindow):
         if msg.exec() != QMessageBox.StandardButton.Yes:
             return
 
-        success = close_all_positions(tab_data["session"], tab_data["exchange"], symbol=tab_data["selected_symbol"])
+        tab_data["close_all_trades_button"].setEnabled(False)
+        self._engine.submit(
+            close_all_positions, tab_data["session"], tab_data["exchange"],
+            symbol=tab_data["selected_symbol"],
+            on_done=lambda ok: self._on_close_all_done(tab_data, ok),
+            on_error=lambda e: self._on_close_all_done(tab_data, False),
+        )
+
+    def _on_close_all_done(self, tab_data, success):
+        if tab_data not in self.tab_data_list:
+            return
+        tab_data["close_all_trades_button"].setEnabled(True)
         result = QMessageBox()
         if success:
             result.setWindowTitle("Успіх" if self.language == "uk" else "Success")
@@ -1637,12 +1750,12 @@ class FundingTraderApp(QMainWindow):
 
     def _update_tab_funding_data(self, tab_data, retry_count=3, retry_delay=2, refresh_web=True):
         tab_data["order_placed_this_cycle"] = False
-        if tab_data not in self.tab_data_list:
+        if tab_data not in self.tab_data_list or tab_data["session"] is None:
             return
 
         # Eco-Auto Mode optimization
         if tab_data.get("auto_mode") and tab_data.get("auto_eco_mode"):
-            now = datetime.now(timezone.utc)
+            now = datetime.fromtimestamp(exchange_now(), timezone.utc)
             secs_into_hour = now.minute * 60 + now.second
             secs_left = 3600 - secs_into_hour
             if secs_left > 300: # Більше 5 хв до фандингу
@@ -1650,46 +1763,54 @@ class FundingTraderApp(QMainWindow):
                 self._update_ping(tab_data)
                 return
 
-        for attempt in range(retry_count):
-            try:
-                tab_data["funding_data"] = get_funding_data(
-                    tab_data["session"], tab_data["selected_symbol"], tab_data["exchange"]
-                )
-                price = get_current_price(tab_data["session"], tab_data["selected_symbol"], tab_data["exchange"])
-                tab_data["price_label"].setText(
-                    f"{self.trans['price_label'].split(':')[0]}: ${price:.6f}" if price else self.trans["price_label"]
-                )
-                balance = get_account_balance(tab_data["session"], tab_data["exchange"])
-                tab_data["balance_label"].setText(
-                    f"{self.trans['balance_label'].split(':')[0]}: ${balance:.2f} USDT" if balance else self.trans["balance_label"]
-                )
-                self._update_leveraged_balance(tab_data)
-                if tab_data["funding_data"]:
-                    rate = tab_data["funding_data"]["funding_rate"]
-                    _, time_str = get_next_funding_time(tab_data["funding_data"]["funding_time"], tab_data["funding_interval_hours"])
-                    tab_data["funding_info_label"].setText(
-                        f"{self.trans['funding_info_label'].split(':')[0]}: {rate:.4f}% | "
-                        f"{self.trans['funding_info_label'].split('|')[1].strip()}: {time_str}"
-                    )
-                else:
-                    self._reset_tab_labels(tab_data)
-                self._update_volume_label(tab_data)
-                self._update_predicted_profit(tab_data)
-                self._update_ping(tab_data)
-                if refresh_web:
-                    self._refresh_web_view(tab_data)
-                return
-            except Exception as e:
-                print(f"Error updating funding data (attempt {attempt + 1}): {e}")
-                if attempt < retry_count - 1:
-                    time.sleep(retry_delay)
-        self._set_tab_labels_error(tab_data)
+        self._engine.submit(
+            fetch_tab_snapshot,
+            tab_data["session"], tab_data["selected_symbol"], tab_data["exchange"],
+            retry_count, retry_delay,
+            on_done=lambda snap: self._apply_tab_snapshot(tab_data, snap, refresh_web),
+            key=("refresh", id(tab_data)),
+        )
+
+    def _apply_tab_snapshot(self, tab_data, snap, refresh_web=True):
+        if tab_data not in self.tab_data_list:
+            return
+        if snap is None:
+            self._set_tab_labels_error(tab_data)
+            return
+        if snap["symbol"] != tab_data["selected_symbol"]:
+            # Символ змінився, поки йшов запит — перезапитуємо для нового
+            self._update_tab_funding_data(tab_data, refresh_web=refresh_web)
+            return
+        tab_data["funding_data"] = snap["funding_data"]
+        price = tab_data["last_price"] = snap["price"]
+        balance = tab_data["last_balance"] = snap["balance"]
+        tab_data["price_label"].setText(
+            f"{self.trans['price_label'].split(':')[0]}: ${price:.6f}" if price else self.trans["price_label"]
+        )
+        tab_data["balance_label"].setText(
+            f"{self.trans['balance_label'].split(':')[0]}: ${balance:.2f} USDT" if balance else self.trans["balance_label"]
+        )
+        self._update_leveraged_balance(tab_data)
+        if tab_data["funding_data"]:
+            rate = tab_data["funding_data"]["funding_rate"]
+            _, time_str = get_next_funding_time(tab_data["funding_data"]["funding_time"], tab_data["funding_interval_hours"])
+            tab_data["funding_info_label"].setText(
+                f"{self.trans['funding_info_label'].split(':')[0]}: {rate:.4f}% | "
+                f"{self.trans['funding_info_label'].split('|')[1].strip()}: {time_str}"
+            )
+        else:
+            self._reset_tab_labels(tab_data)
+        self._update_volume_label(tab_data)
+        self._update_predicted_profit(tab_data)
+        show_ping(tab_data["ping_label"], snap["ping_ms"])
+        if refresh_web:
+            self._refresh_web_view(tab_data)
 
     def _update_volume_label(self, tab_data):
         if tab_data not in self.tab_data_list:
             return
-        price   = get_current_price(tab_data["session"], tab_data["selected_symbol"], tab_data["exchange"])
-        balance = get_account_balance(tab_data["session"], tab_data["exchange"])
+        price   = tab_data.get("last_price")
+        balance = tab_data.get("last_balance")
         leveraged = balance * tab_data["leverage"] if balance and tab_data["leverage"] else None
         if price and tab_data["qty"]:
             volume = tab_data["qty"] * price
@@ -1704,7 +1825,7 @@ class FundingTraderApp(QMainWindow):
         if tab_data not in self.tab_data_list:
             return
         try:
-            price = get_current_price(tab_data["session"], tab_data["selected_symbol"], tab_data["exchange"])
+            price = tab_data.get("last_price")
             qty = tab_data.get("qty", 0)
             profit_pct = tab_data.get("profit_percentage", 0)
             
@@ -1744,7 +1865,7 @@ class FundingTraderApp(QMainWindow):
     def _update_leveraged_balance(self, tab_data):
         if tab_data not in self.tab_data_list:
             return
-        balance = get_account_balance(tab_data["session"], tab_data["exchange"])
+        balance = tab_data.get("last_balance")
         if balance and tab_data["leverage"]:
             leveraged = balance * tab_data["leverage"]
             tab_data["leveraged_balance_label"].setText(
@@ -1754,9 +1875,13 @@ class FundingTraderApp(QMainWindow):
             tab_data["leveraged_balance_label"].setText(self.trans["leveraged_balance_label"])
 
     def _update_ping(self, tab_data):
-        if tab_data not in self.tab_data_list:
+        if tab_data not in self.tab_data_list or tab_data["session"] is None:
             return
-        update_ping(tab_data["session"], tab_data["ping_label"], tab_data["exchange"])
+        self._engine.submit(
+            measure_ping, tab_data["session"], tab_data["exchange"],
+            on_done=lambda ms: show_ping(tab_data["ping_label"], ms) if tab_data in self.tab_data_list else None,
+            key=("ping", id(tab_data)),
+        )
 
     def _reset_tab_labels(self, tab_data):
         t = self.trans
@@ -1806,18 +1931,16 @@ class FundingTraderApp(QMainWindow):
         tab_data["exchange"] = exchange
         self._refresh_web_view(tab_data)
         tab_data["funding_interval_hours"] = 1.0 if exchange == "Bybit" else 8.0
-        tab_data["session"] = initialize_client(exchange, tab_data["testnet"])
+        self._reconnect_tab(tab_data)
         self._save()
-        self._update_tab_funding_data(tab_data)
         # self._recalculate_auto_qty(tab_data)
 
     def _on_testnet_changed(self, tab_data, state):
         if tab_data not in self.tab_data_list:
             return
         tab_data["testnet"] = state == Qt.CheckState.Checked.value
-        tab_data["session"] = initialize_client(tab_data["exchange"], tab_data["testnet"])
+        self._reconnect_tab(tab_data)
         self._save()
-        self._update_tab_funding_data(tab_data)
         # self._recalculate_auto_qty(tab_data)
 
     def _on_symbol_changed(self, tab_data, symbol):
@@ -1871,6 +1994,12 @@ class FundingTraderApp(QMainWindow):
         self._save()
         # self._recalculate_auto_qty(tab_data)
 
+    def _on_attach_tp_changed(self, tab_data, state):
+        if tab_data not in self.tab_data_list:
+            return
+        tab_data["attach_take_profit"] = state == Qt.CheckState.Checked.value
+        self._save()
+
     def _on_leverage_changed(self, tab_data, value):
         if tab_data not in self.tab_data_list:
             return
@@ -1882,27 +2011,11 @@ class FundingTraderApp(QMainWindow):
 
         symbol = tab_data.get("selected_symbol")
         if symbol and tab_data.get("session"):
-            # Встановлюємо плече на біржі
-            ok = set_leverage(tab_data["session"], symbol, value, tab_data["exchange"])
-            if not ok:
-                if "ping_label" in tab_data:
-                    tab_data["ping_label"].setText("Leverage: Error")
-                    tab_data["ping_label"].setStyleSheet("color: red;")
-
-            # Перераховуємо qty з новим плечем
-            try:
-                balance = get_account_balance(tab_data["session"], tab_data["exchange"])
-                price   = get_current_price(tab_data["session"], symbol, tab_data["exchange"])
-                if balance and price and price > 0:
-                    balance_pct = tab_data.get("auto_balance_pct", 30.0) / 100
-                    raw_qty     = (balance * balance_pct * value) / price
-                    qty_step    = get_qty_step(tab_data["session"], symbol, tab_data["exchange"])
-                    qty         = self._round_qty(raw_qty, qty_step)
-                    tab_data["qty"] = qty
-                    tab_data["qty_spinbox"].setValue(qty)
-                    self._save()
-            except Exception as e:
-                print(f"Qty recalc error on leverage change: {e}")
+            # Встановлюємо плече на біржі і перераховуємо qty з новим плечем (у воркері)
+            self._engine.submit(
+                self._fetch_qty_inputs, tab_data["session"], symbol, tab_data["exchange"], value,
+                on_done=lambda res: self._apply_auto_qty(tab_data, symbol, value, res),
+            )
 
     def _on_stop_loss_pct_changed(self, tab_data, value):
         if tab_data not in self.tab_data_list:
@@ -1988,9 +2101,12 @@ class FundingTraderApp(QMainWindow):
         self.setWindowTitle(self.trans["window_title"].format("Multi-Coin"))
         self.language_label.setText(self.trans["language_label"])
         self._update_disable_trades_checkbox_style()
+        self.latency_btn.setText(self.trans["latency_button"])
         for td in self.tab_data_list:
             self._update_tab_labels(td)
             self._update_tab_funding_data(td, refresh_web=False)
+        for _, td in self._tab_shells:
+            self._update_tab_labels(td)
 
         # Оновлення вкладки Статистики
         self.stats_refresh_btn.setText(self.trans["refresh_button"])
@@ -2054,6 +2170,7 @@ class FundingTraderApp(QMainWindow):
             "testnet_checkbox":           t["testnet_checkbox"],
             "reverse_side_checkbox":      t["reverse_side_checkbox"],
             "auto_limit_checkbox":        t["auto_limit_checkbox"],
+            "attach_tp_checkbox":         t["attach_tp_checkbox"],
             "stop_loss_enabled_checkbox": t["stop_loss_enabled_checkbox"],
             "auto_eco_mode_checkbox":     t["auto_eco_mode_checkbox"],
         }
@@ -2100,6 +2217,9 @@ class FundingTraderApp(QMainWindow):
         td = self.tab_data_list[index]
         for timer_key in ("timer", "funding_refresh_timer", "ping_timer"):
             td[timer_key].stop()
+        get_cycle_coordinator().disarm(id(td))
+        if self._web_pool:
+            self._web_pool.release(id(td))
         self.tab_widget.removeTab(index)
         self.tab_data_list.pop(index)
         self._save()
@@ -2112,6 +2232,13 @@ class FundingTraderApp(QMainWindow):
         for td in self.tab_data_list:
             for timer_key in ("timer", "funding_refresh_timer", "ping_timer"):
                 td[timer_key].stop()
+            get_cycle_coordinator().disarm(id(td))
+        get_cycle_coordinator().shutdown()
+        self._engine.shutdown()
+        stop_funding_leaderboards()
+        get_candidate_prefetcher().release()
+        stop_market_hubs()
+        stop_private_streams()
         self._save()
         event.accept()
 
@@ -2120,4 +2247,4 @@ class FundingTraderApp(QMainWindow):
     # ------------------------------------------------------------------ #
 
     def _save(self):
-        sm.save_settings(self.tab_data_list, self.language, self.settings_path, disable_funding_trades=self.disable_funding_trades, collect_funding_stats=self.collect_funding_stats)
+        sm.save_settings(self.tab_data_list, self.language, self.settings_path, disable_funding_trades=self.disable_funding_trades, collect_funding_stats=self.collect_funding_stats, prewarm_lead_seconds=self.prewarm_lead)
@@ -0,0 +1,180 @@
+"""
+headless.py — безголовий режим: торгова логіка вкладок без Qt і QtWebEngine.
+
+Вкладки з settings.json стають станами tab_data без віджетів. Стан змінюється
+лише в головному потоці: воркери ExecutionEngine і пул координатора
+повертають результати через чергу подій, яку крутить run() — так само, як
+UiBridge робить це для GUI. Вивід — у stdout або у файл (--log).
+"""
+import heapq
+import itertools
+import queue
+import signal
+import sys
+import time
+from datetime import datetime
+
+import boot_profiler
+import settings_manager as sm
+from tab_data import build_tab_data
+from logic import get_next_funding_time
+from strategy import EntryCycle, fetch_tab_snapshot
+from execution_engine import ExecutionEngine
+from cycle_coordinator import get_cycle_coordinator
+from market_stream import stop_market_hubs
+from private_stream import stop_private_streams
+
+
+TICK_SECS = 1.0             # як QTimer вкладки в GUI
+REFRESH_SECS = 5 * 60       # оновлення фандингу, ціни та балансу
+
+
+class _TimestampedStream:
+    """Обгортка потоку виводу: кожен рядок логу починається з локального часу."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._line_start = True
+
+    def write(self, text):
+        for chunk in text.splitlines(keepends=True):
+            if self._line_start:
+                self._stream.write(datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] + " ")
+            self._stream.write(chunk)
+            self._line_start = chunk.endswith("\n")
+        return len(text)
+
+    def flush(self):
+        self._stream.flush()
+
+
+class HeadlessTrader:
+    def __init__(self, settings_path: str = sm.SETTINGS_PATH):
+        self.settings_path = settings_path
+        self.disable_funding_trades = sm.load_disable_trades(settings_path)
+        self.prewarm_lead = sm.load_prewarm_lead(settings_path)
+        self._events = queue.Queue()
+        self._timers: list = []   # (час, №, fn) — відкладені виклики головного потоку
+        self._seq = itertools.count()
+        self._running = False
+        self._engine = ExecutionEngine(dispatcher=self.post)
+        self._cycle = EntryCycle(
+            self._engine, self.post, self.call_later,
+            prewarm_lead=self.prewarm_lead,
+            trading_blocked=lambda: self.disable_funding_trades,
+            on_position_closed=self._on_position_closed,
+        )
+        self.tab_data_list = [build_tab_data(s) for s in sm.load_settings(settings_path)]
+
+    # ---- Цикл подій ---------------------------------------------------- #
+
+    def post(self, fn):
+        """Потокобезпечно ставить fn у чергу головного потоку."""
+        self._events.put(fn)
+
+    def call_later(self, delay: float, fn):
+        """Аналог QTimer.singleShot; викликається лише з головного потоку."""
+        heapq.heappush(self._timers, (time.time() + delay, next(self._seq), fn))
+
+    def run(self):
+        self._running = True
+        for tab_data in self.tab_data_list:
+            print(f"Headless tab: {tab_data['selected_symbol']} on {tab_data['exchange']}"
+                  f"{' testnet' if tab_data['testnet'] else ''}, entry T-{tab_data['entry_time_seconds']}s")
+            self._update_tab_funding_data(tab_data)
+        if self.disable_funding_trades:
+            print("[TRADING BLOCKED] Global Block is active, entries will be skipped.")
+
+        next_tick = time.time() + TICK_SECS
+        next_refresh = time.time() + REFRESH_SECS
+        while self._running:
+            now = time.time()
+            if now >= next_tick:
+                for tab_data in self.tab_data_list:
+                    self._call(lambda td=tab_data: self._check_funding_time(td))
+                next_tick = max(next_tick + TICK_SECS, now)
+            if now >= next_refresh:
+                for tab_data in self.tab_data_list:
+                    self._update_tab_funding_data(tab_data)
+                next_refresh = now + REFRESH_SECS
+            while self._timers and self._timers[0][0] <= now:
+                self._call(heapq.heappop(self._timers)[2])
+
+            wake = min([next_tick, next_refresh] + ([self._timers[0][0]] if self._timers else []))
+            try:
+                self._call(self._events.get(timeout=max(0.0, wake - time.time())))
+                while True:
+                    self._call(self._events.get_nowait())
+            except queue.Empty:
+                pass
+
+    def stop(self):
+        self._running = False
+        self.post(lambda: None)   # будимо цикл
+
+    def shutdown(self):
+        for tab_data in self.tab_data_list:
+            get_cycle_coordinator().disarm(id(tab_data))
+        get_cycle_coordinator().shutdown()
+        self._engine.shutdown()
+        stop_market_hubs()
+        stop_private_streams()
+
+    @staticmethod
+    def _call(fn):
+        try:
+            fn()
+        except Exception as e:
+            print(f"Headless callback error: {e}")
+
+    # ---- Торгова логіка (спільний з GUI EntryCycle) --------------------- #
+
+    def _check_funding_time(self, tab_data):
+        if tab_data["funding_data"]:
+            self._cycle.tick(tab_data)
+
+    @staticmethod
+    def _on_position_closed(tab_data):
+        print(f"Position for {tab_data['selected_symbol']} closed")
+
+    # ---- Дані вкладки -------------------------------------------------- #
+
+    def _update_tab_funding_data(self, tab_data, retry_count=3, retry_delay=2):
+        tab_data["order_placed_this_cycle"] = False
+        self._engine.submit(
+            fetch_tab_snapshot,
+            tab_data["session"], tab_data["selected_symbol"], tab_data["exchange"],
+            retry_count, retry_delay,
+            on_done=lambda snap: self._apply_tab_snapshot(tab_data, snap),
+            key=("refresh", id(tab_data)),
+        )
+
+    def _apply_tab_snapshot(self, tab_data, snap):
+        if snap is None:
+            print(f"Could not refresh data for {tab_data['selected_symbol']}")
+            return
+        tab_data["funding_data"] = snap["funding_data"]
+        tab_data["last_price"] = snap["price"]
+        tab_data["last_balance"] = snap["balance"]
+        if snap["funding_data"]:
+            _, time_str = get_next_funding_time(snap["funding_data"]["funding_time"], tab_data["funding_interval_hours"])
+            print(f"{snap['symbol']}: funding {snap['funding_data']['funding_rate']:.4f}% in {time_str}, "
+                  f"price {snap['price']}, balance {snap['balance']}")
+
+
+def main(settings_path: str = sm.SETTINGS_PATH, log_path: str | None = None):
+    if log_path:
+        sys.stdout = sys.stderr = open(log_path, "a", encoding="utf-8", buffering=1)
+    sys.stdout = sys.stderr = _TimestampedStream(sys.stdout)
+
+    print("Starting headless trader...")
+    trader = HeadlessTrader(settings_path)
+    boot_profiler.mark("trader_built")
+    boot_profiler.report()
+    signal.signal(signal.SIGTERM, lambda *_: trader.stop())
+    try:
+        trader.run()
+    except KeyboardInterrupt:
+        print("Stopping headless trader...")
+    finally:
+        trader.shutdown()
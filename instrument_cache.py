@@ -0,0 +1,199 @@
+"""
+instrument_cache.py — локальний кеш метаданих інструментів (tick size, qty step ...).
+
+Усі лінійні інструменти завантажуються одним запитом при старті, зберігаються
+у файл і оновлюються у фоні за розкладом. Пошук за символом — O(1) зі
+словника, тож розміщення ордера не чекає на get_instruments_info.
+"""
+import json
+import os
+import threading
+import time
+
+from client_registry import shared_http_session
+from rate_limiter import get_rate_limiter
+from ticker_cache import BYBIT_REST, BYBIT_REST_TEST
+
+
+REFRESH_INTERVAL = 6 * 60 * 60  # сек — фонове оновлення метаданих
+CACHE_DIR = "."
+
+
+def _fetch_bybit_instruments(testnet: bool, timeout: int = 10) -> dict | None:
+    """Всі лінійні інструменти Bybit (з пагінацією курсором) -> {symbol: info}."""
+    base = BYBIT_REST_TEST if testnet else BYBIT_REST
+    result = {}
+    cursor = ""
+    try:
+        while True:
+            params = {"category": "linear", "limit": 1000}
+            if cursor:
+                params["cursor"] = cursor
+            get_rate_limiter().acquire("market")
+            resp = shared_http_session().get(f"{base}/v5/market/instruments-info", params=params, timeout=timeout)
+            resp.raise_for_status()
+            data = resp.json()
+            if data.get("retCode") != 0:
+                print(f"Error fetching instruments: {data.get('retMsg')}")
+                return None
+            for item in data["result"]["list"]:
+                lot = item.get("lotSizeFilter", {})
+                lev = item.get("leverageFilter", {})
+                interval_min = item.get("fundingInterval")
+                result[item["symbol"]] = {
+                    "tick_size": float(item.get("priceFilter", {}).get("tickSize") or 0) or None,
+                    "qty_step": float(lot.get("qtyStep") or 0) or None,
+                    "min_qty": float(lot.get("minOrderQty") or 0) or None,
+                    "max_leverage": float(lev.get("maxLeverage") or 0) or None,
+                    "funding_interval_hours": int(interval_min) / 60 if interval_min else None,
+                }
+            cursor = data["result"].get("nextPageCursor") or ""
+            if not cursor:
+                return result
+    except Exception as e:
+        print(f"Error fetching instruments: {e}")
+        return None
+
+
+def _fetch_binance_instruments(session) -> dict | None:
+    """Той самий exchange info, з якого get_symbol_info бере фільтри, але одним запитом."""
+    try:
+        response = session.get_exchange_info()
+        result = {}
+        for item in response["symbols"]:
+            filters = {f["filterType"]: f for f in item.get("filters", [])}
+            price_f = filters.get("PRICE_FILTER", {})
+            lot_f = filters.get("LOT_SIZE", {})
+            result[item["symbol"]] = {
+                "tick_size": float(price_f.get("tickSize") or 0) or None,
+                "qty_step": float(lot_f.get("stepSize") or 0) or None,
+                "min_qty": float(lot_f.get("minQty") or 0) or None,
+                "max_leverage": None,
+                "funding_interval_hours": None,
+            }
+        return result
+    except Exception as e:
+        print(f"Error fetching Binance exchange info: {e}")
+        return None
+
+
+class InstrumentCache:
+    def __init__(self, exchange: str, testnet: bool = False, path: str | None = None,
+                 refresh_interval: float = REFRESH_INTERVAL):
+        self.exchange = exchange
+        self.testnet = testnet
+        suffix = "_testnet" if testnet else ""
+        self.path = path or os.path.join(CACHE_DIR, f"instruments_{exchange.lower()}{suffix}.json")
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._data: dict[str, dict] = {}
+        self._updated_at = 0.0
+        self._session = None
+        self._thread = None
+        self._wake = threading.Event()   # attach_session() будить фоновий потік одразу
+
+    # ---- Файл ---------------------------------------------------------- #
+
+    def load_file(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            with self._lock:
+                self._data = payload.get("instruments", {})
+                self._updated_at = payload.get("updated_at", 0.0)
+            print(f"Loaded {len(self._data)} {self.exchange} instruments from {self.path}")
+            return True
+        except Exception as e:
+            print(f"Error loading instrument cache: {e}")
+            return False
+
+    def save_file(self):
+        try:
+            with self._lock:
+                payload = {"updated_at": self._updated_at, "instruments": self._data}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving instrument cache: {e}")
+
+    # ---- Оновлення ----------------------------------------------------- #
+
+    def refresh(self) -> bool:
+        with self._refresh_lock:
+            if self.exchange == "Bybit":
+                data = _fetch_bybit_instruments(self.testnet)
+            elif self._session is not None:
+                data = _fetch_binance_instruments(self._session)
+            else:
+                return False
+            if not data:
+                return False
+            with self._lock:
+                self._data = data
+                self._updated_at = time.time()
+            print(f"Instrument cache refreshed: {len(data)} {self.exchange} symbols")
+            self.save_file()
+            return True
+
+    def start_background_refresh(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._refresh_loop, name=f"Instruments-{self.exchange}", daemon=True)
+        self._thread.start()
+
+    def _refresh_loop(self):
+        while True:
+            age = time.time() - self._updated_at
+            if age >= self.refresh_interval or not self._data:
+                if not self.refresh():
+                    self._wake.wait(60)
+                    self._wake.clear()
+                    continue
+            self._wake.wait(max(1.0, self.refresh_interval - (time.time() - self._updated_at)))
+            self._wake.clear()
+
+    def attach_session(self, session):
+        """Сесія для Binance exchange info; перше завантаження робить фоновий потік, не викликач."""
+        if session is None or self._session is not None:
+            return
+        self._session = session
+        if self.exchange != "Bybit" and not self._data:
+            self._wake.set()
+
+    # ---- Пошук --------------------------------------------------------- #
+
+    def get(self, symbol: str, session=None) -> dict | None:
+        """Лише словник у пам'яті — без мережі; поки кеш порожній, викликач іде в REST сам."""
+        self.attach_session(session)
+        with self._lock:
+            return self._data.get(symbol.upper()) if symbol else None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+_caches: dict[tuple, InstrumentCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_instrument_cache(exchange: str, testnet: bool = False, session=None) -> InstrumentCache:
+    """
+    Спільний кеш; при першому зверненні читає файл і запускає фонове оновлення.
+    session — для Binance: з нею фоновий потік одразу завантажує exchange info.
+    """
+    key = (exchange, bool(testnet))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = InstrumentCache(exchange, testnet)
+            cache.load_file()
+            cache.start_background_refresh()
+            _caches[key] = cache
+    cache.attach_session(session)
+    return cache
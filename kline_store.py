@@ -0,0 +1,122 @@
+"""
+kline_store.py — локальне сховище свічок Bybit для рекордера статистики.
+
+Для кожного символу тримається кільцевий буфер останніх свічок (за замовчуванням
+48 годинних). Запит докачує лише свічки, новіші за останню збережену, плюс
+саму останню — вона могла бути ще не закритою. Буфер зберігається у файл і
+переживає перезапуск рекордера.
+
+get() повертає свічки у форматі Bybit V5 (новіша перша), тож код, що читав
+result.list з get_kline, працює без змін.
+"""
+import json
+import os
+import threading
+import time
+
+
+CAPACITY = 48               # свічок на символ
+KLINE_FILE = "klines_{interval}.json"
+
+
+def _interval_ms(interval: str) -> int:
+    if interval == "D":
+        return 24 * 60 * 60 * 1000
+    return int(interval) * 60 * 1000
+
+
+class KlineStore:
+    def __init__(self, interval: str = "60", capacity: int = CAPACITY, path: str | None = None, bucket=None):
+        self.interval = interval
+        self.capacity = capacity
+        self.path = path or KLINE_FILE.format(interval=interval)
+        self.bucket = bucket
+        self._step = _interval_ms(interval)
+        self._lock = threading.Lock()
+        self._data: dict[str, list[list]] = {}   # symbol -> свічки за зростанням часу
+        self.requests = 0
+        self.fetched_candles = 0
+        self.served_candles = 0
+
+    # ---- Файл ---------------------------------------------------------- #
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            with self._lock:
+                self._data = payload.get("symbols", {})
+            print(f"Loaded klines for {len(self._data)} symbols from {self.path}")
+            return True
+        except Exception as e:
+            print(f"Error loading kline store: {e}")
+            return False
+
+    def save(self):
+        try:
+            with self._lock:
+                payload = {"interval": self.interval, "symbols": self._data}
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(payload, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving kline store: {e}")
+
+    # ---- Доступ -------------------------------------------------------- #
+
+    def get(self, session, symbol: str, limit: int = 13) -> list[list] | None:
+        """Останні limit свічок (новіша перша); мережа — лише для свічок, яких ще немає."""
+        now_start = int(time.time() * 1000) // self._step * self._step
+        with self._lock:
+            candles = self._data.get(symbol, [])
+            last_start = int(candles[-1][0]) if candles else None
+
+        if last_start is not None and len(candles) >= limit and now_start - last_start < self.capacity * self._step:
+            # Остання збережена свічка могла бути незакритою — перезапитуємо з неї
+            missing = (now_start - last_start) // self._step + 1
+            fresh = self._fetch(session, symbol, missing, start=last_start)
+        else:
+            fresh = self._fetch(session, symbol, max(limit, min(self.capacity, 13)))
+        if fresh is None:
+            return None
+
+        with self._lock:
+            merged = {int(c[0]): c for c in self._data.get(symbol, [])}
+            for c in fresh:
+                merged[int(c[0])] = c
+            ordered = [merged[k] for k in sorted(merged)][-self.capacity:]
+            self._data[symbol] = ordered
+            result = ordered[::-1][:limit]
+            self.served_candles += max(0, len(result) - len(fresh))
+        return result
+
+    def _fetch(self, session, symbol: str, limit: int, start: int | None = None) -> list[list] | None:
+        params = {"category": "linear", "symbol": symbol, "interval": self.interval, "limit": limit}
+        if start is not None:
+            params["start"] = start
+        if self.bucket is not None:
+            self.bucket.acquire()
+        resp = session.get_kline(**params)
+        with self._lock:
+            self.requests += 1
+        if resp.get("retCode") != 0:
+            print(f"Error fetching klines for {symbol}: {resp.get('retMsg')}")
+            return None
+        candles = resp["result"]["list"]
+        with self._lock:
+            self.fetched_candles += len(candles)
+        return candles
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.fetched_candles + self.served_candles
+            return {
+                "symbols": len(self._data),
+                "requests": self.requests,
+                "fetched_candles": self.fetched_candles,
+                "served_candles": self.served_candles,
+                "saved_pct": self.served_candles / total * 100 if total else 0.0,
+            }
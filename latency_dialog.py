@@ -0,0 +1,77 @@
+"""
+latency_dialog.py — вікно з перцентилями затримок шляху ордера.
+"""
+import os
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (
+    QAbstractItemView,
+    QDialog,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from latency_tracker import EXPORT_FILE
+
+
+class LatencyDialog(QDialog):
+    COLUMNS = ["Exchange", "Stage", "Count", "p50 ms", "p95 ms", "p99 ms"]
+
+    def __init__(self, tracker, title="Order Path Latency", parent=None):
+        super().__init__(parent)
+        self.tracker = tracker
+
+        self.setWindowTitle(title)
+        self.resize(700, 420)
+
+        layout = QVBoxLayout(self)
+        header = QHBoxLayout()
+        self.status_label = QLabel()
+        header.addWidget(self.status_label)
+        header.addStretch()
+
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self._refresh)
+        header.addWidget(refresh_btn)
+
+        export_btn = QPushButton("Export CSV")
+        export_btn.clicked.connect(self._export)
+        header.addWidget(export_btn)
+        layout.addLayout(header)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+
+        self._refresh()
+
+    def _refresh(self):
+        rows = self.tracker.summary()
+        self.status_label.setText(f"Cycles: {len(self.tracker.cycles())} | ms from [ORDER TRIGGER]")
+        self.table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            values = [
+                row["exchange"], row["stage"], str(row["count"]),
+                f"{row['p50']:.1f}", f"{row['p95']:.1f}", f"{row['p99']:.1f}",
+            ]
+            for c, val in enumerate(values):
+                item = QTableWidgetItem(val)
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.table.setItem(r, c, item)
+        self.table.resizeColumnsToContents()
+
+    def _export(self):
+        try:
+            count = self.tracker.export_csv(EXPORT_FILE)
+            self.status_label.setText(f"Exported {count} cycles to {os.path.abspath(EXPORT_FILE)}")
+        except Exception as e:
+            print(f"Error exporting latency stats: {e}")
+            self.status_label.setText(f"Export failed: {e}")
@@ -0,0 +1,117 @@
+"""
+latency_tracker.py — заміри затримок на шляху угоди по фандингу.
+
+Кожен цикл (символ + біржа) отримує мітки часу на етапах від [ORDER TRIGGER]
+до підтвердження reduce-only ліміту. Зведення — p50/p95/p99 у мс від тригера
+до кожного етапу, окремо по біржах; сирі цикли можна вивантажити в CSV.
+"""
+import csv
+import itertools
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+STAGES = (
+    "trigger",
+    "market_send",
+    "market_ack",
+    "exec_price",
+    "tick_size",
+    "orderbook",
+    "limit_ack",
+)
+MAX_CYCLES = 1000
+EXPORT_FILE = "latency_stats.csv"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Перцентиль методом nearest-rank."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class LatencyTracker:
+    def __init__(self, max_cycles: int = MAX_CYCLES):
+        self.max_cycles = max_cycles
+        self._lock = threading.Lock()
+        self._cycles: "OrderedDict[int, dict]" = OrderedDict()
+        self._ids = itertools.count(1)
+
+    def start_cycle(self, symbol: str, exchange: str, t: float | None = None) -> int:
+        """Новий цикл; етап trigger фіксується одразу."""
+        cycle_id = next(self._ids)
+        with self._lock:
+            self._cycles[cycle_id] = {
+                "id": cycle_id,
+                "symbol": symbol,
+                "exchange": exchange,
+                "marks": {"trigger": t if t is not None else time.time()},
+            }
+            while len(self._cycles) > self.max_cycles:
+                self._cycles.popitem(last=False)
+        return cycle_id
+
+    def mark(self, cycle_id: int | None, stage: str, t: float | None = None):
+        if cycle_id is None:
+            return
+        with self._lock:
+            cycle = self._cycles.get(cycle_id)
+            if cycle is not None:
+                cycle["marks"][stage] = t if t is not None else time.time()
+
+    def cycles(self) -> list[dict]:
+        with self._lock:
+            return [
+                {**c, "marks": dict(c["marks"])} for c in self._cycles.values()
+            ]
+
+    def summary(self, symbol: str | None = None) -> list[dict]:
+        """Рядки {exchange, stage, count, p50, p95, p99} — мс від trigger до етапу."""
+        samples: dict[tuple, list[float]] = {}
+        for c in self.cycles():
+            if symbol and c["symbol"] != symbol:
+                continue
+            t0 = c["marks"].get("trigger")
+            for stage in STAGES[1:]:
+                t = c["marks"].get(stage)
+                if t0 is not None and t is not None:
+                    samples.setdefault((c["exchange"], stage), []).append((t - t0) * 1000)
+        rows = []
+        for (exchange, stage), values in sorted(samples.items(), key=lambda kv: (kv[0][0], STAGES.index(kv[0][1]))):
+            rows.append({
+                "exchange": exchange,
+                "stage": stage,
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            })
+        return rows
+
+    def export_csv(self, path: str = EXPORT_FILE) -> int:
+        """Сирі цикли: мітки кожного етапу в мс від trigger. Повертає кількість рядків."""
+        cycles = self.cycles()
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["cycle", "trigger_utc", "symbol", "exchange", *[f"{s}_ms" for s in STAGES[1:]]])
+            for c in cycles:
+                t0 = c["marks"]["trigger"]
+                writer.writerow([
+                    c["id"],
+                    time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(t0)),
+                    c["symbol"],
+                    c["exchange"],
+                    *[
+                        f"{(c['marks'][s] - t0) * 1000:.1f}" if s in c["marks"] else ""
+                        for s in STAGES[1:]
+                    ],
+                ])
+        return len(cycles)
+
+
+tracker = LatencyTracker()
@@ -1,35 +1,95 @@
 import os
 from datetime import datetime, timedelta, timezone
-from dotenv import load_dotenv
 import math
+import threading
 import time
-from pybit.unified_trading import HTTP
-from binance.client import Client as BinanceClient
-
-def initialize_client(exchange, testnet=False):
+from market_stream import get_market_hub
+from ticker_cache import get_ticker_cache
+from request_cache import SingleFlightCache
+from instrument_cache import get_instrument_cache
+from private_stream import get_private_stream
+from rate_limiter import RateLimitedSession, get_rate_limiter, analytics_priority
+from server_clock import get_server_clock, best_clock, exchange_now, parse_server_time
+from client_registry import ClientRegistry
+import boot_profiler
+
+BALANCE_CACHE_TTL = 5.0  # сек — скільки живе закешований баланс гаманця
+FILL_WATCH_TIMEOUT = 120.0  # сек — після цього слухач виконання знімається сам (ордер відхилено / не виконано)
+_balance_cache = SingleFlightCache(BALANCE_CACHE_TTL)
+
+def initialize_client(exchange, testnet=False, account="default"):
+    """Спільний клієнт на (exchange, testnet, account): повторні виклики не створюють нову сесію."""
+    return _clients.get(exchange, testnet, account)
+
+def existing_client(exchange, testnet=False, account="default"):
+    """Клієнт, якщо його вже створено, інакше None — нічого не імпортує й не будує."""
+    return _clients.peek(exchange, testnet, account)
+
+def get_client_registry_stats():
+    return _clients.stats()
+
+def _build_client(exchange, testnet=False, account="default"):
+    # SDK бірж та dotenv імпортуються лише при першому клієнті — не на старті
+    with boot_profiler.timed("import dotenv"):
+        from dotenv import load_dotenv
     load_dotenv()
+    # Додаткові акаунти: BYBIT_API_KEY_<ACCOUNT> / BYBIT_API_KEY_TEST_<ACCOUNT> тощо
+    suffix = "" if account == "default" else f"_{account.upper()}"
     if exchange == "Bybit":
         if testnet:
-            api_key = os.getenv('BYBIT_API_KEY_TEST')
-            api_secret = os.getenv('BYBIT_API_SECRET_TEST')
+            api_key = os.getenv('BYBIT_API_KEY_TEST' + suffix)
+            api_secret = os.getenv('BYBIT_API_SECRET_TEST' + suffix)
         else:
-            api_key = os.getenv('BYBIT_API_KEY')
-            api_secret = os.getenv('BYBIT_API_SECRET')
+            api_key = os.getenv('BYBIT_API_KEY' + suffix)
+            api_secret = os.getenv('BYBIT_API_SECRET' + suffix)
         if not api_key or not api_secret:
             raise ValueError("Bybit API key or secret not found in environment variables")
-        return HTTP(testnet=testnet, api_key=api_key, api_secret=api_secret)
+        with boot_profiler.timed("import pybit"):
+            from pybit.unified_trading import HTTP
+        session = RateLimitedSession(HTTP(testnet=testnet, api_key=api_key, api_secret=api_secret), get_rate_limiter())
+        _attach_private_stream(session)
+        return session
     else:  # Binance
         if testnet:
-            api_key = os.getenv('BINANCE_API_KEY_TEST')
-            api_secret = os.getenv('BINANCE_API_SECRET_TEST')
+            api_key = os.getenv('BINANCE_API_KEY_TEST' + suffix)
+            api_secret = os.getenv('BINANCE_API_SECRET_TEST' + suffix)
         else:
-            api_key = os.getenv('BINANCE_API_KEY')
-            api_secret = os.getenv('BINANCE_API_SECRET')
+            api_key = os.getenv('BINANCE_API_KEY' + suffix)
+            api_secret = os.getenv('BINANCE_API_SECRET' + suffix)
         if not api_key or not api_secret:
             raise ValueError("Binance API key or secret not found in environment variables")
-        return BinanceClient(api_key, api_secret, testnet=testnet)
+        with boot_profiler.timed("import python-binance"):
+            from binance.client import Client as BinanceClient
+        return RateLimitedSession(BinanceClient(api_key, api_secret, testnet=testnet), get_rate_limiter())
+
+_clients = ClientRegistry(_build_client)
 
 def get_account_balance(session, exchange):
+    """Баланс USDT; одночасні та повторні виклики ділять один запит і кеш на BALANCE_CACHE_TTL."""
+    return _balance_cache.get((id(session), exchange), lambda: _fetch_account_balance(session, exchange))
+
+def invalidate_account_balance(session=None, exchange=None):
+    """Скидає кеш балансу (після розміщення ордера, виконання, закриття позицій)."""
+    if session is None:
+        _balance_cache.invalidate()
+    else:
+        for ex in ((exchange,) if exchange else ("Bybit", "Binance")):
+            _balance_cache.invalidate((id(session), ex))
+
+def set_balance_cache_ttl(ttl):
+    global BALANCE_CACHE_TTL
+    BALANCE_CACHE_TTL = ttl
+    _balance_cache.ttl = ttl
+
+def get_rate_limit_stats():
+    """Рівні відер market / trade / account, очікування та відмови біржі через ліміт."""
+    return get_rate_limiter().stats()
+
+def get_balance_cache_stats():
+    """hits / misses / coalesced — скільки звернень до гаманця зекономлено."""
+    return _balance_cache.stats()
+
+def _fetch_account_balance(session, exchange):
     try:
         print("Fetching account balance...")
         if exchange == "Bybit":
@@ -54,9 +114,130 @@ def get_account_balance(session, exchange):
         print(f"Error fetching balance: {e}")
         return None
 
+def _attach_private_stream(session):
+    """Запускає приватний потік для ключа сесії; подія wallet скидає кеш балансу."""
+    stream = _private_stream(session)
+    if stream is not None:
+        stream.add_listener(
+            lambda topic, item: topic == "wallet" and invalidate_account_balance(session, "Bybit")
+        )
+
+def _private_stream(session):
+    """Приватний WebSocket для Bybit-сесії (URL можна перевизначити BYBIT_PRIVATE_WS_URL)."""
+    api_key = getattr(session, "api_key", None)
+    api_secret = getattr(session, "api_secret", None)
+    if not api_key or not api_secret:
+        return None
+    try:
+        return get_private_stream(
+            api_key, api_secret, getattr(session, "testnet", False),
+            url=os.getenv("BYBIT_PRIVATE_WS_URL") or None,
+        )
+    except Exception as e:
+        print(f"Private stream unavailable: {e}")
+        return None
+
+def get_streamed_position_size(session, symbol):
+    """Розмір позиції з приватного потоку або None, якщо потік ще не знає символу."""
+    stream = _private_stream(session)
+    if stream is None or not stream.is_authenticated():
+        return None
+    return stream.position_size(symbol)
+
+def seed_streamed_position(session, symbol, size):
+    stream = _private_stream(session)
+    if stream is not None and stream.is_authenticated():
+        stream.seed_position(symbol, size)
+
+def on_order_filled(session, order_id, callback, timeout=FILL_WATCH_TIMEOUT):
+    """
+    Викликає callback(), щойно приватний потік побачить виконання ордера.
+    Повертає cancel() — знімає слухача (напр. коли спрацював запасний таймер), — або None,
+    якщо потоку немає і працює лише таймер. Без виконання за timeout слухач знімається сам.
+    """
+    stream = _private_stream(session)
+    if stream is None or not stream.is_authenticated():
+        return None
+    done = threading.Event()
+
+    def cancel():
+        if not done.is_set():
+            done.set()
+            stream.remove_listener(_listener)
+            expiry.cancel()
+
+    def _listener(topic, item):
+        if done.is_set() or str(item.get("orderId")) != str(order_id):
+            return
+        if stream.get_fill(order_id):
+            cancel()
+            callback()
+
+    expiry = threading.Timer(timeout, cancel)
+    expiry.daemon = True
+    stream.add_listener(_listener)
+    expiry.start()
+    _listener("order", {"orderId": order_id})  # вже виконаний до підписки
+    return cancel
+
+def _streamed_ticker(session, symbol):
+    """Тікер з WebSocket-хаба; підписує символ, якщо його ще немає в хабі."""
+    try:
+        hub = get_market_hub(getattr(session, "testnet", False))
+        ticker = hub.get_ticker(symbol)
+        if ticker is None and not hub.is_subscribed(symbol):
+            hub.subscribe([symbol])
+        return ticker
+    except Exception as e:
+        print(f"Market stream unavailable: {e}")
+        return None
+
+def get_streamed_price(session, symbol, exchange):
+    """Остання ціна з WebSocket-хаба без мережі; None на Binance або якщо тікера ще немає."""
+    if exchange != "Bybit":
+        return None
+    try:
+        ticker = get_market_hub(getattr(session, "testnet", False)).get_ticker(symbol)
+    except Exception as e:
+        print(f"Market stream unavailable: {e}")
+        return None
+    if ticker and ticker.get("lastPrice"):
+        return float(ticker["lastPrice"])
+    return None
+
+def watch_orderbook(session, symbol):
+    """Підписує локальну L2-книгу символу, щоб у момент фандингу вона вже була готова."""
+    try:
+        get_market_hub(getattr(session, "testnet", False)).subscribe_orderbook([symbol])
+    except Exception as e:
+        print(f"Market stream unavailable: {e}")
+
+def _streamed_orderbook(session, symbol):
+    try:
+        return get_market_hub(getattr(session, "testnet", False)).get_orderbook(symbol)
+    except Exception as e:
+        print(f"Market stream unavailable: {e}")
+        return None
+
+def _snapshot_ticker(session, symbol):
+    """Тікер зі спільного знімка всіх лінійних тікерів (один REST-запит на TTL)."""
+    try:
+        return get_ticker_cache(getattr(session, "testnet", False)).get(symbol)
+    except Exception as e:
+        print(f"Ticker snapshot unavailable: {e}")
+        return None
+
 def get_funding_data(session, symbol, exchange):
     """Fetch current (live) funding rate and next funding time via tickers endpoint."""
     try:
+        if exchange == "Bybit":
+            ticker = _streamed_ticker(session, symbol) or _snapshot_ticker(session, symbol)
+            if ticker and ticker.get("fundingRate") and ticker.get("nextFundingTime"):
+                return {
+                    "symbol": symbol,
+                    "funding_rate": float(ticker["fundingRate"]) * 100,
+                    "funding_time": int(ticker["nextFundingTime"]) / 1000.0
+                }
         print(f"Fetching funding rate for {symbol}...")
         if exchange == "Bybit":
             response = session.get_tickers(category="linear", symbol=symbol)
@@ -91,6 +272,10 @@ def get_funding_data(session, symbol, exchange):
 
 def get_current_price(session, symbol, exchange):
     try:
+        if exchange == "Bybit":
+            ticker = _streamed_ticker(session, symbol) or _snapshot_ticker(session, symbol)
+            if ticker and ticker.get("lastPrice"):
+                return float(ticker["lastPrice"])
         print(f"Fetching current price for {symbol}...")
         if exchange == "Bybit":
             response = session.get_tickers(category="linear", symbol=symbol)
@@ -160,6 +345,7 @@ def place_stop_loss_order(session, symbol, side, qty, stop_price, tick_size, exc
             )
             if response["retCode"] == 0:
                 print(f"Stop-loss order placed: {response['result']}")
+                invalidate_account_balance(session, exchange)
                 return response["result"]["orderId"]
             else:
                 print(f"Error placing stop-loss order: {response['retMsg']}")
@@ -174,6 +360,7 @@ def place_stop_loss_order(session, symbol, side, qty, stop_price, tick_size, exc
                 reduceOnly=True
             )
             print(f"Stop-loss order placed: {response}")
+            invalidate_account_balance(session, exchange)
             return response["orderId"]
     except Exception as e:
         print(f"Error placing stop-loss order: {e}")
@@ -182,32 +369,31 @@ def place_stop_loss_order(session, symbol, side, qty, stop_price, tick_size, exc
 def get_optimal_limit_price(session, symbol, side, current_price, exchange, profit_percentage, tick_size, is_inverted=False):
     """Покращена версія з правильним боком ордербуку та врахуванням інверсії."""
     try:
-        print(f"Fetching order book for {symbol} to determine optimal limit price (inverted: {is_inverted})...")
-
-        if exchange == "Bybit":
-            response = session.get_orderbook(category="linear", symbol=symbol, limit=50)
-            if response["retCode"] != 0 or not response["result"]:
-                return None
-            bids = [(float(p), float(q)) for p, q in response["result"]["b"]]
-            asks = [(float(p), float(q)) for p, q in response["result"]["a"]]
-        else:  # Binance
-            response = session.get_order_book(symbol=symbol, limit=50)
-            bids = [(float(p), float(q)) for p, q in response["bids"]]
-            asks = [(float(p), float(q)) for p, q in response["asks"]]
-
         # Напрямок залежить від інверсії: OFF -> вниз (-), ON -> вгору (+)
         direction = 1 if is_inverted else -1
         target = current_price * (1 + (direction * profit_percentage) / 100)
 
         # Правильний бік ордербуку для пошуку ліквідності
         if side == "Buy":   # Ми в Лонгу → Sell limit → нас виконають Bids
-            min_p = target * 0.992
-            max_p = target * 1.018
-            relevant = [(price, qty) for price, qty in bids if min_p <= price <= max_p]
+            book_side, min_p, max_p = "b", target * 0.992, target * 1.018
         else:               # Ми в Шорті → Buy limit → нас виконають Asks
-            min_p = target * 0.982
-            max_p = target * 1.008
-            relevant = [(price, qty) for price, qty in asks if min_p <= price <= max_p]
+            book_side, min_p, max_p = "a", target * 0.982, target * 1.008
+
+        book = _streamed_orderbook(session, symbol) if exchange == "Bybit" else None
+        if book is not None:
+            # Локальна книга з WebSocket — без мережевого запиту на критичному шляху
+            relevant = book.range(book_side, min_p, max_p)
+        else:
+            print(f"Fetching order book for {symbol} to determine optimal limit price (inverted: {is_inverted})...")
+            if exchange == "Bybit":
+                response = session.get_orderbook(category="linear", symbol=symbol, limit=50)
+                if response["retCode"] != 0 or not response["result"]:
+                    return None
+                levels = response["result"][book_side]
+            else:  # Binance
+                response = session.get_order_book(symbol=symbol, limit=50)
+                levels = response["bids" if book_side == "b" else "asks"]
+            relevant = [(float(p), float(q)) for p, q in levels if min_p <= float(p) <= max_p]
 
         if not relevant:
             print(f"No liquidity in target range for {symbol}")
@@ -232,10 +418,22 @@ def get_optimal_limit_price(session, symbol, side, current_price, exchange, prof
         print(f"Error in get_optimal_limit_price: {e}")
         return None
 
+def get_next_funding_timestamp(funding_time, funding_interval_hours, is_testnet=False):
+    """Абсолютний момент наступного фандингу (epoch біржі, сек) — для точного планування входу."""
+    now_ts = exchange_now()
+    if is_testnet:
+        cycle_duration = 30
+        return now_ts - (now_ts % cycle_duration) + cycle_duration
+    if funding_time > now_ts:
+        return funding_time
+    interval = funding_interval_hours * 3600
+    intervals_passed = int((now_ts - funding_time) / interval) + 1
+    return funding_time + intervals_passed * interval
+
 def get_next_funding_time(funding_time, funding_interval_hours, is_testnet=False):
     if is_testnet:
         # Режим налагодження для тестнету: цикл кожні 30 секунд
-        now_ts = time.time()
+        now_ts = exchange_now()
         # Рахуємо скільки повних 30-секундних інтервалів пройшло з початку епохи
         cycle_duration = 30
         elapsed = now_ts % cycle_duration
@@ -247,7 +445,7 @@ def get_next_funding_time(funding_time, funding_interval_hours, is_testnet=False
         return secs_left, f"00:{minutes:02d}:{seconds:02d}"
 
     funding_dt = datetime.fromtimestamp(funding_time, tz=timezone.utc)
-    current_time = datetime.now(timezone.utc)
+    current_time = datetime.fromtimestamp(exchange_now(), tz=timezone.utc)  # годинник біржі, не локальний
 
     # Якщо час з API вже в майбутньому — це і є наступний фандинг
     if funding_dt > current_time:
@@ -263,42 +461,115 @@ def get_next_funding_time(funding_time, funding_interval_hours, is_testnet=False
     minutes, seconds = divmod(remainder, 60)
     return time_diff.total_seconds(), f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 #
-def place_market_order(session, symbol, side, qty, exchange):
+def round_price_toward_profit(price, side, tick_size):
+    """Округлення ціни закриття до tick size в бік прибутку."""
+    if not tick_size:
+        return round(price, 4)
+    decimal_places = abs(int(math.log10(tick_size)))
+    if side == "Buy":      # Sell limit (лонг) → хочемо вищу ціну → округлюємо вниз
+        price = math.floor(price / tick_size) * tick_size
+    else:                  # Buy limit (шорт) → хочемо нижчу ціну → округлюємо вгору
+        price = math.ceil(price / tick_size) * tick_size
+    return round(price, decimal_places)
+
+def take_profit_price(reference_price, side, profit_percentage, tick_size, is_inverted=False):
+    """Ціна профіт-ліміту від ціни входу (або ціни до угоди) і profit_percentage."""
+    direction = 1 if is_inverted else -1
+    target = reference_price * (1 + (direction * profit_percentage) / 100)
+    return round_price_toward_profit(target, side, tick_size)
+
+def place_market_order(session, symbol, side, qty, exchange, take_profit=None):
+    """Маркет-вхід; повертає orderId або None. take_profit — див. place_entry_order."""
+    return place_entry_order(session, symbol, side, qty, exchange, take_profit)[0]
+
+def _tp_rejected(code, message):
+    """Bybit відхилив саме прикріплений TP (ціна не з того боку від бази, tpsl-параметри)."""
+    message = str(message).lower()
+    return code == 10001 or "takeprofit" in message or "tpsl" in message
+
+def place_entry_order(session, symbol, side, qty, exchange, take_profit=None):
+    """
+    Маркет-вхід; повертає (orderId або None, TP, що справді стоїть, або None).
+    take_profit — ціна reduce-only ліміту, що йде разом із входом:
+    на Bybit як прикріплений TP (tpslMode=Partial, tpOrderType=Limit) в тому ж запиті;
+    якщо біржа відхиляє саме TP, вхід повторюється один раз без нього.
+    Binance так не вміє, тож там це запасний шлях: TP іде другим, послідовним запитом
+    лише після відповіді на маркет-ордер (плюс один RTT, поки позиція без TP).
+    """
+    try:
+        qty_step = get_qty_step(session, symbol, exchange)
+        rounded_qty = round_qty(qty, qty_step)
+        
+        print(f"Placing market {side} order for {symbol} with quantity {rounded_qty} (original: {qty}, step: {qty_step})...")
+        
+        if exchange == "Bybit":
+            order = {
+                "category": "linear",
+                "symbol": symbol,
+                "side": side,
+                "orderType": "Market",
+                "qty": str(rounded_qty),
+                "timeInForce": "GTC",
+            }
+            tp_params = {}
+            if take_profit:
+                tp_params = {
+                    "takeProfit": str(take_profit),
+                    "tpLimitPrice": str(take_profit),
+                    "tpOrderType": "Limit",
+                    "tpslMode": "Partial",
+                    "tpTriggerBy": "LastPrice",
+                }
+                print(f"Attaching take-profit limit at {take_profit} to {symbol} entry")
+            try:
+                response = session.place_order(**order, **tp_params)
+            except Exception as e:
+                # pybit кидає виняток на retCode != 0
+                code = getattr(e, "status_code", None)
+                if not (tp_params and _tp_rejected(code, e)):
+                    raise
+                response = {"retCode": code, "retMsg": str(e)}
+            if response["retCode"] != 0 and tp_params and _tp_rejected(response["retCode"], response["retMsg"]):
+                print(f"Take-profit rejected for {symbol} ({response['retMsg']}), retrying entry without it")
+                take_profit = None
+                response = session.place_order(**order)
+            if response["retCode"] == 0:
+                print(f"Market order placed: {response['result']}")
+                invalidate_account_balance(session, exchange)
+                return response["result"]["orderId"], take_profit
+            else:
+                print(f"Error placing market order: {response['retMsg']}")
+                return None, None
+        else:  # Binance
+            response = session.create_order(
+                symbol=symbol,
+                side=side.upper(),
+                type="MARKET",
+                quantity=qty
+            )
+            print(f"Market order placed: {response}")
+            invalidate_account_balance(session, exchange)
+            if take_profit:
+                print(f"Binance has no attached take-profit, sending limit at {take_profit} after the fill")
+                if not place_limit_close_order(session, symbol, side, qty, take_profit, None, exchange):
+                    take_profit = None
+            return response["orderId"], take_profit
+    except Exception as e:
+        print(f"Error placing market order: {e}")
+        return None, None
+
+def _cached_instrument(session, symbol, exchange):
+    """Метадані символу з локального кешу інструментів (без мережі на гарячому шляху)."""
     try:
-        qty_step = get_qty_step(session, symbol, exchange)
-        rounded_qty = round_qty(qty, qty_step)
-        
-        print(f"Placing market {side} order for {symbol} with quantity {rounded_qty} (original: {qty}, step: {qty_step})...")
-        
-        if exchange == "Bybit":
-            response = session.place_order(
-                category="linear",
-                symbol=symbol,
-                side=side,
-                orderType="Market",
-                qty=str(rounded_qty),
-                timeInForce="GTC"
-            )
-            if response["retCode"] == 0:
-                print(f"Market order placed: {response['result']}")
-                return response["result"]["orderId"]
-            else:
-                print(f"Error placing market order: {response['retMsg']}")
-                return None
-        else:  # Binance
-            response = session.create_order(
-                symbol=symbol,
-                side=side.upper(),
-                type="MARKET",
-                quantity=qty
-            )
-            print(f"Market order placed: {response}")
-            return response["orderId"]
+        return get_instrument_cache(exchange, getattr(session, "testnet", False)).get(symbol, session)
     except Exception as e:
-        print(f"Error placing market order: {e}")
+        print(f"Instrument cache unavailable: {e}")
         return None
 
 def get_symbol_info(session, symbol, exchange):
+    info = _cached_instrument(session, symbol, exchange)
+    if info and info.get("tick_size"):
+        return info["tick_size"]
     try:
         if exchange == "Bybit":
             response = session.get_instruments_info(category="linear", symbol=symbol)
@@ -326,6 +597,13 @@ def get_symbol_info(session, symbol, exchange):
 def get_order_execution_price(session, symbol, order_id, exchange):
     try:
         if exchange == "Bybit":
+            stream = _private_stream(session)
+            fill = stream.wait_fill(order_id) if stream is not None else None
+            if fill:
+                execution_price, exec_time_ms = fill
+                exec_ts = exec_time_ms / 1000 if exec_time_ms else time.time()
+                execution_time_str = datetime.fromtimestamp(exec_ts).strftime("%Y-%m-%d %H:%M")
+                return execution_price, execution_time_str
             response = session.get_order_history(category="linear", symbol=symbol, orderId=order_id)
             if response["retCode"] != 0 or not response["result"]["list"]:
                 print(f"Error fetching order execution price for {symbol}: {response['retMsg']}")
@@ -376,6 +654,7 @@ def place_limit_close_order(session, symbol, side, qty, price, tick_size, exchan
             )
             if response["retCode"] == 0:
                 print(f"Limit close order placed: {response['result']}")
+                invalidate_account_balance(session, exchange)
                 return response["result"]["orderId"]
             else:
                 print(f"Error placing limit order: {response['retMsg']}")
@@ -391,6 +670,7 @@ def place_limit_close_order(session, symbol, side, qty, price, tick_size, exchan
                 reduceOnly=True
             )
             print(f"Limit close order placed: {response}")
+            invalidate_account_balance(session, exchange)
             return response["orderId"]
     except Exception as e:
         print(f"Error placing limit order: {e}")
@@ -399,8 +679,6 @@ def place_limit_close_order(session, symbol, side, qty, price, tick_size, exchan
 def close_all_positions(session, exchange, symbol=None):
     """Close all open positions on the exchange."""
     try:
-        qty_step = get_qty_step(session, symbol, exchange)
-        qty = round_qty(qty, qty_step)
         print(f"Closing all open positions on {exchange}...")
         if exchange == "Bybit":
             response = session.get_positions(category="linear", settleCoin="USDT")
@@ -459,6 +737,8 @@ def close_all_positions(session, exchange, symbol=None):
     except Exception as e:
         print(f"Error closing positions: {e}")
         return False
+    finally:
+        invalidate_account_balance(session, exchange)
 
 
 def set_leverage(session, symbol, leverage, exchange):
@@ -486,42 +766,55 @@ def set_leverage(session, symbol, leverage, exchange):
         return False
 
 
-def update_ping(session, ping_label, exchange):
+def measure_ping(session, exchange):
+    """
+    Round-trip до сервера в мс або None при помилці (без доступу до UI — можна з воркера).
+    Кожен пінг — ще й замір для оцінки зсуву годинника біржі.
+    """
     try:
         print(f"Pinging {exchange} server...")
         start_time = time.time()
-        if exchange == "Bybit":
-            response = session.get_server_time()
-            end_time = time.time()
-            if response["retCode"] == 0:
-                ping_ms = (end_time - start_time) * 1000
-                ping_label.setText(f"Ping: {ping_ms:.2f} ms")
-                if ping_ms > 500:
-                    ping_label.setStyleSheet("color: red;")
-                else:
-                    ping_label.setStyleSheet("color: black;")
-                print(f"Ping: {ping_ms:.2f} ms")
-            else:
-                ping_label.setText("Ping: Error")
-                ping_label.setStyleSheet("color: red;")
-                print(f"Error pinging server: {response['retMsg']}")
-        else:  # Binance
-            response = session.get_server_time()
-            end_time = time.time()
-            ping_ms = (end_time - start_time) * 1000
-            ping_label.setText(f"Ping: {ping_ms:.2f} ms")
-            if ping_ms > 500:
-                ping_label.setStyleSheet("color: red;")
-            else:
-                ping_label.setStyleSheet("color: black;")
-            print(f"Ping: {ping_ms:.2f} ms")
+        response = session.get_server_time()
+        end_time = time.time()
+        if exchange == "Bybit" and response["retCode"] != 0:
+            print(f"Error pinging server: {response['retMsg']}")
+            return None
+        server_ts = parse_server_time(response, exchange)
+        if server_ts is not None:
+            get_server_clock(session, exchange).add_sample(start_time, server_ts, end_time)
+        ping_ms = (end_time - start_time) * 1000
+        print(f"Ping: {ping_ms:.2f} ms")
+        return ping_ms
     except Exception as e:
+        print(f"Error pinging server: {e}")
+        return None
+
+def show_ping(ping_label, ping_ms):
+    if ping_ms is None:
         ping_label.setText("Ping: Error")
         ping_label.setStyleSheet("color: red;")
-        print(f"Error pinging server: {e}")
+        return
+    clock = best_clock()
+    if clock is not None:
+        # Зсув годинника біржі ± невизначеність (RTT/2 кращого заміру + розкид)
+        ping_label.setText(
+            f"Clock: {clock.offset() * 1000:+.1f} ± {clock.uncertainty() * 1000:.1f} ms | RTT {ping_ms:.0f} ms"
+        )
+    else:
+        ping_label.setText(f"Ping: {ping_ms:.2f} ms")
+    if ping_ms > 500:
+        ping_label.setStyleSheet("color: red;")
+    else:
+        ping_label.setStyleSheet("color: black;")
+
+def update_ping(session, ping_label, exchange):
+    show_ping(ping_label, measure_ping(session, exchange))
 
 def get_qty_step(session, symbol, exchange):
     """Повертає мінімальний крок qty для символу."""
+    info = _cached_instrument(session, symbol, exchange)
+    if info and info.get("qty_step"):
+        return info["qty_step"]
     try:
         if exchange == "Bybit":
             response = session.get_instruments_info(category="linear", symbol=symbol)
@@ -538,6 +831,7 @@ def get_qty_step(session, symbol, exchange):
         print(f"Error fetching qty step: {e}")
         return None
 
+@analytics_priority
 def get_closed_trades(session, exchange, limit=50):
     """Імпорт угод з Bybit з розширеними даними (більше стовпчиків)"""
     try:
@@ -1,12 +1,30 @@
+import boot_profiler  # першим — відлік старту
 import sys
 import json
 import os
-from PyQt6.QtWidgets import QApplication
-from gui import FundingTraderApp
-from logic import initialize_client
+import argparse
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headless", action="store_true", help="run the trading logic without Qt")
+    parser.add_argument("--log", help="append headless output to this file instead of stdout")
+    args = parser.parse_args()
+
+    if args.headless:
+        # Без імпорту gui: PyQt6 і QtWebEngine не завантажуються взагалі
+        import headless
+        boot_profiler.mark("imports")
+        headless.main(log_path=args.log)
+        sys.exit(0)
+
+    from PyQt6.QtCore import Qt, QCoreApplication
+    from PyQt6.QtWidgets import QApplication
+    from gui import FundingTraderApp
+    boot_profiler.mark("imports")
+
     print("Starting application...")
+    # QtWebEngine імпортується вже після QApplication (у _warm_up) — для цього потрібні спільні GL-контексти
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     exchange = "Bybit"  
     testnet = False  
@@ -18,7 +36,8 @@ if __name__ == "__main__":
                 testnet = settings.get("tabs", [{}])[0].get("testnet", testnet)
     except Exception as e:
         print(f"Error loading settings in main.py: {e}, using default testnet={testnet}")
-    session = initialize_client(exchange, testnet)
-    window = FundingTraderApp(session, testnet, exchange)
+    # Першу сесію (імпорт SDK біржі, dotenv) створює фоновий прогрів після першого кадру
+    window = FundingTraderApp(None, testnet, exchange)
+    boot_profiler.mark("window_built")
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
@@ -0,0 +1,322 @@
+"""
+market_stream.py — спільний хаб ринкових даних з публічного WebSocket Bybit.
+
+Хаб тримає в пам'яті останній стан тікера (lastPrice, fundingRate,
+nextFundingTime, bid1Price, ask1Price) для кожного підписаного символу.
+logic.py читає ціну та фандинг звідси, а REST використовує лише як запасний
+варіант, коли даних ще немає або вони застаріли.
+
+На вимогу хаб також веде локальну L2-книгу (orderbook.50) для символу:
+snapshot + delta з перевіркою update id і перепідпискою при пропуску.
+
+URL потоку задається параметром, тому хаб можна підключити до локального
+WebSocket-сервера, який програє записані кадри тікерів.
+"""
+import json
+import threading
+import time
+
+import websocket
+
+from order_book import OrderBook
+
+
+BYBIT_PUBLIC_LINEAR_WS = "wss://stream.bybit.com/v5/public/linear"
+BYBIT_PUBLIC_LINEAR_WS_TEST = "wss://stream-testnet.bybit.com/v5/public/linear"
+
+PING_INTERVAL = 20          # сек — Bybit радить пінгувати кожні 20 с
+RECONNECT_DELAY = 3         # сек — пауза перед перепідключенням
+MAX_TICKER_AGE = 10.0       # сек — старіші дані вважаються неактуальними
+SUBSCRIBE_CHUNK = 10        # топіків в одному запиті subscribe
+ORDERBOOK_DEPTH = 50
+MAX_BOOK_AGE = 30.0         # сек — книга без оновлень довше вважається неактуальною
+
+TICKER_FIELDS = ("lastPrice", "fundingRate", "nextFundingTime", "bid1Price", "ask1Price")
+
+
+class MarketDataHub:
+    """Підписка на топік tickers.<SYMBOL> та кеш останніх значень у пам'яті."""
+
+    def __init__(self, url: str = BYBIT_PUBLIC_LINEAR_WS,
+                 ping_interval: float = PING_INTERVAL,
+                 reconnect_delay: float = RECONNECT_DELAY):
+        self.url = url
+        self.ping_interval = ping_interval
+        self.reconnect_delay = reconnect_delay
+        self._lock = threading.Lock()
+        self._tickers: dict[str, dict] = {}
+        self._subscribed: set[str] = set()
+        self._books: dict[str, OrderBook] = {}
+        self._ticker_listeners: list = []
+        self._ws = None
+        self._thread = None
+        self._running = False
+        self._connected = threading.Event()
+
+    # ------------------------------------------------------------------ #
+    #  Життєвий цикл                                                      #
+    # ------------------------------------------------------------------ #
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="MarketDataHub", daemon=True)
+        self._thread.start()
+        threading.Thread(target=self._heartbeat, name="MarketDataHubPing", daemon=True).start()
+
+    def stop(self):
+        self._running = False
+        self._connected.clear()
+        if self._ws:
+            try:
+                self._ws.close()
+            except Exception:
+                pass
+
+    def wait_connected(self, timeout: float = 5.0) -> bool:
+        return self._connected.wait(timeout)
+
+    # ------------------------------------------------------------------ #
+    #  Підписки                                                           #
+    # ------------------------------------------------------------------ #
+
+    def subscribe(self, symbols):
+        new = []
+        with self._lock:
+            for s in symbols:
+                s = s.strip().upper()
+                if s and s not in self._subscribed:
+                    self._subscribed.add(s)
+                    new.append(s)
+        if new and self._connected.is_set():
+            self._send_op("subscribe", [f"tickers.{s}" for s in new])
+        return new
+
+    def unsubscribe(self, symbols):
+        gone = []
+        with self._lock:
+            for s in symbols:
+                s = s.strip().upper()
+                if s in self._subscribed:
+                    self._subscribed.discard(s)
+                    self._tickers.pop(s, None)
+                    gone.append(s)
+        if gone and self._connected.is_set():
+            self._send_op("unsubscribe", [f"tickers.{s}" for s in gone])
+
+    def add_ticker_listener(self, callback):
+        """callback(symbol, ticker) — з потоку хаба після кожного оновлення тікера (копія стану)."""
+        with self._lock:
+            self._ticker_listeners.append(callback)
+
+    def remove_ticker_listener(self, callback):
+        with self._lock:
+            if callback in self._ticker_listeners:
+                self._ticker_listeners.remove(callback)
+
+    def is_subscribed(self, symbol: str) -> bool:
+        with self._lock:
+            return symbol.upper() in self._subscribed
+
+    def subscribe_orderbook(self, symbols):
+        new = []
+        with self._lock:
+            for s in symbols:
+                s = s.strip().upper()
+                if s and s not in self._books:
+                    self._books[s] = OrderBook(s)
+                    new.append(s)
+        if new and self._connected.is_set():
+            self._send_op("subscribe", [self._book_topic(s) for s in new])
+        return new
+
+    def unsubscribe_orderbook(self, symbols):
+        gone = []
+        with self._lock:
+            for s in symbols:
+                s = s.strip().upper()
+                if self._books.pop(s, None) is not None:
+                    gone.append(s)
+        if gone and self._connected.is_set():
+            self._send_op("unsubscribe", [self._book_topic(s) for s in gone])
+
+    def get_orderbook(self, symbol: str, max_age: float = MAX_BOOK_AGE) -> OrderBook | None:
+        """Синхронізована книга або None (немає підписки, ще немає snapshot, або застаріла)."""
+        with self._lock:
+            book = self._books.get(symbol.upper())
+        if book is None or not book.synced or book.age() > max_age:
+            return None
+        return book
+
+    def wait_orderbooks(self, symbols, timeout: float = 3.0) -> int:
+        """Чекає на snapshot для символів; повертає кількість синхронізованих книг."""
+        deadline = time.time() + timeout
+        while True:
+            ready = sum(1 for s in symbols if self.get_orderbook(s) is not None)
+            if ready >= len(symbols) or time.time() >= deadline:
+                return ready
+            time.sleep(0.05)
+
+    @staticmethod
+    def _book_topic(symbol: str) -> str:
+        return f"orderbook.{ORDERBOOK_DEPTH}.{symbol}"
+
+    # ------------------------------------------------------------------ #
+    #  Читання стану                                                      #
+    # ------------------------------------------------------------------ #
+
+    def get_ticker(self, symbol: str, max_age: float = MAX_TICKER_AGE) -> dict | None:
+        """Повертає копію останнього тікера або None, якщо його немає / застарів."""
+        with self._lock:
+            ticker = self._tickers.get(symbol.upper())
+            if not ticker:
+                return None
+            if max_age is not None and time.time() - ticker["received_at"] > max_age:
+                return None
+            return dict(ticker)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {s: dict(t) for s, t in self._tickers.items()}
+
+    # ------------------------------------------------------------------ #
+    #  WebSocket                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _run(self):
+        while self._running:
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            try:
+                self._ws.run_forever()
+            except Exception as e:
+                print(f"MarketDataHub connection error: {e}")
+            self._connected.clear()
+            if self._running:
+                time.sleep(self.reconnect_delay)
+
+    def _heartbeat(self):
+        while self._running:
+            time.sleep(self.ping_interval)
+            if self._connected.is_set():
+                self._send({"op": "ping"})
+
+    def _on_open(self, ws):
+        print(f"MarketDataHub connected to {self.url}")
+        self._connected.set()
+        with self._lock:
+            symbols = sorted(self._subscribed)
+            books = sorted(self._books)
+        if symbols:
+            self._send_op("subscribe", [f"tickers.{s}" for s in symbols])
+        if books:
+            self._send_op("subscribe", [self._book_topic(s) for s in books])
+
+    def _on_close(self, ws, status_code, msg):
+        self._connected.clear()
+        with self._lock:
+            books = list(self._books.values())
+        for book in books:
+            book.synced = False  # після перепідключення чекаємо новий snapshot
+        print(f"MarketDataHub disconnected ({status_code}: {msg})")
+
+    def _on_error(self, ws, error):
+        print(f"MarketDataHub error: {error}")
+
+    def _on_message(self, ws, message):
+        try:
+            msg = json.loads(message)
+        except (ValueError, TypeError):
+            return
+        topic = msg.get("topic", "")
+        if topic.startswith("tickers."):
+            self._apply_ticker(msg.get("data") or {}, msg.get("type"), msg.get("ts"))
+        elif topic.startswith("orderbook."):
+            self._apply_orderbook(msg.get("data") or {}, msg.get("type"))
+
+    def _apply_orderbook(self, data: dict, msg_type: str | None):
+        symbol = data.get("s")
+        with self._lock:
+            book = self._books.get(symbol)
+        if book is None:
+            return
+        update_id = int(data.get("u") or 0)
+        # u == 1 — сервіс Bybit перезапустився і надіслав snapshot під виглядом delta
+        if msg_type == "snapshot" or update_id == 1:
+            book.apply_snapshot(data.get("b", []), data.get("a", []), update_id)
+        elif not book.apply_delta(data.get("b", []), data.get("a", []), update_id):
+            print(f"MarketDataHub orderbook gap for {symbol}, resubscribing")
+            topic = self._book_topic(symbol)
+            self._send_op("unsubscribe", [topic])
+            self._send_op("subscribe", [topic])
+
+    def _apply_ticker(self, data: dict, msg_type: str | None, ts_ms=None):
+        symbol = data.get("symbol")
+        if not symbol:
+            return
+        with self._lock:
+            if symbol not in self._subscribed:
+                return
+            ticker = self._tickers.get(symbol)
+            if ticker is None or msg_type == "snapshot":
+                ticker = {"symbol": symbol}
+                self._tickers[symbol] = ticker
+            # delta містить лише змінені поля — зливаємо поверх попередніх
+            for field in TICKER_FIELDS:
+                value = data.get(field)
+                if value not in (None, ""):
+                    ticker[field] = value
+            ticker["received_at"] = time.time()
+            if ts_ms:
+                ticker["exchange_ts"] = int(ts_ms)
+            listeners = list(self._ticker_listeners)
+            state = dict(ticker) if listeners else None
+        for callback in listeners:
+            try:
+                callback(symbol, state)
+            except Exception as e:
+                print(f"MarketDataHub listener error: {e}")
+
+    def _send_op(self, op: str, topics: list[str]):
+        for i in range(0, len(topics), SUBSCRIBE_CHUNK):
+            self._send({"op": op, "args": topics[i:i + SUBSCRIBE_CHUNK]})
+
+    def _send(self, payload: dict):
+        try:
+            if self._ws:
+                self._ws.send(json.dumps(payload))
+        except Exception as e:
+            print(f"MarketDataHub send error: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Спільні екземпляри (один на мережу)
+# ---------------------------------------------------------------------------
+
+_hubs: dict[bool, MarketDataHub] = {}
+_hubs_lock = threading.Lock()
+
+
+def get_market_hub(testnet: bool = False, url: str | None = None) -> MarketDataHub:
+    """Повертає (і за потреби запускає) спільний хаб для mainnet або testnet."""
+    with _hubs_lock:
+        hub = _hubs.get(testnet)
+        if hub is None:
+            default_url = BYBIT_PUBLIC_LINEAR_WS_TEST if testnet else BYBIT_PUBLIC_LINEAR_WS
+            hub = MarketDataHub(url or default_url)
+            _hubs[testnet] = hub
+            hub.start()
+        return hub
+
+
+def stop_market_hubs():
+    with _hubs_lock:
+        for hub in _hubs.values():
+            hub.stop()
+        _hubs.clear()
@@ -0,0 +1,124 @@
+"""
+order_book.py — локальна L2-книга заявок, що будується зі snapshot + delta.
+
+Ціни кожного боку зберігаються у відсортованому списку (bisect), обсяги — у
+словнику: доступ до рівня та пошук діапазону цін за O(log n), сума обсягу в
+діапазоні — O(log n + k). Пропуск у послідовності update id позначає книгу як
+розсинхронізовану, і власник має перепідписатись, щоб отримати новий snapshot.
+"""
+import bisect
+import threading
+import time
+
+
+class _Side:
+    __slots__ = ("prices", "qty")
+
+    def __init__(self):
+        self.prices: list[float] = []   # за зростанням
+        self.qty: dict[float, float] = {}
+
+    def clear(self):
+        self.prices.clear()
+        self.qty.clear()
+
+    def set(self, price: float, qty: float):
+        if qty <= 0:
+            if price in self.qty:
+                del self.qty[price]
+                i = bisect.bisect_left(self.prices, price)
+                if i < len(self.prices) and self.prices[i] == price:
+                    self.prices.pop(i)
+            return
+        if price not in self.qty:
+            bisect.insort(self.prices, price)
+        self.qty[price] = qty
+
+
+class OrderBook:
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self._lock = threading.Lock()
+        self._bids = _Side()
+        self._asks = _Side()
+        self.update_id = 0
+        self.synced = False
+        self.updated_at = 0.0
+        self.resyncs = 0
+
+    # ---- Оновлення ----------------------------------------------------- #
+
+    def apply_snapshot(self, bids, asks, update_id: int):
+        with self._lock:
+            self._bids.clear()
+            self._asks.clear()
+            for p, q in bids:
+                self._bids.set(float(p), float(q))
+            for p, q in asks:
+                self._asks.set(float(p), float(q))
+            self.update_id = int(update_id)
+            self.synced = True
+            self.updated_at = time.time()
+
+    def apply_delta(self, bids, asks, update_id: int) -> bool:
+        """False — delta не продовжує послідовність, книга потребує нового snapshot."""
+        update_id = int(update_id)
+        with self._lock:
+            if not self.synced:
+                return False
+            if update_id != self.update_id + 1:
+                self.synced = False
+                self.resyncs += 1
+                return False
+            for p, q in bids:
+                self._bids.set(float(p), float(q))
+            for p, q in asks:
+                self._asks.set(float(p), float(q))
+            self.update_id = update_id
+            self.updated_at = time.time()
+            return True
+
+    # ---- Запити -------------------------------------------------------- #
+
+    def age(self) -> float:
+        return time.time() - self.updated_at if self.updated_at else float("inf")
+
+    def best_bid(self) -> float | None:
+        with self._lock:
+            return self._bids.prices[-1] if self._bids.prices else None
+
+    def best_ask(self) -> float | None:
+        with self._lock:
+            return self._asks.prices[0] if self._asks.prices else None
+
+    def qty_at(self, side: str, price: float) -> float:
+        with self._lock:
+            return self._side(side).qty.get(price, 0.0)
+
+    def levels(self, side: str, depth: int = 50) -> list[tuple[float, float]]:
+        """Найкращі depth рівнів: bids за спаданням, asks за зростанням (як у REST)."""
+        with self._lock:
+            s = self._side(side)
+            prices = s.prices[-depth:][::-1] if side == "b" else s.prices[:depth]
+            return [(p, s.qty[p]) for p in prices]
+
+    def range(self, side: str, low: float, high: float) -> list[tuple[float, float]]:
+        """Рівні з ціною в [low, high]."""
+        with self._lock:
+            s = self._side(side)
+            i = bisect.bisect_left(s.prices, low)
+            j = bisect.bisect_right(s.prices, high)
+            return [(p, s.qty[p]) for p in s.prices[i:j]]
+
+    def notional_between(self, side: str, low: float, high: float) -> float:
+        """Сумарний обсяг у котирувальній валюті (price * qty) в діапазоні цін."""
+        return sum(p * q for p, q in self.range(side, low, high))
+
+    def depth_within(self, price: float, pct: float) -> float:
+        """Ліквідність у межах ±pct% від price: bids ≥ price·(1−pct), asks ≤ price·(1+pct)."""
+        low = price * (1 - pct / 100)
+        high = price * (1 + pct / 100)
+        return self.notional_between("b", low, float("inf")) + self.notional_between("a", 0.0, high)
+
+    def _side(self, side: str) -> _Side:
+        return self._bids if side == "b" else self._asks
@@ -0,0 +1,46 @@
+"""
+prewarm.py — прогрів з'єднань перед вікном фандингу.
+
+Після хвилин простою перший запит платить за новий TCP + TLS handshake саме
+тоді, коли йде вхід. За PREWARM_LEAD_SECS до фандингу кожна сесія з вкладкою,
+що чекає входу, робить легкі запити на market- та trade-шлях (підписаний
+приватний ендпоінт на тому ж хості). Кожен шлях міряється двічі: перший замір
+показує «холодну» ціну, другий — що з'єднання вже гаряче.
+"""
+import time
+
+
+PREWARM_LEAD_SECS = 15.0    # сек до фандингу
+PREWARM_ROUNDS = 2
+
+
+def _touch_market(session, exchange, symbol):
+    session.get_server_time()
+
+
+def _touch_trade(session, exchange, symbol):
+    # Підписаний запит: той самий хост і шлях автентифікації, що й у place_order
+    if exchange == "Bybit":
+        session.get_open_orders(category="linear", symbol=symbol, limit=1)
+    else:
+        session.get_open_orders(symbol=symbol)
+
+
+def prewarm_session(session, exchange: str, symbol: str) -> dict | None:
+    """Повертає {"market": [мс...], "trade": [мс...]} або None, якщо біржа не відповіла."""
+    timings = {"market": [], "trade": []}
+    try:
+        for _ in range(PREWARM_ROUNDS):
+            for path, touch in (("market", _touch_market), ("trade", _touch_trade)):
+                started = time.time()
+                touch(session, exchange, symbol)
+                timings[path].append((time.time() - started) * 1000)
+    except Exception as e:
+        print(f"Prewarm failed for {exchange} {symbol}: {e}")
+        return None
+
+    parts = " | ".join(
+        f"{path}: first {ms[0]:.1f} ms, warm {ms[-1]:.1f} ms" for path, ms in timings.items()
+    )
+    print(f"[PREWARM] {exchange} {symbol} — {parts}")
+    return timings
@@ -0,0 +1,301 @@
+"""
+private_stream.py — приватний WebSocket Bybit (order / execution / position / wallet).
+
+Після автентифікації (HMAC-SHA256 від "GET/realtime" + expires) потік тримає
+локальний стан: виконання ордерів, розміри позицій та останній знімок гаманця.
+Ціна входу, час виконання та закриття позиції беруться з подій, а не з
+опитування get_order_history / get_positions. Слухачі (add_listener) отримують
+кожну подію в потоці WebSocket.
+
+URL задається параметром, тож потік можна підключити до локального сервера,
+який перевіряє підпис і програє записані кадри.
+"""
+import hashlib
+import hmac
+import json
+import threading
+import time
+
+import websocket
+
+
+BYBIT_PRIVATE_WS = "wss://stream.bybit.com/v5/private"
+BYBIT_PRIVATE_WS_TEST = "wss://stream-testnet.bybit.com/v5/private"
+
+PING_INTERVAL = 20          # сек
+RECONNECT_DELAY = 3         # сек
+AUTH_EXPIRES_MS = 10_000    # мс — термін дії підпису автентифікації
+FILL_WAIT = 2.0             # сек — скільки чекати на подію виконання перед REST
+MAX_ORDERS = 500            # скільки останніх ордерів тримати в пам'яті
+
+TOPICS = ("order", "execution", "position", "wallet")
+
+
+def auth_signature(api_secret: str, expires: int) -> str:
+    return hmac.new(
+        api_secret.encode("utf-8"), f"GET/realtime{expires}".encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+
+
+class PrivateStream:
+    def __init__(self, api_key: str, api_secret: str, url: str = BYBIT_PRIVATE_WS,
+                 ping_interval: float = PING_INTERVAL,
+                 reconnect_delay: float = RECONNECT_DELAY):
+        self.url = url
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.ping_interval = ping_interval
+        self.reconnect_delay = reconnect_delay
+        self._cond = threading.Condition()
+        self._orders: dict[str, dict] = {}       # orderId -> стан ордера + агреговані виконання
+        self._positions: dict[str, dict] = {}    # symbol -> {size, side, entry_price, updated_at}
+        self._wallet: dict | None = None
+        self._listeners: list = []
+        self._ws = None
+        self._thread = None
+        self._running = False
+        self._authenticated = threading.Event()
+
+    # ------------------------------------------------------------------ #
+    #  Життєвий цикл                                                      #
+    # ------------------------------------------------------------------ #
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="PrivateStream", daemon=True)
+        self._thread.start()
+        threading.Thread(target=self._heartbeat, name="PrivateStreamPing", daemon=True).start()
+
+    def stop(self):
+        self._running = False
+        self._authenticated.clear()
+        if self._ws:
+            try:
+                self._ws.close()
+            except Exception:
+                pass
+
+    def is_authenticated(self) -> bool:
+        return self._authenticated.is_set()
+
+    def wait_authenticated(self, timeout: float = 5.0) -> bool:
+        return self._authenticated.wait(timeout)
+
+    def add_listener(self, callback):
+        """callback(topic, item) — викликається в потоці WebSocket для кожного елемента data."""
+        with self._cond:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._cond:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    # ------------------------------------------------------------------ #
+    #  Читання стану                                                      #
+    # ------------------------------------------------------------------ #
+
+    def get_fill(self, order_id: str) -> tuple[float, int] | None:
+        """(середня ціна, час виконання в мс) для повністю виконаного ордера або None."""
+        with self._cond:
+            return self._fill_locked(str(order_id))
+
+    def wait_fill(self, order_id: str, timeout: float = FILL_WAIT) -> tuple[float, int] | None:
+        order_id = str(order_id)
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                fill = self._fill_locked(order_id)
+                remaining = deadline - time.time()
+                if fill or remaining <= 0 or not self._authenticated.is_set():
+                    return fill
+                self._cond.wait(remaining)
+
+    def position_size(self, symbol: str) -> float | None:
+        """Розмір позиції з потоку; None — якщо з моменту підключення подій по символу не було."""
+        with self._cond:
+            pos = self._positions.get(symbol.upper())
+            return pos["size"] if pos else None
+
+    def seed_position(self, symbol: str, size: float):
+        """Початковий стан з REST; далі його оновлюють події position."""
+        with self._cond:
+            self._positions.setdefault(symbol.upper(), {"size": size, "side": "", "entry_price": None,
+                                                        "updated_at": time.time()})
+
+    def wallet(self) -> dict | None:
+        with self._cond:
+            return dict(self._wallet) if self._wallet else None
+
+    def _fill_locked(self, order_id: str):
+        order = self._orders.get(order_id)
+        if not order:
+            return None
+        if order.get("status") == "Filled" and order.get("avg_price"):
+            return order["avg_price"], order.get("updated_ms") or order.get("exec_ms") or 0
+        qty = order.get("order_qty")
+        if qty and order["exec_qty"] >= qty and order["exec_value"] > 0:
+            return order["exec_value"] / order["exec_qty"], order["exec_ms"]
+        return None
+
+    # ------------------------------------------------------------------ #
+    #  WebSocket                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _run(self):
+        while self._running:
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            try:
+                self._ws.run_forever()
+            except Exception as e:
+                print(f"PrivateStream connection error: {e}")
+            self._authenticated.clear()
+            if self._running:
+                time.sleep(self.reconnect_delay)
+
+    def _heartbeat(self):
+        while self._running:
+            time.sleep(self.ping_interval)
+            if self._authenticated.is_set():
+                self._send({"op": "ping"})
+
+    def _on_open(self, ws):
+        expires = int(time.time() * 1000) + AUTH_EXPIRES_MS
+        self._send({"op": "auth", "args": [self.api_key, expires, auth_signature(self.api_secret, expires)]})
+
+    def _on_close(self, ws, status_code, msg):
+        self._authenticated.clear()
+        with self._cond:
+            # Поки з'єднання не було, позиції могли змінитись — знову питаємо REST
+            self._positions.clear()
+            self._cond.notify_all()
+        print(f"PrivateStream disconnected ({status_code}: {msg})")
+
+    def _on_error(self, ws, error):
+        print(f"PrivateStream error: {error}")
+
+    def _on_message(self, ws, message):
+        try:
+            msg = json.loads(message)
+        except (ValueError, TypeError):
+            return
+        if msg.get("op") == "auth":
+            if msg.get("success"):
+                print(f"PrivateStream authenticated at {self.url}")
+                self._authenticated.set()
+                self._send({"op": "subscribe", "args": list(TOPICS)})
+            else:
+                print(f"PrivateStream auth failed: {msg.get('ret_msg')}")
+            return
+        topic = msg.get("topic", "")
+        items = msg.get("data") or []
+        if topic not in TOPICS or not isinstance(items, list):
+            return
+        with self._cond:
+            for item in items:
+                getattr(self, f"_apply_{topic}")(item)
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+        for item in items:
+            for callback in listeners:
+                try:
+                    callback(topic, item)
+                except Exception as e:
+                    print(f"PrivateStream listener failed: {e}")
+
+    # ---- Застосування подій (під self._cond) -------------------------- #
+
+    def _order_locked(self, order_id: str) -> dict:
+        order = self._orders.get(order_id)
+        if order is None:
+            order = {"exec_qty": 0.0, "exec_value": 0.0, "exec_ms": 0, "exec_ids": set()}
+            self._orders[order_id] = order
+            while len(self._orders) > MAX_ORDERS:
+                self._orders.pop(next(iter(self._orders)))
+        return order
+
+    def _apply_order(self, item: dict):
+        order = self._order_locked(str(item.get("orderId")))
+        order["symbol"] = item.get("symbol")
+        order["status"] = item.get("orderStatus")
+        order["avg_price"] = float(item.get("avgPrice") or 0) or None
+        order["order_qty"] = float(item.get("qty") or 0) or None
+        order["updated_ms"] = int(item.get("updatedTime") or 0)
+
+    def _apply_execution(self, item: dict):
+        if item.get("execType", "Trade") != "Trade":
+            return
+        order = self._order_locked(str(item.get("orderId")))
+        exec_id = item.get("execId")
+        if exec_id in order["exec_ids"]:
+            return
+        order["exec_ids"].add(exec_id)
+        qty = float(item.get("execQty") or 0)
+        order["symbol"] = item.get("symbol")
+        order["exec_qty"] += qty
+        order["exec_value"] += qty * float(item.get("execPrice") or 0)
+        order["exec_ms"] = max(order["exec_ms"], int(item.get("execTime") or 0))
+        if item.get("orderQty"):
+            order["order_qty"] = float(item["orderQty"])
+
+    def _apply_position(self, item: dict):
+        symbol = item.get("symbol")
+        if not symbol:
+            return
+        self._positions[symbol] = {
+            "size": float(item.get("size") or 0),
+            "side": item.get("side", ""),
+            "entry_price": float(item.get("entryPrice") or item.get("avgPrice") or 0) or None,
+            "updated_at": time.time(),
+        }
+
+    def _apply_wallet(self, item: dict):
+        for coin in item.get("coin", []):
+            if coin.get("coin") == "USDT":
+                self._wallet = {
+                    "wallet_balance": float(coin.get("walletBalance") or 0),
+                    "updated_at": time.time(),
+                }
+
+    def _send(self, payload: dict):
+        try:
+            if self._ws:
+                self._ws.send(json.dumps(payload))
+        except Exception as e:
+            print(f"PrivateStream send error: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Спільні екземпляри (один на ключ API та мережу)
+# ---------------------------------------------------------------------------
+
+_streams: dict[tuple, PrivateStream] = {}
+_streams_lock = threading.Lock()
+
+
+def get_private_stream(api_key: str, api_secret: str, testnet: bool = False,
+                       url: str | None = None) -> PrivateStream:
+    with _streams_lock:
+        key = (api_key, bool(testnet))
+        stream = _streams.get(key)
+        if stream is None:
+            default_url = BYBIT_PRIVATE_WS_TEST if testnet else BYBIT_PRIVATE_WS
+            stream = PrivateStream(api_key, api_secret, url or default_url)
+            _streams[key] = stream
+            stream.start()
+        return stream
+
+
+def stop_private_streams():
+    with _streams_lock:
+        for stream in _streams.values():
+            stream.stop()
+        _streams.clear()
@@ -0,0 +1,244 @@
+"""
+rate_limiter.py — token bucket та спільний лімітер запитів до біржі.
+
+Відро поповнюється зі швидкістю rate токенів/с до capacity. acquire() забирає
+токен або чекає рівно стільки, скільки треба до появи наступного, тож потоки
+йдуть з максимально дозволеною швидкістю замість фіксованого sleep.
+
+RateLimiter тримає відро на кожен клас запитів (market / trade / account) і
+спільне відро на весь процес. Запити нижчого пріоритету (аналітика) не можуть
+вибрати з відра резерв, який лишається для ордерів. Сесії з initialize_client
+обгорнуті в RateLimitedSession, тож кожен виклик біржі проходить через лімітер.
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+        self.acquired = 0
+        self.throttled = 0        # скільки acquire() мусили чекати
+        self.waited = 0.0         # сумарний час очікування, сек
+
+    def _refill_locked(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0, reserve: float = 0.0) -> bool:
+        with self._lock:
+            self._refill_locked()
+            if self._tokens - tokens >= reserve:
+                self._tokens -= tokens
+                self.acquired += 1
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0, timeout: float | None = None,
+                reserve: float = 0.0) -> float | None:
+        """
+        Чекає на токен; повертає час очікування в секундах або None, якщо вийшов timeout.
+        reserve — скільки токенів має лишитись у відрі після цього запиту.
+        """
+        reserve = min(reserve, self.capacity - tokens)
+        start = self._clock()
+        throttled = False
+        while True:
+            with self._lock:
+                self._refill_locked()
+                if self._tokens - tokens >= reserve:
+                    self._tokens -= tokens
+                    self.acquired += 1
+                    waited = self._clock() - start
+                    if throttled:
+                        self.throttled += 1
+                        self.waited += waited
+                    return waited
+                wait = (tokens + reserve - self._tokens) / self.rate
+            if timeout is not None and self._clock() - start + wait > timeout:
+                return None
+            throttled = True
+            time.sleep(wait)
+
+    def drain(self):
+        """Біржа відповіла «занадто багато запитів» — обнуляємо відро, щоб пригальмувати всіх."""
+        with self._lock:
+            self._refill_locked()
+            self._tokens = min(self._tokens, 0.0)
+
+    def level(self) -> float:
+        with self._lock:
+            self._refill_locked()
+            return self._tokens
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refill_locked()
+            return {
+                "rate": self.rate,
+                "capacity": self.capacity,
+                "level": round(self._tokens, 2),
+                "acquired": self.acquired,
+                "throttled": self.throttled,
+                "waited_s": round(self.waited, 3),
+            }
+
+
+# ---------------------------------------------------------------------------
+# Спільний лімітер
+# ---------------------------------------------------------------------------
+
+PRIORITY_TRADE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_ANALYTICS = 2
+
+# Частка ємності відра, яку запит цього пріоритету не може зайняти
+PRIORITY_RESERVE = {PRIORITY_TRADE: 0.0, PRIORITY_NORMAL: 0.1, PRIORITY_ANALYTICS: 0.3}
+
+# (rate/с, capacity) — нижче за ліміти Bybit: 600 запитів / 5 с на IP для всіх ендпоінтів,
+# 10/с на створення ордерів, 50/с на запити акаунта
+CLASS_LIMITS = {
+    "market": (100, 100),
+    "trade": (10, 10),
+    "account": (20, 20),
+}
+SHARED_LIMIT = (110, 110)
+
+RATE_LIMIT_CODES = (10006, -1003)  # Bybit "Too many visits", Binance "Too many requests"
+
+TRADE_METHODS = {
+    "place_order", "amend_order", "cancel_order", "cancel_all_orders", "place_batch_order",
+    "set_leverage", "set_trading_stop",
+    "create_order", "futures_create_order", "futures_cancel_order", "futures_change_leverage",
+}
+ACCOUNT_METHODS = {
+    "get_wallet_balance", "get_positions", "get_order_history", "get_open_orders",
+    "get_executions", "get_closed_pnl", "get_transaction_log",
+    "get_account", "get_order", "get_position_information", "get_my_trades",
+    "futures_account", "futures_account_balance", "futures_position_information",
+    "futures_get_order", "futures_account_trades", "futures_income_history",
+}
+
+
+def classify(method_name: str) -> str:
+    if method_name in TRADE_METHODS:
+        return "trade"
+    if method_name in ACCOUNT_METHODS:
+        return "account"
+    return "market"
+
+
+class RateLimiter:
+    def __init__(self, class_limits: dict = CLASS_LIMITS, shared_limit: tuple = SHARED_LIMIT):
+        self.buckets = {cls: TokenBucket(rate, cap) for cls, (rate, cap) in class_limits.items()}
+        self.shared = TokenBucket(*shared_limit)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.rejections = 0   # відповіді біржі з кодом перевищення ліміту
+
+    @contextmanager
+    def priority(self, level: int):
+        """Задає пріоритет запитів поточного потоку (напр. PRIORITY_ANALYTICS для сканера)."""
+        previous = getattr(self._local, "priority", PRIORITY_NORMAL)
+        self._local.priority = level
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    def _priority_for(self, cls: str) -> int:
+        if cls == "trade":
+            return PRIORITY_TRADE
+        return getattr(self._local, "priority", PRIORITY_NORMAL)
+
+    def acquire(self, cls: str) -> float:
+        """Чекає на токен класу та спільний токен; повертає загальний час очікування."""
+        priority = self._priority_for(cls)
+        share = PRIORITY_RESERVE.get(priority, 0.0)
+        bucket = self.buckets.get(cls) or self.buckets["market"]
+        waited = bucket.acquire(reserve=share * bucket.capacity)
+        waited += self.shared.acquire(reserve=share * self.shared.capacity)
+        return waited
+
+    def penalize(self, cls: str):
+        with self._lock:
+            self.rejections += 1
+        bucket = self.buckets.get(cls)
+        if bucket:
+            bucket.drain()
+        self.shared.drain()
+
+    def stats(self) -> dict:
+        """Поточні рівні відер та лічильники очікувань по класах."""
+        with self._lock:
+            rejections = self.rejections
+        return {
+            "buckets": {cls: b.stats() for cls, b in self.buckets.items()},
+            "shared": self.shared.stats(),
+            "rejections": rejections,
+        }
+
+
+class RateLimitedSession:
+    """Обгортка сесії pybit / python-binance: кожен метод спершу бере токен свого класу."""
+
+    def __init__(self, session, limiter: RateLimiter):
+        object.__setattr__(self, "_session", session)
+        object.__setattr__(self, "_limiter", limiter)
+
+    def __getattr__(self, name):
+        attr = getattr(self._session, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+        cls = classify(name)
+        limiter = self._limiter
+
+        def _limited(*args, **kwargs):
+            limiter.acquire(cls)
+            try:
+                result = attr(*args, **kwargs)
+            except Exception as e:
+                # python-binance кидає виняток з кодом замість відповіді
+                if getattr(e, "code", None) in RATE_LIMIT_CODES:
+                    print(f"Rate limit hit on {name}: {e}")
+                    limiter.penalize(cls)
+                raise
+            if isinstance(result, dict) and result.get("retCode", result.get("code")) in RATE_LIMIT_CODES:
+                print(f"Rate limit hit on {name}: {result.get('retMsg') or result.get('msg')}")
+                limiter.penalize(cls)
+            return result
+
+        _limited.__name__ = name
+        return _limited
+
+    def __setattr__(self, name, value):
+        setattr(self._session, name, value)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+
+def analytics_priority(fn):
+    """Декоратор: усі запити всередині fn ідуть з PRIORITY_ANALYTICS і не чіпають резерв ордерів."""
+    @functools.wraps(fn)
+    def _wrapped(*args, **kwargs):
+        with get_rate_limiter().priority(PRIORITY_ANALYTICS):
+            return fn(*args, **kwargs)
+    return _wrapped
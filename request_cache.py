@@ -0,0 +1,78 @@
+"""
+request_cache.py — об'єднання однакових запитів (single-flight) з коротким кешем.
+
+Кілька одночасних або послідовних викликів з тим самим ключем отримують
+результат одного запиту. Результат живе ttl секунд або до invalidate().
+Лічильники hits / misses / coalesced показують, скільки запитів зекономлено.
+"""
+import threading
+import time
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+
+
+class SingleFlightCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: dict = {}      # key -> (value, stored_at)
+        self._inflight: dict = {}     # key -> _InFlight
+        self._generation: dict = {}   # key -> int, росте при invalidate()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key, loader):
+        """Повертає закешоване значення або викликає loader() рівно один раз для всіх очікуючих."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry[1] <= self.ttl:
+                self.hits += 1
+                return entry[0]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlight()
+                self._inflight[key] = call
+                self.misses += 1
+            else:
+                self.coalesced += 1
+            generation = self._generation.get(key, 0)
+
+        if not leader:
+            call.event.wait()
+            return call.value
+
+        value = None
+        try:
+            value = loader()
+            return value
+        finally:
+            with self._lock:
+                # Результат запиту, що стартував до invalidate(), не кешуємо
+                if value is not None and self._generation.get(key, 0) == generation:
+                    self._entries[key] = (value, time.time())
+                self._inflight.pop(key, None)
+            call.value = value
+            call.event.set()
+
+    def invalidate(self, key=None):
+        with self._lock:
+            keys = list(self._entries) + list(self._inflight) if key is None else [key]
+            for k in keys:
+                self._entries.pop(k, None)
+                self._generation[k] = self._generation.get(k, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "saved": self.hits + self.coalesced,
+                "ttl": self.ttl,
+            }
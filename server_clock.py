@@ -0,0 +1,185 @@
+"""
+server_clock.py — оцінка зсуву локального годинника відносно сервера біржі.
+
+Кожен замір get_server_time дає зсув = server − (t_send + t_recv) / 2 з
+похибкою ≤ RTT/2. У вікні останніх замірів беруться ті, що мали найменший
+RTT (найменш спотворені мережею), їх зсув згладжується EMA, а дрейф
+годинника — нахил лінійної регресії зсуву за часом. now() повертає час біржі;
+ним рахуються всі зворотні відліки до фандингу та дедлайни входу.
+"""
+import threading
+import time
+from collections import deque
+
+
+SAMPLE_INTERVAL = 30.0      # сек — фонове оновлення, якщо ніхто не міряв пінг
+WINDOW = 40                 # замірів у вікні оцінки
+BEST_FRACTION = 0.25        # частка замірів з найменшим RTT, що йде в оцінку
+EMA_ALPHA = 0.3
+MIN_DRIFT_SPAN = 120.0      # сек — коротший проміжок не дає осмисленого дрейфу
+
+
+def parse_server_time(response, exchange: str) -> float | None:
+    """Epoch сек з відповіді get_server_time (Bybit V5 або Binance)."""
+    try:
+        if exchange == "Bybit":
+            if response.get("retCode") != 0:
+                return None
+            result = response.get("result") or {}
+            if result.get("timeNano"):
+                return int(result["timeNano"]) / 1e9
+            return int(response["time"]) / 1000
+        return int(response["serverTime"]) / 1000
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class ServerClock:
+    def __init__(self, sampler=None, interval: float = SAMPLE_INTERVAL, window: int = WINDOW):
+        self._sampler = sampler   # () -> серверний epoch сек або None
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)   # (t_local_mid, offset, rtt)
+        self._offset = None
+        self._ref_t = 0.0
+        self._drift = 0.0
+        self._uncertainty = None
+        self._last_sample_at = 0.0
+        self._thread = None
+
+    # ---- Заміри -------------------------------------------------------- #
+
+    def add_sample(self, t_send: float, server_ts: float, t_recv: float):
+        rtt = t_recv - t_send
+        if rtt < 0:
+            return
+        mid = (t_send + t_recv) / 2
+        with self._lock:
+            self._samples.append((mid, server_ts - mid, rtt))
+            self._last_sample_at = t_recv
+            self._estimate_locked()
+
+    def sample(self) -> float | None:
+        """Один замір через sampler; повертає RTT у сек або None."""
+        if self._sampler is None:
+            return None
+        t_send = time.time()
+        try:
+            server_ts = self._sampler()
+        except Exception as e:
+            # Мережа / SDK — пропускаємо замір, потік годинника має жити далі
+            print(f"Server time sample failed: {e}")
+            return None
+        t_recv = time.time()
+        if server_ts is None:
+            return None
+        self.add_sample(t_send, server_ts, t_recv)
+        return t_recv - t_send
+
+    def start(self, burst: int = 5):
+        if self._thread is not None or self._sampler is None:
+            return
+        self._thread = threading.Thread(target=self._loop, args=(burst,), name="ServerClock", daemon=True)
+        self._thread.start()
+
+    def _loop(self, burst: int):
+        for _ in range(burst):
+            self.sample()
+            time.sleep(0.2)
+        while True:
+            time.sleep(max(1.0, self.interval - (time.time() - self._last_sample_at)))
+            if time.time() - self._last_sample_at >= self.interval:
+                self.sample()
+
+    def _estimate_locked(self):
+        samples = list(self._samples)
+        best = sorted(samples, key=lambda s: s[2])[:max(1, int(len(samples) * BEST_FRACTION))]
+        raw = sum(s[1] for s in best) / len(best)
+        ref_t = sum(s[0] for s in best) / len(best)
+        if self._offset is None:
+            self._offset = raw
+        else:
+            # Попередню оцінку спершу переносимо на новий момент з урахуванням дрейфу
+            carried = self._offset + self._drift * (ref_t - self._ref_t)
+            self._offset = EMA_ALPHA * raw + (1 - EMA_ALPHA) * carried
+        self._ref_t = ref_t
+
+        spread = 0.0
+        if len(best) > 1:
+            spread = (sum((s[1] - raw) ** 2 for s in best) / (len(best) - 1)) ** 0.5
+        self._uncertainty = min(s[2] for s in best) / 2 + spread
+
+        span = samples[-1][0] - samples[0][0]
+        if len(samples) >= 3 and span >= MIN_DRIFT_SPAN:
+            mean_t = sum(s[0] for s in samples) / len(samples)
+            mean_o = sum(s[1] for s in samples) / len(samples)
+            var_t = sum((s[0] - mean_t) ** 2 for s in samples)
+            if var_t > 0:
+                self._drift = sum((s[0] - mean_t) * (s[1] - mean_o) for s in samples) / var_t
+
+    # ---- Час біржі ----------------------------------------------------- #
+
+    def offset(self) -> float:
+        """Поточний зсув (сек): час біржі − локальний час, з поправкою на дрейф."""
+        with self._lock:
+            if self._offset is None:
+                return 0.0
+            return self._offset + self._drift * (time.time() - self._ref_t)
+
+    def uncertainty(self) -> float | None:
+        with self._lock:
+            return self._uncertainty
+
+    def drift_ppm(self) -> float:
+        with self._lock:
+            return self._drift * 1e6
+
+    def is_ready(self) -> bool:
+        with self._lock:
+            return self._offset is not None
+
+    def now(self) -> float:
+        return time.time() + self.offset()
+
+    def to_local(self, exchange_ts: float) -> float:
+        """Момент часу біржі → локальний epoch (для планувальника, що живе в time.time())."""
+        return exchange_ts - self.offset()
+
+
+# ---------------------------------------------------------------------------
+# Годинники бірж і найкраща оцінка для всього процесу
+# ---------------------------------------------------------------------------
+
+_clocks: dict[tuple, ServerClock] = {}
+_clocks_lock = threading.Lock()
+
+
+def get_server_clock(session, exchange: str) -> ServerClock:
+    key = (exchange, bool(getattr(session, "testnet", False)))
+    with _clocks_lock:
+        clock = _clocks.get(key)
+        if clock is None:
+            clock = ServerClock(lambda: parse_server_time(session.get_server_time(), exchange))
+            _clocks[key] = clock
+            clock.start()
+        return clock
+
+
+def best_clock() -> ServerClock | None:
+    """Годинник з найменшою невизначеністю (локальний дрейф спільний для всіх бірж)."""
+    with _clocks_lock:
+        clocks = [c for c in _clocks.values() if c.is_ready()]
+    if not clocks:
+        return None
+    return min(clocks, key=lambda c: c.uncertainty() or float("inf"))
+
+
+def exchange_now() -> float:
+    """Скоригований час біржі (epoch сек); до першого заміру — локальний час."""
+    clock = best_clock()
+    return clock.now() if clock else time.time()
+
+
+def to_local_time(exchange_ts: float) -> float:
+    clock = best_clock()
+    return clock.to_local(exchange_ts) if clock else exchange_ts
@@ -4,6 +4,8 @@ settings_manager.py — завантаження та збереження на
 import os
 import json
 
+from prewarm import PREWARM_LEAD_SECS
+
 
 SETTINGS_PATH = r"scripts\settings.json"
 
@@ -18,6 +20,7 @@ DEFAULT_TAB_SETTINGS = {
     "exchange": "Bybit",
     "testnet": False,
     "auto_limit": False,
+    "attach_take_profit": False,
     "stop_loss_percentage": 0.5,
     "stop_loss_enabled": True,
     "auto_mode": False,
@@ -52,6 +55,7 @@ def load_settings(settings_path: str = SETTINGS_PATH) -> list[dict]:
                     tab.setdefault("reverse_side", False)
                     tab.setdefault("auto_mode", False)
                     tab.setdefault("auto_min_funding", 0.05)
+                    tab.setdefault("attach_take_profit", False)
                 
                 return tabs
         return [DEFAULT_TAB_SETTINGS.copy()]
@@ -84,7 +88,19 @@ def load_collect_funding_stats(settings_path: str = SETTINGS_PATH) -> bool:
     return False
 
 
-def save_settings(tab_data_list: list[dict], language: str, settings_path: str = SETTINGS_PATH, disable_funding_trades: bool = False, collect_funding_stats: bool = False):
+def load_prewarm_lead(settings_path: str = SETTINGS_PATH) -> float:
+    """Завантажує, за скільки секунд до фандингу прогрівати з'єднання."""
+    if os.path.exists(settings_path):
+        try:
+            with open(settings_path, "r", encoding="utf-8") as f:
+                settings = json.load(f)
+                return float(settings.get("prewarm_lead_seconds", PREWARM_LEAD_SECS))
+        except Exception as e:
+            print(f"Error loading prewarm_lead_seconds: {e}")
+    return PREWARM_LEAD_SECS
+
+
+def save_settings(tab_data_list: list[dict], language: str, settings_path: str = SETTINGS_PATH, disable_funding_trades: bool = False, collect_funding_stats: bool = False, prewarm_lead_seconds: float = PREWARM_LEAD_SECS):
     """Зберігає всі налаштування, включаючи Auto Calculation, глобальний блок угод та статус збору статистики."""
     tabs = []
     for td in tab_data_list:
@@ -99,6 +115,7 @@ def save_settings(tab_data_list: list[dict], language: str, settings_path: str =
             "exchange": td["exchange"],
             "testnet": td["testnet"],
             "auto_limit": td["auto_limit"],
+            "attach_take_profit": td.get("attach_take_profit", False),
             "stop_loss_percentage": td["stop_loss_percentage"],
             "stop_loss_enabled": td["stop_loss_enabled"],
             "auto_mode": td.get("auto_mode", False),
@@ -114,7 +131,8 @@ def save_settings(tab_data_list: list[dict], language: str, settings_path: str =
         "tabs": tabs,
         "language": language,
         "disable_funding_trades": disable_funding_trades,
-        "collect_funding_stats": collect_funding_stats
+        "collect_funding_stats": collect_funding_stats,
+        "prewarm_lead_seconds": prewarm_lead_seconds
     }
 
     try:
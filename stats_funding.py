@@ -2,13 +2,20 @@ import os
 import time
 import csv
 import pytz
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 from logic import initialize_client
+from ticker_cache import get_ticker_cache
+from rate_limiter import TokenBucket, analytics_priority
+from kline_store import KlineStore
+from market_stream import get_market_hub
+from funding_scanner import RATE_ONLY, scan_tickers
+from stats_manager import FUNDING_STATS_FILE
 
 # Constants
 KYIV_TZ = pytz.timezone("Europe/Kyiv")
-STATS_FILE = "funding_stats.csv"
+STATS_FILE = FUNDING_STATS_FILE
 FIELDNAMES = [
     "funding_timestamp", 
     "symbol", 
@@ -31,8 +38,18 @@ FIELDNAMES = [
     "price_10m_%"
 ]
 
-def get_advanced_stats(session, symbol, current_price, ticker_item):
-    """Fetch all requested advanced metrics for a coin."""
+# Bybit limits public market endpoints per IP (600 requests / 5 s for all of them together).
+# Kline and orderbook get a separate bucket each so the two together stay below that cap.
+KLINE_BUCKET = TokenBucket(rate=50, capacity=50)
+ORDERBOOK_BUCKET = TokenBucket(rate=50, capacity=50)
+STATS_WORKERS = 16
+
+# Hourly candles are kept locally; each batch only downloads candles newer than the stored ones
+KLINE_STORE = KlineStore(interval="60", bucket=KLINE_BUCKET)
+
+@analytics_priority
+def get_advanced_stats(session, symbol, current_price, ticker_item, book=None):
+    """Fetch all requested advanced metrics for a coin. book — local L2 book from the stream, if synced."""
     stats = {
         "change1h": 0.0, "change12h": 0.0, "volatility": 0.0,
         "rvol": 0.0, "oi_value": 0.0, "spread": 0.0, "liquidity": 0.0
@@ -47,9 +64,8 @@ def get_advanced_stats(session, symbol, current_price, ticker_item):
         vol24h = float(ticker_item.get("volume24h") or 0)
 
         # 2. Candle-based stats (1h, 12h, Volatility, RVOL)
-        resp_k = session.get_kline(category="linear", symbol=symbol, interval="60", limit=13)
-        if resp_k.get("retCode") == 0 and len(resp_k["result"]["list"]) >= 1:
-            klines = resp_k["result"]["list"]
+        klines = KLINE_STORE.get(session, symbol, limit=13)
+        if klines:
             # Bybit V5: [0] is latest. [1] is previous 1h.
             latest = klines[0]
             price_1h_ago = float(latest[1]) # Open of latest 1h candle
@@ -67,6 +83,10 @@ def get_advanced_stats(session, symbol, current_price, ticker_item):
                 stats["change12h"] = ((current_price - price_12h_ago) / price_12h_ago * 100) if price_12h_ago else 0
 
         # 3. Liquidity (Orderbook depth within 1%)
+        if book is not None:
+            stats["liquidity"] = book.depth_within(current_price, 1.0)
+            return stats
+        ORDERBOOK_BUCKET.acquire()
         resp_ob = session.get_orderbook(category="linear", symbol=symbol, limit=50)
         if resp_ob.get("retCode") == 0:
             bids = resp_ob["result"]["b"]
@@ -89,6 +109,46 @@ def get_advanced_stats(session, symbol, current_price, ticker_item):
     
     return stats
 
+def collect_advanced_stats(session, items, workers=STATS_WORKERS):
+    """
+    Deep stats for many coins at once: a bounded thread pool with the token buckets
+    setting the pace. Returns ({symbol: stats}, timing).
+    """
+    started = time.time()
+    waited_before = KLINE_BUCKET.waited + ORDERBOOK_BUCKET.waited
+    durations = {}
+
+    # Order books come from WebSocket snapshots; REST only for symbols that did not sync in time
+    symbols = [it["symbol"] for it in items]
+    hub = get_market_hub(testnet=False)
+    hub.subscribe_orderbook(symbols)
+    books_ready = hub.wait_orderbooks(symbols, timeout=3.0)
+
+    def _one(it):
+        t0 = time.time()
+        book = hub.get_orderbook(it["symbol"])
+        adv = get_advanced_stats(session, it["symbol"], float(it.get("lastPrice") or 0), it, book=book)
+        durations[it["symbol"]] = time.time() - t0
+        return it["symbol"], adv
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="funding-stats") as pool:
+        results = dict(pool.map(_one, items))
+
+    elapsed = time.time() - started
+    hub.unsubscribe_orderbook(symbols)
+    KLINE_STORE.save()
+    per_coin = list(durations.values()) or [0.0]
+    timing = {
+        "coins": len(results),
+        "elapsed_s": elapsed,
+        "mean_coin_s": sum(per_coin) / len(per_coin),
+        "max_coin_s": max(per_coin),
+        "throttle_wait_s": KLINE_BUCKET.waited + ORDERBOOK_BUCKET.waited - waited_before,
+        "klines_saved_pct": KLINE_STORE.stats()["saved_pct"],
+        "books_from_stream": books_ready,
+    }
+    return results, timing
+
 class FundingBatch:
     """Tracks a group of coins sharing the same funding time."""
     def __init__(self, funding_time_ms):
@@ -183,43 +243,23 @@ def main():
         print(f"Failed to initialize Bybit client: {e}")
         return
 
+    # Один знімок усіх тікерів обслуговує і сканування, і фіксацію цін
+    ticker_cache = get_ticker_cache(testnet=False)
+    KLINE_STORE.load()
+
     # Startup: Scan for funding opportunities (replicating the main app scanner)
     print("\n" + "="*50)
     print(f"[{datetime.now().strftime('%H:%M:%S')}] INITIAL SCAN (|Rate| >= {MIN_FUNDING_THRESHOLD}%, Time <= 1h)")
     print("="*50)
     try:
-        res = session.get_tickers(category="linear")
-        if res.get("retCode") == 0:
-            tickers = res["result"]["list"]
+        tickers = ticker_cache.get_list()
+        if tickers is not None:
             now_ms = int(time.time() * 1000)
-            opportunities = []
-            
-            for it in tickers:
-                symbol = it.get("symbol", "")
-                if not symbol.endswith("USDT"): continue
-                
-                try:
-                    rate = float(it.get("fundingRate") or 0)
-                    rate_pct = rate * 100
-                    next_ft_ms = int(it.get("nextFundingTime") or 0)
-                except (ValueError, TypeError): continue
-                
-                if next_ft_ms == 0: continue
-                
-                secs_to_funding = (next_ft_ms - now_ms) / 1000.0
-                
-                # Filter by threshold AND time (only within the next 1 hour)
-                if abs(rate_pct) >= MIN_FUNDING_THRESHOLD and 0 <= secs_to_funding <= 3600:
-                    opportunities.append({
-                        "symbol": symbol,
-                        "rate": rate_pct,
-                        "secs": secs_to_funding
-                    })
-            
+            # Filter by threshold AND time (only within the next 1 hour), sorted by |rate| DESC
+            opportunities = scan_tickers(tickers, now_ms, min_abs_rate_pct=MIN_FUNDING_THRESHOLD,
+                                         min_secs=0, max_secs=3600, weights=RATE_ONLY)
+
             if opportunities:
-                # Sort by absolute rate DESC (highest first)
-                opportunities.sort(key=lambda x: abs(x["rate"]), reverse=True)
-                
                 print(f"{'SYMBOL':<15} | {'RATE (%)':<12} | {'TIME LEFT':<15}")
                 print("-" * 50)
                 for opt in opportunities:
@@ -237,7 +277,7 @@ def main():
             else:
                 print(f"No coins found with |rate| >= {MIN_FUNDING_THRESHOLD}%")
         else:
-            print(f"Warning: Could not fetch initial tickers: {res.get('retMsg')}")
+            print("Warning: Could not fetch initial tickers")
     except Exception as e:
         print(f"Error during initial scan: {e}")
     print("="*50 + "\n")
@@ -255,23 +295,16 @@ def main():
                 last_trigger_hour = now.hour
                 print(f"\n[{now.strftime('%H:%M:%S')}] Minute 59 Trigger: Scanning for upcoming funding events...")
                 
-                response = session.get_tickers(category="linear")
-                if response.get("retCode") == 0:
-                    tickers = response["result"]["list"]
+                tickers = ticker_cache.get_list()
+                if tickers is not None:
                     now_ms = int(time.time() * 1000)
-                    
-                    upcoming = []
-                    for it in tickers:
-                        if not it.get("symbol", "").endswith("USDT"): continue
-                        
-                        rate_pct = float(it.get("fundingRate") or 0) * 100
-                        if abs(rate_pct) < MIN_FUNDING_THRESHOLD: continue
 
-                        ft = int(it.get("nextFundingTime") or 0)
-                        # Look for funding in the next 120 seconds
-                        if 0 < (ft - now_ms) <= 120000:
-                            upcoming.append(it)
-                    
+                    # Look for funding in the next 120 seconds, strongest |rate| first
+                    upcoming = [e["item"] for e in scan_tickers(
+                        tickers, now_ms, min_abs_rate_pct=MIN_FUNDING_THRESHOLD,
+                        min_secs=0.001, max_secs=120, weights=RATE_ONLY,
+                    )]
+
                     if upcoming:
                         # Group symbols by rounded funding time
                         ft_groups = {}
@@ -288,32 +321,29 @@ def main():
                             batch = FundingBatch(ft_ms)
                             print(f"[{now.strftime('%H:%M:%S')}] Event detected for {batch.funding_time_dt.strftime('%Y-%m-%d %H:%M:%S')}. Processing {len(items)} symbols.")
                             
-                            # Sort by funding rate magnitude
-                            items.sort(key=lambda x: abs(float(x.get("fundingRate") or 0)), reverse=True)
+                            # upcoming already sorted by funding rate magnitude
                             target_items = items[:150]
                             
-                            seen_symbols = set()
-                            for idx, it in enumerate(target_items):
+                            # Deduplicate, then fetch deep stats concurrently under the rate limits
+                            unique = {}
+                            for it in target_items:
+                                unique.setdefault(it["symbol"], it)
+                            unique_items = list(unique.values())
+                            adv_by_symbol, timing = collect_advanced_stats(session, unique_items)
+                            print(f"  Stats batch: {timing['coins']} coins in {timing['elapsed_s']:.2f}s "
+                                  f"(per coin avg {timing['mean_coin_s']:.2f}s, max {timing['max_coin_s']:.2f}s, "
+                                  f"rate-limit wait {timing['throttle_wait_s']:.2f}s, "
+                                  f"klines from store {timing['klines_saved_pct']:.0f}%, "
+                                  f"books from stream {timing['books_from_stream']}/{timing['coins']})")
+
+                            for it in unique_items:
                                 symbol = it["symbol"]
-                                if symbol in seen_symbols: continue
-                                seen_symbols.add(symbol)
-                                
                                 try:
                                     price = float(it.get("lastPrice") or 0)
                                     rate = float(it.get("fundingRate") or 0) * 100
                                     vol24h = float(it.get("volume24h") or 0)
                                     ch24h = float(it.get("price24hPcnt") or 0) * 100
-                                    
-                                    # Fetch deep stats
-                                    adv = get_advanced_stats(session, symbol, price, it)
-                                    batch.add_coin(symbol, rate, vol24h, price, ch24h, adv)
-                                    
-                                    # SLOW DOWN to avoid 10006 Rate Limit (Err: 10/sec for kline)
-                                    # 0.15s delay allows ~6-7 requests per second, which is safer
-                                    time.sleep(0.15) 
-                                    
-                                    if (idx + 1) % 20 == 0:
-                                        print(f"  Processed {idx + 1}/{len(target_items)} coins...")
+                                    batch.add_coin(symbol, rate, vol24h, price, ch24h, adv_by_symbol[symbol])
                                 except Exception as e:
                                     print(f"Error gathering stats for {symbol}: {e}")
                             
@@ -322,7 +352,7 @@ def main():
                     else:
                         print(f"[{now.strftime('%H:%M:%S')}] No coins found with funding in the next 2 minutes.")
                 else:
-                    print(f"API Error fetching tickers: {response.get('retMsg')}")
+                    print("API Error fetching tickers")
                     last_trigger_hour = -1 # Retry
 
             # 2. Update Prices for Active Batches (1m, 5m, 10m post-funding)
@@ -341,9 +371,9 @@ def main():
                         break
                 
                 if needs_update:
-                    response = session.get_tickers(category="linear")
-                    if response.get("retCode") == 0:
-                        tickers = response["result"]["list"]
+                    # Фіксація цін потребує свіжого знімка, а не кешу на TTL
+                    tickers = ticker_cache.get_list(max_age=1.0)
+                    if tickers is not None:
                         
                         completed_keys = []
                         for ft_ms, batch in active_batches.items():
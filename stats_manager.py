@@ -8,6 +8,7 @@ from datetime import datetime
 
 
 STATS_CSV_FILE = "trade_stats.csv"
+FUNDING_STATS_FILE = "funding_stats.csv"   # пише stats_funding.py (окремий процес)
 STATS_HEADERS = ["Дата_Час", "Процент", "Фандинг", "%_Фандингу", "Прибиль", "Доход", "Комисия", "Обєм", "В-сделке", "Тикер", "Change%_after5m"]
 
 
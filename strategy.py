@@ -0,0 +1,484 @@
+"""
+strategy.py — торгова логіка вкладки без залежності від Qt.
+
+Воркери входу, захисту позиції та оновлення даних, спільні для GUI (gui.py)
+і безголового режиму (headless.py). Функції блокуючі — викликаються з
+ExecutionEngine або пулу координатора, а не з потоку, що керує станом вкладок.
+
+EntryCycle — сам цикл вкладки (тік → прогрів → озброєння → вхід → захист
+позиції), теж один на обидва режими: хост дає лише post / call_later і
+кілька хуків для свого інтерфейсу.
+"""
+import time
+
+from logic import (
+    get_account_balance, get_funding_data, get_current_price, get_symbol_info,
+    place_limit_close_order, measure_ping, get_optimal_limit_price,
+    get_order_execution_price, get_closed_trades, invalidate_account_balance,
+    take_profit_price, round_price_toward_profit,
+    get_streamed_position_size, seed_streamed_position,
+    get_next_funding_time, get_next_funding_timestamp, place_entry_order,
+    on_order_filled, watch_orderbook, get_streamed_price,
+)
+import stats_manager as stats
+from cycle_coordinator import get_cycle_coordinator
+from latency_tracker import tracker as latency_tracker
+from prewarm import PREWARM_LEAD_SECS, prewarm_session
+from server_clock import exchange_now
+
+
+# За скільки секунд до дедлайну входу тік озброює планувальник
+ENTRY_ARM_LEAD_SECS = 30.0
+
+
+def entry_side(funding_rate: float, reverse_side: bool) -> str:
+    """Сторона маркет-входу за знаком фандингу; reverse_side інвертує її."""
+    if reverse_side:
+        return "Sell" if funding_rate > 0 else "Buy"
+    return "Buy" if funding_rate > 0 else "Sell"
+
+
+def fetch_take_profit_inputs(session, symbol, exchange):
+    """Воркер при озброєнні входу: (ціна до угоди, tick size) для прикріпленого TP."""
+    return get_current_price(session, symbol, exchange), get_symbol_info(session, symbol, exchange)
+
+
+def entry_take_profit(tab_data, symbol, side):
+    """
+    Ціна прикріпленого TP без мережі: ціна з потоку (інакше — з озброєння), tick size —
+    з озброєння. None — тоді ліміт ставиться після виконання. Так само, якщо ціна не з
+    боку прибутку для біржі (Buy — вище ціни, Sell — нижче): такий TP Bybit відхилить
+    разом із самим входом.
+    """
+    inputs = tab_data.get("entry_tp_inputs")
+    ref_price, tick_size = inputs[1:] if inputs and inputs[0] == symbol else (None, None)
+    ref_price = (get_streamed_price(tab_data["session"], symbol, tab_data["exchange"])
+                 or ref_price or tab_data.get("last_price"))
+    if not ref_price:
+        print(f"No pre-trade price for {symbol}, take-profit will follow the fill")
+        return None
+    take_profit = take_profit_price(
+        ref_price, side, tab_data["profit_percentage"], tick_size,
+        is_inverted=tab_data.get("reverse_side", False),
+    )
+    if (take_profit <= ref_price) if side == "Buy" else (take_profit >= ref_price):
+        print(f"Take-profit {take_profit} for {side} {symbol} is not beyond {ref_price}, "
+              f"limit will follow the fill")
+        return None
+    return take_profit
+
+
+def fetch_position_open(session, symbol, exchange):
+    """Воркер: True/False — чи відкрита позиція; None — якщо біржа не відповіла."""
+    try:
+        if exchange == "Bybit":
+            streamed = get_streamed_position_size(session, symbol)
+            if streamed is not None:
+                return streamed > 0
+            pos = session.get_positions(category="linear", symbol=symbol)
+            if pos["retCode"] != 0:
+                return None
+            position = next(
+                (p for p in pos["result"]["list"]
+                 if p["symbol"] == symbol and float(p["size"]) > 0),
+                None,
+            )
+            seed_streamed_position(session, symbol, float(position["size"]) if position else 0.0)
+        else:
+            pos = session.get_position_information(symbol=symbol)
+            position = next(
+                (p for p in pos if p["symbol"] == symbol and abs(float(p["positionAmt"])) > 0),
+                None,
+            )
+        return position is not None
+    except Exception as e:
+        print(f"Error checking position: {e}")
+        return None
+
+
+def protect_position(session, exchange, symbol, side, order_id, qty,
+                     profit_percentage, auto_limit, is_inverted, latency_cycle=None,
+                     attached_tp=None):
+    """
+    Воркер: ціна входу → tick size → (ордербук) → reduce-only профіт-ліміт.
+    attached_tp — TP вже пішов разом із входом, потрібна лише ціна виконання.
+    """
+    entry_price, trade_open_time = get_order_execution_price(session, symbol, order_id, exchange)
+    latency_tracker.mark(latency_cycle, "exec_price")
+
+    if not entry_price:
+        print(f"Could not get entry price for {symbol}, order id: {order_id}")
+        return None
+
+    # Маркет-ордер виконано — баланс змінився
+    invalidate_account_balance(session, exchange)
+    print(f"Entry price for {symbol}: {entry_price} at {trade_open_time}")
+
+    if attached_tp:
+        print(f"Take-profit for {symbol} attached at entry: {attached_tp} "
+              f"({(attached_tp - entry_price)/entry_price*100:+.2f}% from fill)")
+        return {"entry_price": entry_price, "trade_open_time": trade_open_time, "limit_price": attached_tp}
+
+    tick_size = get_symbol_info(session, symbol, exchange)
+    latency_tracker.mark(latency_cycle, "tick_size")
+
+    # ── Stop ордер вище входу ─────────────────────────────────────
+    # stop_addon_pct = tab_data.get("stop_addon_pct", 0.5)  # % вище входу
+    # stop_price = entry_price * (
+    #     1 + stop_addon_pct / 100 if side == "Sell"  # шорт — стоп вище
+    #     else 1 - stop_addon_pct / 100               # лонг — стоп нижче
+    # )
+    # stop_price = round(stop_price, decimal_places)
+
+    # QTimer.singleShot(
+    #     2000,
+    #     lambda sp=stop_price: place_limit_close_order(
+    #         tab_data["session"], symbol, side,
+    #         tab_data.get("order_qty", tab_data["qty"]), sp, tick_size,
+    #         tab_data["exchange"]
+    #     )
+    # )
+    # print(f"Stop limit order at {stop_price} (+{stop_addon_pct}% from entry)")
+#
+    # ── Profit ліміт-ордер ────────────────────────────────────────
+    direction = 1 if is_inverted else -1
+    target = entry_price * (1 + (direction * profit_percentage) / 100)
+
+    # Вибір ціни залежно від режиму
+    if auto_limit:
+        optimal = get_optimal_limit_price(
+            session, symbol, side, entry_price,
+            exchange, profit_percentage, tick_size,
+            is_inverted=is_inverted
+        )
+        latency_tracker.mark(latency_cycle, "orderbook")
+        if optimal:
+            actual_profit = abs((optimal - entry_price) / entry_price * 100)
+            # Якщо оптимальна ціна дає прийнятне відхилення — використовуємо її
+            if abs(actual_profit - profit_percentage) <= 0.20:
+                limit_price = optimal
+            else:
+                limit_price = target
+        else:
+            limit_price = target
+    else:
+        limit_price = target   # <-- Якщо авто-ліміт вимкнено — завжди точний target
+
+    # === КРИТИЧНЕ ВИПРАВЛЕННЯ: Округлення в бік прибутку ===
+    limit_price = round_price_toward_profit(limit_price, side, tick_size)
+
+    print(f"Placing profit limit {side} close order at {limit_price} "
+          f"(desired {profit_percentage}%, entry {entry_price})")
+
+    place_limit_close_order(session, symbol, side, qty, limit_price, tick_size, exchange)
+    latency_tracker.mark(latency_cycle, "limit_ack")
+    print(f"Profit limit order placed at {limit_price} "
+          f"({(limit_price - entry_price)/entry_price*100:+.2f}%)")
+
+    return {"entry_price": entry_price, "trade_open_time": trade_open_time, "limit_price": limit_price}
+
+
+def import_after_5m(session, exchange, symbol, entry_price, trade_open_time):
+    """Воркер: ціна через 5хв, імпорт останніх угод і оновлення рядка CSV."""
+    print(f"Executing 5-minute auto-update for {symbol}...")
+    
+    # 1. Отримуємо ціну через 5хв
+    current_price = get_current_price(session, symbol, exchange)
+    if not current_price or not entry_price:
+        print(f"Could not calculate 5m change for {symbol}: price is missing.")
+        return False
+        
+    change_pct = ((current_price - entry_price) / entry_price) * 100
+    print(f"Price change for {symbol} after 5m: {change_pct:+.2f}%")
+    
+    # 2. Імпортуємо останні угоди (щоб наша угода точно була в CSV)
+    trades = get_closed_trades(session, exchange, limit=5)
+    if trades:
+        written = stats.write_imported_trades(trades)
+        print(f"Auto-import: written {written} trades.")
+        
+    # 3. Оновлюємо конкретний рядок у CSV
+    updated = stats.update_trade_after_5m(symbol, trade_open_time, change_pct)
+    if updated:
+        print(f"Successfully updated Change%_after5m for {symbol} at {trade_open_time}")
+    else:
+        # Спробуємо також пошукати за поточним часом (якщо datetime.now() в write_stats_row був іншим)
+        print(f"Could not find trade for {symbol} at {trade_open_time} in CSV to update.")
+    return bool(updated)
+
+
+def fetch_tab_snapshot(session, symbol, exchange, retry_count, retry_delay):
+    """Воркер: всі мережеві дані вкладки за один прохід. None — якщо всі спроби невдалі."""
+    for attempt in range(retry_count):
+        try:
+            return {
+                "symbol":       symbol,
+                "funding_data": get_funding_data(session, symbol, exchange),
+                "price":        get_current_price(session, symbol, exchange),
+                "balance":      get_account_balance(session, exchange),
+                "ping_ms":      measure_ping(session, exchange),
+            }
+        except Exception as e:
+            print(f"Error updating funding data (attempt {attempt + 1}): {e}")
+            if attempt < retry_count - 1:
+                time.sleep(retry_delay)
+    return None
+
+
+
+class EntryCycle:
+    """
+    Цикл входу вкладок. Стан tab_data змінюється лише в потоці хоста: воркери
+    повертаються через post(fn), відкладені кроки — через call_later(сек, fn).
+    Єдиний виняток — прапорець order_placed_this_cycle, який вхід ставить у пулі
+    координатора (див. _fire_entry).
+
+    Хуки хоста (усі необов'язкові):
+        is_active(tab_data)                       — вкладка ще існує
+        trading_blocked()                         — глобальне блокування входів
+        on_limit_mismatch(tab_data, symbol, pct)  — ліміт дає інший % прибутку, ніж задано
+        on_trade_imported()                       — угоду через 5 хв дописано в CSV
+        on_position_closed(tab_data)              — позиція закрилась
+    """
+
+    def __init__(self, engine, post, call_later, prewarm_lead: float = PREWARM_LEAD_SECS,
+                 is_active=None, trading_blocked=None, on_limit_mismatch=None,
+                 on_trade_imported=None, on_position_closed=None):
+        self._engine = engine
+        self._post = post
+        self._call_later = call_later
+        self.prewarm_lead = prewarm_lead
+        self._is_active = is_active or (lambda tab_data: True)
+        self._trading_blocked = trading_blocked or (lambda: False)
+        self._on_limit_mismatch = on_limit_mismatch
+        self._on_trade_imported = on_trade_imported
+        self._on_position_closed = on_position_closed
+        self._prewarmed = set()   # (id(session), фандинг) — прогрів раз на сесію за цикл
+
+    # ---- Тік ----------------------------------------------------------- #
+
+    def tick(self, tab_data):
+        """
+        Щосекундний тік вкладки з funding_data. Повертає (time_to_funding, time_str)
+        для інтерфейсу або None, якщо вхід у цьому циклі вже зроблено чи час не визначено.
+        """
+        # ── Захист від подвійного ордеру ─────────────────────────────
+        if tab_data.get("order_placed_this_cycle"):
+            return None
+
+        symbol = tab_data["funding_data"]["symbol"]
+        time_val = tab_data["funding_data"]["funding_time"]
+        try:
+            time_to_funding, time_str = get_next_funding_time(
+                time_val, tab_data["funding_interval_hours"],
+                is_testnet=tab_data.get("testnet", False)
+            )
+        except Exception as e:
+            print(f"Error calculating funding time: {e}")
+            return None
+
+        if 0.5 <= time_to_funding <= 1.5 and tab_data["pre_funding_price"] is None:
+            self._engine.submit(
+                get_current_price, tab_data["session"], symbol, tab_data["exchange"],
+                on_done=lambda price: tab_data.update({"pre_funding_price": price}),
+                key=("pre_price", id(tab_data)),
+            )
+
+        entry_window = tab_data["entry_time_seconds"]
+
+        # Прогрів має завершитись до входу, навіть якщо вікно входу довше за lead
+        if 0 < time_to_funding <= max(self.prewarm_lead, entry_window + 2) and not tab_data["open_order_id"]:
+            self._prewarm_connections(tab_data, time_to_funding)
+
+        # Сам вхід робить планувальник точно в дедлайн; тік лише озброює його
+        if 0 < time_to_funding <= entry_window + ENTRY_ARM_LEAD_SECS and not tab_data["open_order_id"]:
+            self._arm_entry(tab_data, time_val)
+
+        tab_data["update_count"] += 1
+        if tab_data.get("position_open") and tab_data["update_count"] % 10 == 0:
+            self.check_position(tab_data)
+        return time_to_funding, time_str
+
+    def _prewarm_connections(self, tab_data, time_to_funding):
+        """Легкі market- і trade-запити по сесії вкладки, щоб вхід не платив за handshake."""
+        session = tab_data["session"]
+        cycle = (id(session), round(exchange_now() + time_to_funding))
+        if cycle in self._prewarmed:
+            return
+        self._prewarmed = {c for c in self._prewarmed if c[1] >= cycle[1] - 1}
+        self._prewarmed.add(cycle)
+        self._engine.submit(
+            prewarm_session, session, tab_data["exchange"], tab_data["funding_data"]["symbol"],
+            key=("prewarm", id(session)),
+        )
+
+    # ---- Вхід ---------------------------------------------------------- #
+
+    def _arm_entry(self, tab_data, funding_time):
+        """Планує маркет-вхід на момент (наступний фандинг − entry_time_seconds)."""
+        funding_ts = get_next_funding_timestamp(
+            funding_time, tab_data["funding_interval_hours"],
+            is_testnet=tab_data.get("testnet", False)
+        )
+        # Дедлайн у часі біржі — не пливе з замірами зсуву; в локальний переводить координатор
+        deadline = funding_ts - tab_data["entry_time_seconds"]
+        armed = tab_data.get("entry_deadline")
+        if armed is not None and abs(armed - deadline) < 0.001:
+            return
+        tab_data["entry_deadline"] = deadline
+        if tab_data["exchange"] == "Bybit":
+            # Ордербук для авто-ліміту має бути локальним ще до входу
+            watch_orderbook(tab_data["session"], tab_data["selected_symbol"])
+        if tab_data.get("attach_take_profit"):
+            # Ціна й tick size для TP — зараз, щоб у дедлайн вхід не робив REST
+            symbol = tab_data["selected_symbol"]
+            self._engine.submit(
+                fetch_take_profit_inputs, tab_data["session"], symbol, tab_data["exchange"],
+                on_done=lambda res: tab_data.update({"entry_tp_inputs": (symbol, *res)}),
+                key=("tp_inputs", id(tab_data)),
+            )
+        # Вкладки з тим самим дедлайном входять разом через пул координатора
+        get_cycle_coordinator().arm(
+            id(tab_data), deadline,
+            lambda info: self._fire_entry(tab_data, funding_ts, info),
+            label=tab_data["selected_symbol"],
+        )
+        print(f"[ENTRY ARMED] {tab_data['selected_symbol']} deadline in {deadline - exchange_now():.3f}s")
+
+    def _fire_entry(self, tab_data, funding_ts, info):
+        """Виконується в пулі координатора рівно в дедлайн входу (паралельно з іншими вкладками)."""
+        if not self._is_active(tab_data) or not tab_data["funding_data"]:
+            return
+        if tab_data.get("order_placed_this_cycle") or tab_data["open_order_id"]:
+            return
+        time_to_funding = funding_ts - exchange_now()
+        if time_to_funding <= 0:
+            return
+
+        symbol = tab_data["funding_data"]["symbol"]
+        rate   = tab_data["funding_data"]["funding_rate"]
+
+        if self._trading_blocked():
+            print(f"[TRADING BLOCKED] Funding trade for {symbol} bypassed because Global Block is active.")
+            return
+
+        print(f"[ORDER TRIGGER] {symbol} time_to_funding={time_to_funding:.3f} "
+              f"entry_window={tab_data['entry_time_seconds']} trigger_error={info['error_ms']:+.3f}ms")
+        side = entry_side(rate, tab_data["reverse_side"])
+        qty = tab_data["qty"]
+        # Блокуємо повторний вхід до відповіді біржі. Запис у пулі безпечний: присвоєння
+        # атомарне під GIL, True ставить лише цей вхід (координатор запускає учасника раз
+        # на дедлайн), а хост скидає прапорець тільки в _on_entry_placed чи новому циклі
+        tab_data["order_placed_this_cycle"] = True
+        cycle = latency_tracker.start_cycle(symbol, tab_data["exchange"], t=info["fired_at"])
+        take_profit = entry_take_profit(tab_data, symbol, side) if tab_data.get("attach_take_profit") else None
+        latency_tracker.mark(cycle, "market_send")
+        # TP, відхилений біржею, тут уже None — ліміт тоді поставить protect_position
+        order_id, take_profit = place_entry_order(tab_data["session"], symbol, side, qty, tab_data["exchange"],
+                                                  take_profit=take_profit)
+        latency_tracker.mark(cycle, "market_ack")
+        if order_id and take_profit:
+            latency_tracker.mark(cycle, "limit_ack")
+        entry = {"entry_trigger_error_ms": info["error_ms"], "latency_cycle": cycle,
+                 "attached_tp_price": take_profit}
+        self._post(lambda: self._on_entry_placed(tab_data, symbol, side, qty, order_id, funding_ts, entry))
+
+    def _on_entry_placed(self, tab_data, symbol, side, qty, order_id, funding_ts, entry):
+        if not self._is_active(tab_data):
+            return
+        tab_data.update(entry)
+        if order_id:
+            tab_data["open_order_id"] = order_id
+            tab_data["order_qty"] = qty  # ← фіксуємо qty угоди
+            delay = max(0.0, funding_ts - 0.5 - exchange_now())
+            self._call_later(delay, lambda: self.capture_funding_price(tab_data, symbol, side))
+            if tab_data["exchange"] == "Bybit":
+                # Ліміт іде одразу після виконання маркет-ордера; таймер лишається запасним
+                tab_data["fill_watch"] = on_order_filled(
+                    tab_data["session"], order_id,
+                    lambda: self._post(lambda: self.capture_funding_price(tab_data, symbol, side)),
+                )
+        else:
+            tab_data["order_placed_this_cycle"] = False
+        tab_data["pre_funding_price"] = None
+
+    # ---- Після входу --------------------------------------------------- #
+
+    def capture_funding_price(self, tab_data, symbol, side):
+        if not self._is_active(tab_data):
+            return
+        # Спрацював таймер чи подія — слухач виконання більше не потрібен
+        cancel_watch = tab_data.pop("fill_watch", None)
+        if cancel_watch:
+            cancel_watch()
+        order_id = tab_data["open_order_id"]
+        # Спрацьовує або подія виконання з приватного потоку, або запасний таймер — ліміт ставимо один раз
+        if not order_id or tab_data.get("protecting_order_id") == order_id:
+            return
+        tab_data["protecting_order_id"] = order_id
+        self._engine.submit(
+            protect_position,
+            tab_data["session"], tab_data["exchange"], symbol, side,
+            order_id, tab_data.get("order_qty", tab_data["qty"]),
+            tab_data["profit_percentage"], tab_data.get("auto_limit", False),
+            tab_data.get("reverse_side", False),
+            latency_cycle=tab_data.get("latency_cycle"),
+            attached_tp=tab_data.get("attached_tp_price"),
+            on_done=lambda res: self._on_position_protected(tab_data, symbol, res),
+        )
+
+    def _on_position_protected(self, tab_data, symbol, result):
+        if not self._is_active(tab_data):
+            return
+        tab_data["open_order_id"] = None
+        if result is None:
+            return
+
+        entry_price = result["entry_price"]
+        trade_open_time = result["trade_open_time"]
+        tab_data["position_open"] = True
+        tab_data["funding_time_price"] = entry_price
+        tab_data["limit_price"] = result["limit_price"]
+
+        # Change%_after5m — від точного часу угоди з біржі
+        self._call_later(5 * 60, lambda: self._import_after_5m(tab_data, symbol, entry_price, trade_open_time))
+        self._call_later(1, lambda: self._check_limit_price(tab_data, symbol))
+
+    def _import_after_5m(self, tab_data, symbol, entry_price, trade_open_time):
+        if not self._is_active(tab_data):
+            return
+        self._engine.submit(
+            import_after_5m,
+            tab_data["session"], tab_data["exchange"], symbol, entry_price, trade_open_time,
+            on_done=lambda updated: self._on_trade_imported() if updated and self._on_trade_imported else None,
+        )
+
+    def _check_limit_price(self, tab_data, symbol):
+        if not self._is_active(tab_data):
+            return
+        open_price = tab_data["funding_time_price"]
+        limit = tab_data.get("limit_price")
+        if open_price is None or limit is None:
+            return
+        profit = abs((limit - open_price) / open_price * 100)
+        if abs(profit - tab_data["profit_percentage"]) > 0.5:
+            print(f"[PRICE MISMATCH] {symbol}: limit gives {profit:.2f}%, "
+                  f"expected {tab_data['profit_percentage']:.2f}%")
+            if self._on_limit_mismatch:
+                self._on_limit_mismatch(tab_data, symbol, profit)
+
+    def check_position(self, tab_data):
+        self._engine.submit(
+            fetch_position_open,
+            tab_data["session"], tab_data["selected_symbol"], tab_data["exchange"],
+            on_done=lambda is_open: self._apply_position_status(tab_data, is_open),
+            key=("position", id(tab_data)),
+        )
+
+    def _apply_position_status(self, tab_data, is_open):
+        if not self._is_active(tab_data) or is_open is not False:
+            return
+        tab_data["position_open"] = False
+        invalidate_account_balance(tab_data["session"], tab_data["exchange"])
+        if self._on_position_closed:
+            self._on_position_closed(tab_data)
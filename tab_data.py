@@ -1,6 +1,7 @@
 """
 tab_data.py — ініціалізація стану вкладки (tab_data dict).
 """
+from instrument_cache import get_instrument_cache
 from logic import initialize_client
 
 
@@ -17,6 +18,7 @@ DEFAULT_TAB_STATE = {
     "exchange": "Bybit",
     "testnet": False,
     "auto_limit": False,
+    "attach_take_profit": False,
     "stop_loss_percentage": 0.5,
     "stop_loss_enabled": True,
     "funding_data": None,
@@ -24,6 +26,8 @@ DEFAULT_TAB_STATE = {
     "funding_time_price": None,
     "limit_price": None,
     "pre_funding_price": None,
+    "last_price": None,
+    "last_balance": None,
     "auto_mode": False,
     "auto_min_funding": 0.05,
     "auto_scan_done_this_minute": False,
@@ -37,10 +41,11 @@ DEFAULT_TAB_STATE = {
 }
 
 
-def build_tab_data(settings: dict, session=None, testnet=None, exchange=None) -> dict:
+def build_tab_data(settings: dict, session=None, testnet=None, exchange=None, connect=True) -> dict:
     """
     Повертає словник стану нової вкладки.
     Пріоритет: явні аргументи > settings > DEFAULT_TAB_STATE.
+    connect=False без session — сесію вкладки створить викликач пізніше (session лишається None).
     """
     state = DEFAULT_TAB_STATE.copy()
     state.update(settings)
@@ -55,5 +60,10 @@ def build_tab_data(settings: dict, session=None, testnet=None, exchange=None) ->
     if "funding_interval_hours" not in settings:
         state["funding_interval_hours"] = 1.0 if state["exchange"] == "Bybit" else 8.0
 
+    if not session and not connect:
+        state["session"] = None
+        return state
     state["session"] = session or initialize_client(state["exchange"], state["testnet"])
+    # Метадані інструментів вантажаться у фоні ще до першого ордера (Binance потребує сесії)
+    get_instrument_cache(state["exchange"], state["testnet"], state["session"])
     return state
\ No newline at end of file
@@ -0,0 +1,278 @@
+"""
+ticker_cache.py — спільний знімок усіх лінійних тікерів Bybit і Binance USDⓈ-M.
+
+Один запит get_tickers(category="linear") на TTL обслуговує будь-яку кількість
+символів: вкладки, авто-сканер і рекордер статистики читають з одного
+payload. Індекс за символом дає O(1) пошук. Для крос-біржового сканера
+get_exchange_tickers() паралельно оновлює знімки кількох бірж і зводить їх до
+однієї схеми (TICKER_FIELDS) — загальний час визначає найповільніша біржа.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from client_registry import shared_http_session
+from rate_limiter import analytics_priority, get_rate_limiter
+
+
+BYBIT_REST = "https://api.bybit.com"
+BYBIT_REST_TEST = "https://api-testnet.bybit.com"
+BINANCE_FAPI = "https://fapi.binance.com"
+BINANCE_FAPI_TEST = "https://testnet.binancefuture.com"
+
+TICKER_CACHE_TTL = 3.0  # сек — як часто дозволено повторно качати весь список
+FUNDING_INFO_TTL = 3600.0         # інтервали фандингу Binance змінюються рідко
+BINANCE_DEFAULT_INTERVAL = 8      # год — для символів, яких немає у fundingInfo
+SCAN_EXCHANGES = ("Bybit", "Binance")
+
+# Спільна схема рядка крос-біржового знімка (імена полів — як у тікерах Bybit,
+# тож funding_scanner розбирає обидві біржі однаково)
+TICKER_FIELDS = ("symbol", "exchange", "fundingRate", "nextFundingTime", "fundingIntervalHour",
+                 "lastPrice", "turnover24h", "bid1Price", "ask1Price", "openInterestValue")
+
+_exchange_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="TickerFetch")
+_request_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix="TickerRequest")
+
+
+def fetch_bybit_tickers(timeout: int = 8, testnet: bool = False) -> list[dict] | None:
+    """Отримує список тикерів лінійних контрактів з Bybit API."""
+    base = BYBIT_REST_TEST if testnet else BYBIT_REST
+    try:
+        get_rate_limiter().acquire("market")
+        resp = shared_http_session().get(
+            f"{base}/v5/market/tickers",
+            params={"category": "linear"},
+            timeout=timeout,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("retCode") != 0:
+            return None
+        return data["result"]["list"]
+    except Exception as e:
+        print(f"fetch_bybit_tickers error: {e}")
+        return None
+
+
+@analytics_priority
+def _get_json(url: str, params: dict | None = None, timeout: int = 8):
+    get_rate_limiter().acquire("market")
+    resp = shared_http_session().get(url, params=params, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
+
+
+_funding_info: dict[bool, tuple[float, dict[str, int]]] = {}   # testnet -> (час, symbol -> год)
+
+
+def _binance_intervals(base: str, testnet: bool, timeout: int) -> dict[str, int]:
+    """Символи з нестандартним інтервалом фандингу (решта — BINANCE_DEFAULT_INTERVAL)."""
+    cached = _funding_info.get(testnet)
+    if cached is not None and time.time() - cached[0] < FUNDING_INFO_TTL:
+        return cached[1]
+    try:
+        rows = _get_json(f"{base}/fapi/v1/fundingInfo", timeout=timeout)
+        intervals = {r["symbol"]: int(r.get("fundingIntervalHours") or BINANCE_DEFAULT_INTERVAL) for r in rows}
+    except Exception as e:
+        print(f"Binance fundingInfo error: {e}")
+        return cached[1] if cached else {}
+    _funding_info[testnet] = (time.time(), intervals)
+    return intervals
+
+
+def normalize_bybit(item: dict) -> dict:
+    row = {key: item.get(key) for key in TICKER_FIELDS}
+    row["exchange"] = "Bybit"
+    return row
+
+
+def normalize_binance(premium: dict, day: dict | None, book: dict | None, interval: int) -> dict:
+    """premiumIndex + ticker/24hr + bookTicker одного символу → рядок TICKER_FIELDS."""
+    day = day or {}
+    book = book or {}
+    return {
+        "symbol": premium.get("symbol"),
+        "exchange": "Binance",
+        "fundingRate": premium.get("lastFundingRate"),
+        "nextFundingTime": premium.get("nextFundingTime"),
+        "fundingIntervalHour": interval,
+        "lastPrice": premium.get("markPrice"),
+        "turnover24h": day.get("quoteVolume"),
+        "bid1Price": book.get("bidPrice"),
+        "ask1Price": book.get("askPrice"),
+        "openInterestValue": None,   # у Binance немає відкритого інтересу всіх символів одним запитом
+    }
+
+
+def fetch_binance_tickers(timeout: int = 8, testnet: bool = False) -> list[dict] | None:
+    """Знімок USDⓈ-M перпетуалів Binance у схемі TICKER_FIELDS; чотири запити йдуть паралельно."""
+    base = BINANCE_FAPI_TEST if testnet else BINANCE_FAPI
+    try:
+        premium_f = _request_pool.submit(_get_json, f"{base}/fapi/v1/premiumIndex", timeout=timeout)
+        day_f = _request_pool.submit(_get_json, f"{base}/fapi/v1/ticker/24hr", timeout=timeout)
+        book_f = _request_pool.submit(_get_json, f"{base}/fapi/v1/ticker/bookTicker", timeout=timeout)
+        intervals_f = _request_pool.submit(_binance_intervals, base, testnet, timeout)
+        premium = premium_f.result()
+        # Оборот і спред — лише для балу; без них ставки все одно корисні
+        try:
+            day = {d["symbol"]: d for d in day_f.result()}
+        except Exception as e:
+            print(f"Binance 24hr tickers error: {e}")
+            day = {}
+        try:
+            book = {b["symbol"]: b for b in book_f.result()}
+        except Exception as e:
+            print(f"Binance book tickers error: {e}")
+            book = {}
+        intervals = intervals_f.result()
+        return [
+            normalize_binance(p, day.get(p["symbol"]), book.get(p["symbol"]),
+                              intervals.get(p["symbol"], BINANCE_DEFAULT_INTERVAL))
+            for p in premium
+            if p.get("symbol") and p.get("nextFundingTime")   # поставочні контракти без фандингу
+        ]
+    except Exception as e:
+        print(f"fetch_binance_tickers error: {e}")
+        return None
+
+
+class TickerSnapshotCache:
+    """Кеш повного списку тікерів з TTL та індексом symbol -> ticker."""
+
+    def __init__(self, fetcher, ttl: float = TICKER_CACHE_TTL):
+        self._fetcher = fetcher
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._tickers: list[dict] = []
+        self._index: dict[str, dict] = {}
+        self._fetched_at = 0.0
+        self.fetch_count = 0
+
+    def age(self) -> float:
+        with self._lock:
+            return time.time() - self._fetched_at if self._fetched_at else float("inf")
+
+    def refresh(self, max_age: float | None = None) -> bool:
+        """Качає новий знімок, якщо поточний старший за max_age (за замовчуванням TTL)."""
+        limit = self.ttl if max_age is None else max_age
+        if self.age() <= limit:
+            return True
+        # Паралельні виклики чекають на один запит замість того, щоб слати свої
+        with self._fetch_lock:
+            if self.age() <= limit:
+                return True
+            tickers = self._fetcher()
+            if tickers is None:
+                return False
+            index = {t.get("symbol"): t for t in tickers if t.get("symbol")}
+            with self._lock:
+                self._tickers = tickers
+                self._index = index
+                self._fetched_at = time.time()
+                self.fetch_count += 1
+            return True
+
+    def _usable(self, max_age: float | None) -> bool:
+        """
+        Чи можна віддавати знімок після refresh(). Із явним max_age старіший знімок
+        не годиться (напр. ціни після фандингу) — краще None; за TTL — віддаємо останній наявний.
+        """
+        if self.refresh(max_age):
+            return True
+        return max_age is None and bool(self._fetched_at)
+
+    def get_list(self, max_age: float | None = None) -> list[dict] | None:
+        if not self._usable(max_age):
+            return None
+        with self._lock:
+            return self._tickers
+
+    def get(self, symbol: str, max_age: float | None = None) -> dict | None:
+        if not self._usable(max_age):
+            return None
+        with self._lock:
+            return self._index.get(symbol.upper())
+
+
+_caches: dict[tuple[str, bool], TickerSnapshotCache] = {}
+_caches_lock = threading.Lock()
+
+_FETCHERS = {
+    "Bybit": fetch_bybit_tickers,
+    "Binance": fetch_binance_tickers,
+}
+
+
+def get_ticker_cache(testnet: bool = False, exchange: str = "Bybit") -> TickerSnapshotCache:
+    """Спільний кеш для біржі та mainnet або testnet."""
+    with _caches_lock:
+        cache = _caches.get((exchange, testnet))
+        if cache is None:
+            fetcher = _FETCHERS[exchange]
+            cache = TickerSnapshotCache(lambda: fetcher(testnet=testnet))
+            _caches[(exchange, testnet)] = cache
+        return cache
+
+
+@analytics_priority
+def _timed_snapshot(exchange: str, testnet: bool, max_age: float | None):
+    started = time.perf_counter()
+    tickers = get_ticker_cache(testnet, exchange).get_list(max_age)
+    return tickers, (time.perf_counter() - started) * 1000
+
+
+_combined: dict[tuple, tuple[list, list[dict]]] = {}   # (біржі, testnet) -> (вихідні знімки, зведений список)
+_combined_lock = threading.Lock()
+
+
+def get_exchange_tickers(
+    exchanges: tuple[str, ...] = SCAN_EXCHANGES,
+    testnet: bool = False,
+    max_age: float | None = None,
+) -> tuple[list[dict] | None, dict[str, float]]:
+    """
+    Паралельно оновлює знімки бірж і повертає (рядки TICKER_FIELDS, {біржа: мс}).
+
+    Біржа, що не відповіла, просто випадає зі знімка; None — лише якщо не відповіла жодна.
+    Поки жоден знімок не оновився, повертається той самий список (кеш колонок сканера спрацює).
+    """
+    futures = {ex: _exchange_pool.submit(_timed_snapshot, ex, testnet, max_age) for ex in exchanges}
+    snapshots, timings = {}, {}
+    for ex, future in futures.items():
+        try:
+            tickers, ms = future.result()
+        except Exception as e:
+            print(f"{ex} tickers error: {e}")
+            continue
+        timings[ex] = ms
+        if tickers is not None:
+            snapshots[ex] = tickers
+    if not snapshots:
+        return None, timings
+
+    key = (tuple(exchanges), testnet)
+    sources = [snapshots.get(ex) for ex in exchanges]
+    with _combined_lock:
+        cached = _combined.get(key)
+        if cached is not None and all(a is b for a, b in zip(cached[0], sources)):
+            return cached[1], timings
+
+    rows = []
+    for ex, tickers in snapshots.items():
+        # Binance-знімок уже в спільній схемі; сирі тікери Bybit потрібні іншим модулям як є
+        if ex == "Bybit":
+            rows.extend(normalize_bybit(t) for t in tickers)
+        else:
+            rows.extend(tickers)
+    with _combined_lock:
+        _combined[key] = (sources, rows)
+    return rows, timings
+
+
+def set_ticker_cache_ttl(ttl: float):
+    global TICKER_CACHE_TTL
+    TICKER_CACHE_TTL = ttl
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.ttl = ttl
@@ -16,6 +16,7 @@ translations = {
         "profit_percentage_label": "Desired Profit Percentage (%):",
         "auto_limit_label": "Automatic Limit Order:",
         "auto_limit_checkbox": "Enable Auto Limit",
+        "attach_tp_checkbox": "Attach Take-Profit to Entry",
         "leverage_label": "Leverage (x):",
         "stop_loss_percentage_label": "Stop Loss Percentage (%):",
         "funding_info_label": "Funding Rate: N/A | Time to Next Funding",
@@ -80,6 +81,8 @@ translations = {
         "collect_stats_checkbox": "Enable funding stats collection",
         "observation_analysis_btn": "Analysis",
         "observation_analysis_title": "Funding Statistics Analysis",
+        "latency_button": "Latency",
+        "latency_title": "Order Path Latency",
     },
     "uk": {
         "window_title": "{} Трейдер Фінансування",
@@ -97,6 +100,7 @@ translations = {
         "profit_percentage_label": "Бажаний відсоток прибутку (%):",
         "auto_limit_label": "Автоматичний лімітний ордер:",
         "auto_limit_checkbox": "Увімкнути автоматичний ліміт",
+        "attach_tp_checkbox": "Прикріпити тейк-профіт до входу",
         "leverage_label": "Кредитне плече (x):",
         "stop_loss_percentage_label": "Відсоток стоп-лоссу (%):",
         "funding_info_label": "Ставка фінанс: N/A | Час до наступного ",
@@ -161,5 +165,7 @@ translations = {
         "collect_stats_checkbox": "Увімкнути збирання статистики фандингу",
         "observation_analysis_btn": "Аналіз",
         "observation_analysis_title": "Аналіз статистики фандингу",
+        "latency_button": "Затримки",
+        "latency_title": "Затримки шляху ордера",
     }
 }
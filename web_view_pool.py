@@ -0,0 +1,87 @@
+"""
+web_view_pool.py — невеликий пул QWebEngineView зі спільним профілем.
+
+Кожен QWebEngineView — це процес Chromium на сотні МБ. Вид створюється лише
+тоді, коли вкладка стає видимою; видів не більше за size, і коли всі зайняті,
+забирається той, що найдовше не показувався. Усі види працюють через один
+іменований профіль з обмеженим дисковим кешем (cookies спільні).
+"""
+import os
+from collections import OrderedDict
+
+from PyQt6.QtCore import QUrl
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
+
+
+POOL_SIZE = 2               # живих видів на весь застосунок
+CACHE_MAX_MB = 64           # межа HTTP-кешу спільного профілю
+PROFILE_NAME = "BybitProfile"
+
+
+class SilentWebEnginePage(QWebEnginePage):
+    """Сторінка WebView, яка ігнорує (не виводить у консоль) JS-повідомлення."""
+    def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
+        # Порожній метод для придушення виводу в термінал
+        pass
+
+
+class WebViewPool:
+    def __init__(self, parent, size: int = POOL_SIZE, cache_mb: int = CACHE_MAX_MB):
+        self.size = size
+        self._profile = QWebEngineProfile(PROFILE_NAME, parent)
+        cache_path = os.path.join(os.getcwd(), "webcache", "shared")
+        os.makedirs(cache_path, exist_ok=True)
+        self._profile.setCachePath(cache_path)
+        self._profile.setPersistentStoragePath(cache_path)
+        self._profile.setHttpCacheMaximumSize(cache_mb * 1024 * 1024)
+        self._profile.setPersistentCookiesPolicy(
+            QWebEngineProfile.PersistentCookiesPolicy.AllowPersistentCookies
+        )
+        self._owners = OrderedDict()   # key -> (view, layout); останній — щойно показаний
+        self._free: list = []
+        self.created = 0
+        self.evictions = 0
+
+    def acquire(self, key, layout) -> QWebEngineView:
+        """Вид для власника key, вставлений у layout; за потреби забирає найстаріший."""
+        if key in self._owners:
+            self._owners.move_to_end(key)
+            return self._owners[key][0]
+
+        if self._free:
+            view = self._free.pop()
+        elif self.created < self.size:
+            view = QWebEngineView()
+            view.setPage(SilentWebEnginePage(self._profile, view))
+            view.setMinimumHeight(150)
+            self.created += 1
+            print(f"Web view {self.created}/{self.size} created")
+        else:
+            _, (view, old_layout) = self._owners.popitem(last=False)
+            old_layout.removeWidget(view)
+            self.evictions += 1
+
+        layout.addWidget(view)
+        view.setVisible(True)
+        self._owners[key] = (view, layout)
+        return view
+
+    def view_for(self, key) -> QWebEngineView | None:
+        entry = self._owners.get(key)
+        return entry[0] if entry else None
+
+    def release(self, key):
+        """Повертає вид власника в пул і вивантажує сторінку."""
+        entry = self._owners.pop(key, None)
+        if entry is None:
+            return
+        view, layout = entry
+        layout.removeWidget(view)
+        view.setParent(None)
+        view.setUrl(QUrl("about:blank"))
+        self._free.append(view)
+
+    def stats(self) -> dict:
+        return {"views": self.created, "bound": len(self._owners), "free": len(self._free),
+                "evictions": self.evictions}